@@ -1,7 +1,7 @@
 import numpy as np
 
 #nint, precis, ck.reshape(-1,1), np.array(call_prices).reshape(-1,1), upbd
-def anticonv_call(nint, precis, ck, call_prices, upbd):
+def anticonv_call(nint, precis, ck, call_prices, upbd, stats=None):
     """
 
     Parameters:
@@ -13,6 +13,9 @@ def anticonv_call(nint, precis, ck, call_prices, upbd):
         y     : 1D numpy array (dependent variable)
         upbd  : float
             Upper bound parameter.
+        stats : dict, optional
+            If given, 'iterations' is set to the number of projection
+            sweeps performed.
     
     Returns:
         g     : 1D numpy array
@@ -148,6 +151,9 @@ def anticonv_call(nint, precis, ck, call_prices, upbd):
             flag = 1
         k += 1
 
+    if stats is not None:
+        stats['iterations'] = k - 1
+
     # Normalize u
     u = u / u[n]
     # Final regression estimate
@@ -1,7 +1,7 @@
 import numpy as np
 import math
 
-def anticonv_put(nint, precis, pk, put_prices, upbd):
+def anticonv_put(nint, precis, pk, put_prices, upbd, stats=None):
     """
     Antitonic and convex regression.
     
@@ -14,6 +14,9 @@ def anticonv_put(nint, precis, pk, put_prices, upbd):
         y      : 1D numpy array (dependent variable)
         upbd   : float
                  Upper bound parameter.
+        stats  : dict, optional
+                 If given, 'iterations' is set to the number of projection
+                 sweeps performed.
                  
     Returns:
         g      : 1D numpy array
@@ -100,6 +103,9 @@ def anticonv_put(nint, precis, pk, put_prices, upbd):
             flag = 1
         k += 1
 
+    if stats is not None:
+        stats['iterations'] = k - 1
+
     u = u / u[n]
     g = put_prices + u[:n]
     return g
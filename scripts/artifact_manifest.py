@@ -0,0 +1,161 @@
+"""
+Manifest of the result files (artifacts) sbub_run writes.
+
+Every raw or split-adjusted results file is recorded in
+<artifact dir>/artifacts/<TICKER>.json (one file per ticker, so parallel
+sbub_run workers never write the same manifest) with its ticker, kind
+("raw" or "splitadj"), yr1/yr2, calibration parameters, path relative to the
+artifact directory, content hash, row count (periods), size and mtime.
+
+Downstream code resolves inputs with find_artifact, an exact lookup in an
+in-memory index of the ticker's manifest (reloaded when the manifest
+changes), instead of globbing the directory and filtering file names.
+recorded_hash gives a file's content hash without rereading it while its
+size and mtime still match the manifest, for pipeline.py's stage keys.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+MANIFEST_DIR = "artifacts"
+MAT_HEADER_BYTES = 128   # MAT v5 text header carries a creation timestamp
+# Parameters that distinguish otherwise identical artifacts in lookups
+KEY_PARAMS = ("opth", "hnumsd", "nstep")
+
+_INDEX = {}
+
+
+def content_hash(path):
+    """
+    SHA-256 of a file's contents, or None if it does not exist.
+
+    .mat files are hashed past their timestamped header and .npz archives by
+    their arrays, so rewriting identical results does not change the hash.
+    """
+    if not os.path.exists(path):
+        return None
+    digest = hashlib.sha256()
+    if str(path).endswith(".npz"):
+        with np.load(path) as arrays:
+            for name in sorted(arrays.files):
+                digest.update(name.encode())
+                digest.update(np.ascontiguousarray(arrays[name]).tobytes())
+        return digest.hexdigest()
+    with open(path, "rb") as f:
+        if str(path).endswith(".mat"):
+            f.seek(MAT_HEADER_BYTES)
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def manifest_path(directory, ticker):
+    return Path(directory).joinpath(MANIFEST_DIR, f"{ticker.lstrip('^')}.json")
+
+
+def read_manifest(directory, ticker):
+    try:
+        with open(manifest_path(directory, ticker)) as f:
+            return json.load(f).get("artifacts", [])
+    except (OSError, ValueError):
+        return []
+
+
+def lookup_key(kind, yr1, yr2, params):
+    return (kind, str(yr1), str(yr2)) + tuple(float(params[name]) for name in KEY_PARAMS)
+
+
+def record_artifact(path, ticker, kind, yr1, yr2, rows, **params):
+    """Add or replace the manifest entry for a result file that was just written."""
+    path = Path(path)
+    directory = path.parent
+    stat = path.stat()
+    entry = {
+        "ticker": ticker,
+        "kind": kind,
+        "yr1": str(yr1),
+        "yr2": str(yr2),
+        "params": params,
+        "path": path.name,
+        "sha256": content_hash(path),
+        "rows": int(rows),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    }
+    artifacts = [e for e in read_manifest(directory, ticker) if e["path"] != path.name]
+    artifacts.append(entry)
+    artifacts.sort(key=lambda e: (e["kind"], e["yr1"], e["yr2"], e["path"]))
+
+    target = manifest_path(directory, ticker)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_suffix(".json.tmp")
+    with open(tmp, "w") as f:
+        json.dump({"ticker": ticker, "artifacts": artifacts}, f, indent=2, default=str)
+    os.replace(tmp, target)
+    return entry
+
+
+def ticker_index(directory, ticker):
+    """
+    {"by_key": {(kind, yr1, yr2, *KEY_PARAMS): entry}, "by_path": {name: entry}}
+    for one ticker, cached until its manifest file changes.
+    """
+    path = manifest_path(directory, ticker)
+    try:
+        mtime = path.stat().st_mtime_ns
+    except OSError:
+        return {"by_key": {}, "by_path": {}}
+    cached = _INDEX.get(path)
+    if cached is None or cached[0] != mtime:
+        artifacts = read_manifest(directory, ticker)
+        # Entries sharing a key (e.g. a .mat and the .npz converted from it)
+        # resolve to the most recently written file
+        by_key = {}
+        for e in sorted(artifacts, key=lambda e: e["mtime_ns"]):
+            if all(name in e["params"] for name in KEY_PARAMS):
+                by_key[lookup_key(e["kind"], e["yr1"], e["yr2"], e["params"])] = e
+        index = {"by_key": by_key, "by_path": {e["path"]: e for e in artifacts}}
+        cached = _INDEX[path] = (mtime, index)
+    return cached[1]
+
+
+def record_converted(source, target):
+    """
+    Record target, a new file holding the same results as source (e.g. the
+    .npz written by result_store.mat_to_npz), under source's manifest entry.
+    Returns the new entry, or None if source was never recorded.
+    """
+    source, target = Path(source), Path(target)
+    for manifest in source.parent.joinpath(MANIFEST_DIR).glob("*.json"):
+        entry = ticker_index(source.parent, manifest.stem)["by_path"].get(source.name)
+        if entry is not None:
+            return record_artifact(target, entry["ticker"], entry["kind"], entry["yr1"],
+                                   entry["yr2"], entry["rows"], **entry["params"])
+    return None
+
+
+def find_artifact(directory, ticker, kind, yr1, yr2, **params):
+    """Path of the recorded artifact for these keys if it still exists, else None."""
+    entry = ticker_index(directory, ticker)["by_key"].get(lookup_key(kind, yr1, yr2, params))
+    if entry is None:
+        return None
+    path = Path(directory).joinpath(entry["path"])
+    return path if path.exists() else None
+
+
+def recorded_hash(path, ticker):
+    """The manifest's content hash of path, if the file is unchanged since it was recorded."""
+    path = Path(path)
+    entry = ticker_index(path.parent, ticker)["by_path"].get(path.name)
+    if entry is None:
+        return None
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    if (stat.st_size, stat.st_mtime_ns) != (entry["size"], entry["mtime_ns"]):
+        return None
+    return entry["sha256"]
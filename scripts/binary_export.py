@@ -0,0 +1,186 @@
+"""
+Binary sidecar for the bubble JSON exports.
+
+    python scripts/binary_export.py [public/data]    # check every .bin against its .json
+
+Layout of bubble_data_<TICKER>_splitadj_<yr1>to<yr2>.bin:
+
+    b"BUB1" | uint32 LE header length | UTF-8 JSON header | padding | column blocks
+
+The header carries the JSON export's metadata, the date strings, the labels
+of any extra rolling windows and a column table ({name, dtype, offset,
+length}, offsets from the start of the file). Every block is little-endian
+and 8-byte aligned, so the front end can wrap it as a Float64Array view
+without parsing. All columns are float64, exactly the JSON values, so the
+sidecar holds the same content as the JSON export.
+"""
+import json
+import struct
+import sys
+from pathlib import Path
+
+import numpy as np
+
+MAGIC = b"BUB1"
+ALIGN = 8
+PRICE_DTYPE = "float64"
+ESTIMATE_DTYPE = "float64"
+OPTION_TYPES = ("put", "call", "combined")
+ESTIMATE_STATS = ("mu", "lb", "ub")
+# Metadata keys of the JSON export that the sidecar does not carry
+JSON_ONLY_METADATA = ("schema_version",)
+
+
+def sidecar_columns(columns, price_series, rolling_windows=()):
+    """
+    {name: (dtype, values)} for one export, from bubble_estimator.export_columns,
+    the price_series columns and the JSON's rolling_windows (e.g.
+    "time_series/tau_groups/0/put/mu", "rolling_windows/0/tau_groups/0/put/mu").
+    """
+    out = {
+        "time_series/adjusted": (PRICE_DTYPE, columns["adjusted"]),
+        "time_series/regular": (PRICE_DTYPE, columns["regular"]),
+    }
+    for stat in ESTIMATE_STATS:
+        estimates = columns["estimates"][stat]
+        for i in range(estimates.shape[1]):
+            for k, opt in enumerate(OPTION_TYPES):
+                out[f"time_series/tau_groups/{i}/{opt}/{stat}"] = (ESTIMATE_DTYPE, estimates[:, i, k])
+    for key in ("regular", "adjusted"):
+        out[f"price_series/{key}"] = (PRICE_DTYPE, price_series[key])
+    for j, window in enumerate(rolling_windows):
+        for i, group in enumerate(window["tau_groups"]):
+            for opt in OPTION_TYPES:
+                for stat in ESTIMATE_STATS:
+                    out[f"rolling_windows/{j}/tau_groups/{i}/{opt}/{stat}"] = (ESTIMATE_DTYPE, group[opt][stat])
+    return out
+
+
+def _json_default(obj):
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _aligned(n):
+    return -(-n // ALIGN) * ALIGN
+
+
+def write_sidecar(path, metadata, columns, price_series, rolling_windows=()):
+    """Write the binary sidecar for one export (see module docstring)."""
+    blocks = {name: np.asarray(values, dtype=np.dtype(dtype).newbyteorder("<"))
+              for name, (dtype, values)
+              in sidecar_columns(columns, price_series, rolling_windows).items()}
+    header = {
+        "metadata": metadata,
+        "time_series": {"date": columns["date"]},
+        "price_series": {"date": price_series["date"]},
+        "rolling_windows": [{"rolling_window_days": w["rolling_window_days"], "label": w["label"]}
+                            for w in rolling_windows],
+        "columns": [],
+    }
+
+    # Offsets depend on the header size, which depends on the offsets: lay out
+    # once with a guess, then again until the header length is stable.
+    header_len = 0
+    while True:
+        offset = _aligned(len(MAGIC) + 4 + header_len)
+        header["columns"] = []
+        for name, block in blocks.items():
+            header["columns"].append({"name": name, "dtype": block.dtype.name,
+                                      "offset": offset, "length": int(block.size)})
+            offset = _aligned(offset + block.nbytes)
+        encoded = json.dumps(header, separators=(",", ":"), default=_json_default).encode()
+        if len(encoded) == header_len:
+            break
+        header_len = len(encoded)
+
+    with open(path, "wb") as f:
+        f.write(MAGIC + struct.pack("<I", header_len) + encoded)
+        for entry, block in zip(header["columns"], blocks.values()):
+            f.write(b"\0" * (entry["offset"] - f.tell()))
+            f.write(block.tobytes())
+
+
+def read_sidecar(path):
+    """(header, {name: array}) of a sidecar; arrays are views of one buffer."""
+    buf = Path(path).read_bytes()
+    if buf[:4] != MAGIC:
+        raise ValueError(f"{path} is not a bubble sidecar")
+    (header_len,) = struct.unpack_from("<I", buf, 4)
+    header = json.loads(buf[8:8 + header_len])
+    arrays = {entry["name"]: np.frombuffer(buf, dtype=np.dtype(entry["dtype"]).newbyteorder("<"),
+                                           count=entry["length"], offset=entry["offset"])
+              for entry in header["columns"]}
+    return header, arrays
+
+
+def json_sidecar_values(data):
+    """The sidecar's dates and {name: values} as found in a JSON export of either schema."""
+    if data["metadata"].get("schema_version") == 2:
+        series, prices = data["time_series"], data["price_series"]
+        values = {"time_series/adjusted": series["adjusted"], "time_series/regular": series["regular"]}
+        for i, group in enumerate(series["tau_groups"]):
+            for opt in OPTION_TYPES:
+                for stat in ESTIMATE_STATS:
+                    values[f"time_series/tau_groups/{i}/{opt}/{stat}"] = group[opt][stat]
+        dates = series["date"], prices["date"]
+    else:
+        rows, prices = data["time_series_data"], data["price_series_data"]
+        values = {"time_series/adjusted": [r["stock_prices"]["adjusted"] for r in rows],
+                  "time_series/regular": [r["stock_prices"]["regular"] for r in rows]}
+        ngroups = len(rows[0]["bubble_estimates"]["daily_grouped"]) if rows else 0
+        for i in range(ngroups):
+            for opt in OPTION_TYPES:
+                for stat in ESTIMATE_STATS:
+                    values[f"time_series/tau_groups/{i}/{opt}/{stat}"] = [
+                        r["bubble_estimates"]["daily_grouped"][i][opt][stat] for r in rows]
+        prices = {key: [p[key] for p in prices] for key in ("date", "regular", "adjusted")}
+        dates = [r["date"] for r in rows], prices["date"]
+    values["price_series/regular"] = prices["regular"]
+    values["price_series/adjusted"] = prices["adjusted"]
+    for j, window in enumerate(data.get("rolling_windows", [])):
+        for i, group in enumerate(window["tau_groups"]):
+            for opt in OPTION_TYPES:
+                for stat in ESTIMATE_STATS:
+                    values[f"rolling_windows/{j}/tau_groups/{i}/{opt}/{stat}"] = group[opt][stat]
+    return dates, values
+
+
+def check_sidecar(json_path, bin_path):
+    """
+    Raise ValueError unless the sidecar holds the same content as the JSON:
+    same metadata, dates and rolling windows, and identical columns.
+    """
+    with open(json_path) as f:
+        data = json.load(f)
+    header, arrays = read_sidecar(bin_path)
+    (ts_dates, ps_dates), values = json_sidecar_values(data)
+
+    metadata = {k: v for k, v in data["metadata"].items() if k not in JSON_ONLY_METADATA}
+    if header["metadata"] != metadata:
+        raise ValueError(f"{bin_path}: metadata differs from {json_path}")
+    if header["time_series"]["date"] != ts_dates or header["price_series"]["date"] != ps_dates:
+        raise ValueError(f"{bin_path}: dates differ from {json_path}")
+    windows = [{"rolling_window_days": w["rolling_window_days"], "label": w["label"]}
+               for w in data.get("rolling_windows", [])]
+    if header.get("rolling_windows", []) != windows:
+        raise ValueError(f"{bin_path}: rolling windows differ from {json_path}")
+    if set(arrays) != set(values):
+        raise ValueError(f"{bin_path}: columns {sorted(set(arrays) ^ set(values))} differ from {json_path}")
+    for name, block in arrays.items():
+        expected = np.asarray(values[name], dtype=block.dtype)
+        if not np.array_equal(block, expected, equal_nan=True):
+            raise ValueError(f"{bin_path}: column {name} differs from {json_path}")
+
+
+def main():
+    data_dir = Path(sys.argv[1] if len(sys.argv) > 1 else "public/data")
+    sidecars = sorted(data_dir.glob("bubble_data_*.bin"))
+    for bin_path in sidecars:
+        check_sidecar(bin_path.with_suffix(".json"), bin_path)
+    print(f"✅ {len(sidecars)} binary sidecar(s) match their JSON exports")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,12 +4,24 @@ import numpy as np
 import scipy.io as sio
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
-from datetime import datetime, date
+from datetime import datetime, date, timezone
 import pandas as pd
 import json
+import hashlib
+import warnings
 from pathlib import Path
 import glob
-import yfinance as yf
+from functools import partial
+from rolling_stats import RollingWindowStats
+from sbub_split import SPLIT_ADJ_FIELDS, apply_split_factor
+from result_store import ResultStore
+from binary_export import ESTIMATE_STATS, OPTION_TYPES, json_sidecar_values, write_sidecar
+from incremental_export import write_incremental
+from lod_export import lod_levels
+from price_cache import cached_history
+from artifact_manifest import find_artifact
+from year_shard_export import SHARD_YEARS, write_year_shards
+from ticker_pool import parse_workers, run_tickers
 
 # Point to the folder containing downloaded .mat files (from artifact)
 SCRIPT_DIR = Path(os.environ.get("MAT_ARTIFACT_DIR", "./data/mat")).resolve()
@@ -26,6 +38,32 @@ stockcodelist = [ "SPX", "AAPL", "BAC", "C", "MSFT", "META", "GE", "INTC", "CSCO
                   "WFC", "JPM", "AMD", "F", "TSLA", "GOOG", "T", "XOM", "AMZN",
                   "MS", "NVDA", "AIG", "GM", "DIS", "BA"] 
 
+# JSON export schema: 1 = one nested object per date, 2 = compact parallel arrays
+JSON_SCHEMA = int(os.getenv("BUBBLE_JSON_SCHEMA", "1"))
+# Also write a typed-array .bin sidecar next to each JSON (see binary_export.py)
+BINARY_SIDECAR = os.getenv("BUBBLE_BINARY_SIDECAR") == "1"
+# Also maintain the append-only shard/tail/manifest layout (see incremental_export.py)
+INCREMENTAL = os.getenv("BUBBLE_INCREMENTAL") == "1"
+# Also write min/max-decimated copies at lod_export.LOD_TARGETS points to public/data/lod
+LOD = os.getenv("BUBBLE_LOD") == "1"
+# Also write one shard per calendar year plus an index to public/data/years (see year_shard_export.py)
+YEAR_SHARDS = os.getenv("BUBBLE_YEAR_SHARDS") == "1" or bool(SHARD_YEARS)
+
+# Figures: main() renders them after all exports, in a pool (BUBBLE_PLOTS=0 skips them,
+# BUBBLE_PLOT_PNG_ONLY=1 skips the slow EPS copies)
+PLOTS = os.getenv("BUBBLE_PLOTS", "1") != "0"
+PLOT_FORMATS = ("png",) if os.getenv("BUBBLE_PLOT_PNG_ONLY") == "1" else ("eps", "png")
+
+# Cross-ticker overview written by main() (see write_summary)
+SUMMARY_FILENAME = "summary.json"
+
+# Extra rolling windows (trading days) exported next to the 63-day series,
+# e.g. BUBBLE_EXTRA_WINDOWS=21,126,252 (see window_series)
+EXTRA_WINDOWS = [int(w) for w in os.getenv("BUBBLE_EXTRA_WINDOWS", "").split(",") if w.strip()]
+
+# Raw bubout fields read below (columnar stores load only these)
+BUBOUT_USED = ('scene', 'qcdfp_lb', 'qcdfp_ub', 'qcdfc_lb', 'qcdfc_ub', 'tau')
+
 YAHOO_SYMBOL_MAP = {
     "SPX": "^SPX",
 }
@@ -43,77 +81,129 @@ def nzmean(x):
 def nzsum(x):
     return np.nansum(x)
 
-def nw_cov(q, m):
-    mu = np.mean(q)
-    n = len(q)
-    gam = np.zeros(m)
-    cov_val = 0.0
-    for j in range(1, m + 1):
-        gam[j - 1] = np.sum((q[:n - j] - mu) * (q[j:] - mu)) / n
-        cov_val += (1 - j / (m + 1)) * gam[j - 1]
-    return cov_val
+def cell_tau_panel(bubout, tau, cp, nperiod, ntau):
+    """
+    Maturity of every (period, tau) result cell, NaN in the padding.
+
+    Read from bubout['tau'] as saved by sbub_run; results files written before
+    it was stored get the common put/call taulist rebuilt from dataout.
+    """
+    if 'tau' in bubout:
+        return np.asarray(bubout['tau'], dtype=float)
+    panel = np.full((nperiod, ntau), np.nan)
+    for t in range(nperiod):
+        tau_t = np.atleast_1d(tau[t])
+        cp_bool = np.atleast_1d(cp[t]) != 0
+        taulist = np.intersect1d(np.unique(tau_t[~cp_bool]), np.unique(tau_t[cp_bool]))[:ntau]
+        panel[t, :taulist.size] = taulist
+    return panel
+
+def group_nzmean(x, ingp, ngp):
+    """nzmean of x over each tau group: nperiod x ntau values, nperiod x ntau x ntaugp mask -> nperiod x ntaugp (0 for empty groups)."""
+    masked = np.where(ingp, np.asarray(x)[:, :, None], np.nan)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN groups stay NaN
+        mean = np.nanmean(masked, axis=1)
+    return np.where(ngp > 0, mean, 0).astype(float)
+
+def group_se(se, ingp, ngp):
+    """sqrt(nzsum(se^2)) / ngp over each tau group (0 for empty groups)."""
+    se = np.asarray(se)
+    total = np.nansum(np.where(ingp, se[:, :, None] ** 2, np.nan), axis=1)
+    return np.where(ngp > 0, np.sqrt(total) / np.maximum(ngp, 1).astype(se.dtype), 0).astype(float)
+
+def forward_fill_above(x, start, stop, limit):
+    """
+    In place: entries of rows start..stop-1 above limit take the previous row's
+    (already filled) value, i.e. the last row at or after start-1 within limit.
+    """
+    if stop <= start:
+        return
+    block = x[start - 1:stop]
+    keep = ~(block > limit)
+    keep[0] = True
+    src = np.where(keep, np.arange(block.shape[0])[:, None], 0)
+    np.maximum.accumulate(src, axis=0, out=src)
+    block[...] = np.take_along_axis(block, src, axis=0)
+
+def nw_lags(window):
+    """Newey-West lag count used for a rolling window of the given length."""
+    return int(np.ceil(window ** 0.25))
+
+def rolling_bands(stats, window, ends):
+    """
+    (mu, se, bc_mu, bc_lb, bc_ub) of the window-day rolling averages ending
+    at each of ends, from the shared RollingWindowStats in stats.
+    """
+    mc = nw_lags(window)
+    nvt = np.minimum(ends + 1, window)[:, None, None]  # actual number of points
+    mu = stats["mu"].mean(window, ends)
+    se = np.sqrt(stats["se2"].sum(window, ends) + 2 * stats["mu"].nw_cov(window, ends, mc)) / nvt
+    bc_mu = stats["bc_mu"].mean(window, ends)
+    bc_lb = stats["bc_lb"].mean(window, ends) - 1.96 * se
+    bc_ub = stats["bc_ub"].mean(window, ends) + 1.96 * se
+    return mu, se, bc_mu, bc_lb, bc_ub
+
+def window_series(window, bands, ntaugp):
+    """One extra rolling window as a labeled series of per tau group/option type arrays."""
+    _, _, bc_mu, bc_lb, bc_ub = bands
+    estimates = {stat: np.where(np.isnan(x), 0.0, x)
+                 for stat, x in zip(ESTIMATE_STATS, (bc_mu, bc_lb, bc_ub))}
+    return {
+        "rolling_window_days": window,
+        "label": f"{window}d",
+        "tau_groups": [
+            {opt: {stat: estimates[stat][:, i, k].tolist() for stat in ESTIMATE_STATS}
+             for k, opt in enumerate(OPTION_TYPES)}
+            for i in range(ntaugp)
+        ],
+    }
+
+def find_result_file(stockcode, splitadj):
+    """
+    A ticker's raw or split-adjusted results for the export years, resolved
+    through sbub_run's artifact manifest. Directories written before the
+    manifest fall back to globbing: the .npz store when present, else the .mat.
+    """
+    yr1, yr2 = export_years()
+    path = find_artifact(SCRIPT_DIR, stockcode, "splitadj" if splitadj else "raw", yr1, yr2,
+                         opth=0, hnumsd=5, nstep=200)
+    if path is not None:
+        return path
+    for ext in ("npz", "mat"):
+        if splitadj:
+            files = list(SCRIPT_DIR.glob(f"optout_{stockcode}_*_splitadj_h0_hsd5_nstep200.{ext}"))
+        else:
+            files = [f for f in SCRIPT_DIR.glob(f"optout_{stockcode}_*_h0_hsd5_nstep200.{ext}")
+                     if "_splitadj_" not in f.name]
+        if files:
+            return files[0]
+    return None
 
 def to_yahoo_symbol(symbol):
     return YAHOO_SYMBOL_MAP.get(symbol, symbol)
 
-def finite_price(value):
-    if value is None or pd.isna(value):
-        return None
-    value = float(value)
-    return value if np.isfinite(value) else None
-
 def download_canonical_price_series(stockcode, start_date, end_date):
+    """
+    Canonical Yahoo prices as (price_series_data, {date: point}), through the
+    local price cache (see price_cache.py).
+    """
     yahoo_symbol = to_yahoo_symbol(stockcode)
     end_exclusive = (pd.to_datetime(end_date) + pd.Timedelta(days=1)).strftime("%Y-%m-%d")
     print(f"Downloading canonical Yahoo prices for {stockcode} ({yahoo_symbol})...")
 
-    history = yf.download(
-        yahoo_symbol,
-        start=start_date,
-        end=end_exclusive,
-        auto_adjust=False,
-        actions=True,
-        progress=False,
-    )
-
-    if history.empty:
+    history = cached_history(yahoo_symbol, start_date, end_exclusive)
+    if history is None:
         raise ValueError(f"Yahoo returned no daily price history for {stockcode}")
 
-    if isinstance(history.columns, pd.MultiIndex):
-        if yahoo_symbol in history.columns.get_level_values(-1):
-            history = history.xs(yahoo_symbol, axis=1, level=-1)
-        else:
-            history.columns = history.columns.get_level_values(0)
-
-    history = history.reset_index()
-    date_column = "Date" if "Date" in history.columns else history.columns[0]
-    if "Close" not in history.columns:
-        raise ValueError(f"Yahoo price history for {stockcode} is missing Close")
-
-    has_adj_close = "Adj Close" in history.columns
-    price_series = []
-    price_map = {}
-
-    for _, row in history.iterrows():
-        regular = finite_price(row.get("Close"))
-        adjusted = finite_price(row.get("Adj Close")) if has_adj_close else regular
-        if adjusted is None:
-            adjusted = regular
-        if regular is None or adjusted is None:
-            continue
-
-        date_str = pd.to_datetime(row[date_column]).strftime("%Y-%m-%d")
-        point = {
-            "date": date_str,
-            "regular": regular,
-            "adjusted": adjusted,
-        }
-        price_series.append(point)
-        price_map[date_str] = point
-
-    if not price_series:
+    dates, regular, adjusted = history
+    if dates.size == 0:
         raise ValueError(f"Yahoo price history for {stockcode} had no finite close prices")
 
+    price_series = [{"date": date_str, "regular": r, "adjusted": a}
+                    for date_str, r, a in zip(np.datetime_as_string(dates, unit="D").tolist(),
+                                              regular.tolist(), adjusted.tolist())]
+    price_map = {point["date"]: point for point in price_series}
     return price_series, price_map
 
 class NumpyEncoder(json.JSONEncoder):
@@ -128,14 +218,392 @@ class NumpyEncoder(json.JSONEncoder):
             return obj.isoformat()
         return super(NumpyEncoder, self).default(obj)
 
-def process_stock(stockcode):
-    """Process a single stock and generate JSON"""
+def export_columns(stockcode, datenums, bc_mu, bc_lb, bc_ub, canonical_price_map):
+    """
+    Per-date columns shared by the JSON schemas: ISO dates, canonical Yahoo
+    prices, and {stat: ndates x ntaugp x 3 array} with NaN estimates as 0.
+    """
+    dates = [matlab_datenum_to_datetime(dn).isoformat() for dn in datenums]
+    prices = []
+    for date_key in dates:
+        canonical_price = canonical_price_map.get(date_key)
+        if canonical_price is None:
+            raise ValueError(
+                f"No canonical Yahoo close price for {stockcode} on bubble date {date_key}"
+            )
+        prices.append(canonical_price)
+    estimates = {stat: np.where(np.isnan(x), 0.0, x).astype(float)
+                 for stat, x in zip(ESTIMATE_STATS, (bc_mu, bc_lb, bc_ub))}
+    return {
+        "date": [d + "T00:00:00" for d in dates],
+        "adjusted": [p["adjusted"] for p in prices],
+        "regular": [p["regular"] for p in prices],
+        "estimates": estimates,
+    }
+
+def time_series_rows(columns):
+    """Schema 1 time_series_data: one nested object per date."""
+    values = {stat: x.tolist() for stat, x in columns["estimates"].items()}
+    rows = []
+    for t, date_str in enumerate(columns["date"]):
+        daily_grouped = [
+            {opt: {stat: values[stat][t][i][k] for stat in ESTIMATE_STATS}
+             for k, opt in enumerate(OPTION_TYPES)}
+            for i in range(len(values["mu"][t]))
+        ]
+        rows.append({
+            "date": date_str,
+            "stock_prices": {
+                "adjusted": columns["adjusted"][t],
+                "regular": columns["regular"][t]
+            },
+            "bubble_estimates": {
+                "daily_grouped": daily_grouped
+            }
+        })
+    return rows
+
+def time_series_columns(columns, ntaugp):
+    """Schema 2 time_series: parallel arrays, one per tau group/option type/stat."""
+    estimates = columns["estimates"]
+    return {
+        "date": columns["date"],
+        "adjusted": columns["adjusted"],
+        "regular": columns["regular"],
+        "tau_groups": [
+            {opt: {stat: estimates[stat][:, i, k].tolist() for stat in ESTIMATE_STATS}
+             for k, opt in enumerate(OPTION_TYPES)}
+            for i in range(ntaugp)
+        ],
+    }
+
+def price_series_columns(price_series_data):
+    """Schema 2 price_series: the canonical Yahoo prices as parallel arrays."""
+    return {key: [point[key] for point in price_series_data]
+            for key in ("date", "regular", "adjusted")}
+
+def write_lod_exports(stem, metadata, columns, ntaugp):
+    """Schema 2 level-of-detail files <stem>.lod<N>.json, removing levels that no longer apply."""
+    lod_dir = DATA_DIR.joinpath("lod")
+    lod_dir.mkdir(parents=True, exist_ok=True)
+    written = set()
+    for target, lod_columns in lod_levels(columns).items():
+        path = lod_dir.joinpath(f"{stem}.lod{target}.json")
+        lod_metadata = dict(metadata, schema_version=2,
+                            lod={"target": target, "method": "minmax",
+                                 "source_points": len(columns["date"])})
+        write_json({"metadata": lod_metadata,
+                    "time_series": time_series_columns(lod_columns, ntaugp)}, path, schema=2)
+        written.add(path)
+    for path in lod_dir.glob(f"{stem}.lod*.json"):
+        if path not in written:
+            path.unlink()
+
+def write_year_exports(stem, metadata, columns, price_series_data, window_dates, ntaugp):
+    """Year shards in the configured JSON schema, each a standalone export for its dates."""
+    def build(year_columns, prices, year):
+        shard_metadata = {"stockcode": metadata["stockcode"], "year": year}
+        if JSON_SCHEMA == 2:
+            return {"metadata": dict(shard_metadata, schema_version=2),
+                    "time_series": time_series_columns(year_columns, ntaugp),
+                    "price_series": price_series_columns(prices)}
+        return {"metadata": shard_metadata,
+                "time_series_data": time_series_rows(year_columns),
+                "price_series_data": prices}
+
+    metadata = {k: v for k, v in metadata.items() if k != "schema_version"}
+    written, reused = write_year_shards(DATA_DIR, stem, metadata, columns, price_series_data,
+                                        window_dates, build, SHARD_YEARS)
+    print(f"Year shards: {written} written, {reused} unchanged")
+
+def write_json(json_data, path, schema=1):
+    """
+    Schema 1 is pretty-printed; schema 2 goes through the compact C encoder in
+    one shot. Returns the sha256 of the written file.
+    """
+    if schema == 2:
+        text = json.dumps(json_data, separators=(",", ":"), cls=NumpyEncoder)
+    else:
+        text = json.dumps(json_data, indent=2, cls=NumpyEncoder)
+    with open(path, 'w') as f:
+        f.write(text)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+def summary_entry(json_filepath, digest, metadata, columns):
+    """
+    One ticker's summary.json entry, from the columns just exported: latest
+    prices and estimates, and the min/max of each mu over the last rolling window.
+    """
+    n = len(columns["date"])
+    entry = {
+        "file": json_filepath.name,
+        "sha256": digest,
+        "first_date": metadata["time_series_start_date"],
+        "last_date": metadata["time_series_end_date"],
+        "count": n,
+        "latest": None,
+        "recent": None,
+    }
+    if n == 0:
+        return entry
+    estimates = columns["estimates"]
+    ntaugp = estimates["mu"].shape[1]
+    entry["latest"] = {
+        "adjusted": columns["adjusted"][-1],
+        "regular": columns["regular"][-1],
+        "tau_groups": [
+            {opt: {stat: float(estimates[stat][-1, i, k]) for stat in ESTIMATE_STATS}
+             for k, opt in enumerate(OPTION_TYPES)}
+            for i in range(ntaugp)
+        ],
+    }
+    window = estimates["mu"][-metadata["rolling_window_days"]:]
+    low, high = window.min(axis=0), window.max(axis=0)
+    entry["recent"] = {
+        "start_date": columns["date"][-len(window)][:10],
+        "tau_groups": [
+            {opt: {"min": float(low[i, k]), "max": float(high[i, k])}
+             for k, opt in enumerate(OPTION_TYPES)}
+            for i in range(ntaugp)
+        ],
+    }
+    return entry
+
+def json_summary_entry(json_filepath):
+    """summary_entry for an export already on disk (e.g. one a pipeline run left unchanged), or None."""
+    json_filepath = Path(json_filepath)
+    try:
+        content = json_filepath.read_bytes()
+    except OSError:
+        return None
+    data = json.loads(content)
+    (dates, _), values = json_sidecar_values(data)
+    columns = {
+        "date": dates,
+        "adjusted": values["time_series/adjusted"],
+        "regular": values["time_series/regular"],
+        "estimates": {},
+    }
+    if dates:
+        ntaugp = len(data["metadata"]["tau_groups_info"])
+        for stat in ESTIMATE_STATS:
+            columns["estimates"][stat] = np.array(
+                [[values[f"time_series/tau_groups/{i}/{opt}/{stat}"] for opt in OPTION_TYPES]
+                 for i in range(ntaugp)], dtype=float).transpose(2, 0, 1)
+    return summary_entry(json_filepath, hashlib.sha256(content).hexdigest(), data["metadata"], columns)
+
+def write_summary(entries, failed=(), merge=False):
+    """
+    public/data/summary.json: every exported ticker's headline numbers in one small file.
+    merge=True (runs over a subset of tickers) keeps the other tickers' entries from the existing file.
+    """
+    entries, failed = dict(entries), list(failed)
+    path = DATA_DIR.joinpath(SUMMARY_FILENAME)
+    if merge and path.exists():
+        with open(path) as f:
+            previous = json.load(f)
+        entries = {**{t: e for t, e in previous.get("tickers", {}).items() if t not in failed}, **entries}
+        failed += [t for t in previous.get("failed", []) if t not in entries and t not in failed]
+    summary = {
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "tickers": entries,
+        "failed": failed,
+    }
+    write_json(summary, path)
+    print(f"Summary of {len(entries)} ticker(s) saved to {path}")
+
+def plot_series_path(stockcode, yr1, yr2):
+    return IMG_DIR.joinpath(f"bub_{stockcode.lstrip('^')}_splitadj_{yr1}to{yr2}_series.npz")
+
+def plot_hash_path(stockcode, yr1, yr2):
+    return IMG_DIR.joinpath(f"bub_{stockcode.lstrip('^')}_splitadj_{yr1}to{yr2}_series.sha256")
+
+def plot_image_paths(stockcode, yr1, yr2):
+    bases = [f"bub{tag}_{stockcode.lstrip('^')}_splitadj_{yr1}to{yr2}" for tag in ['p', 'c', 'cp']]
+    return [IMG_DIR.joinpath(f"{base}.{ext}") for base in bases for ext in PLOT_FORMATS]
+
+def plot_series_hash(stockcode, series):
+    """Hash of everything a render depends on: the plotted arrays, ticker and formats."""
+    digest = hashlib.sha256(f"{stockcode}|{','.join(PLOT_FORMATS)}".encode())
+    for key in ('dates', 'bc_mu', 'bc_lb', 'bc_ub', 'sout'):
+        x = np.ascontiguousarray(series[key])
+        digest.update(f"{key}{x.dtype}{x.shape}".encode())
+        digest.update(x.tobytes())
+    return digest.hexdigest()
+
+def save_plot_series(stockcode, yr1, yr2, dates, bc_mu, bc_lb, bc_ub, sout):
+    """Save the plotted arrays so a later plot stage can render them without recomputing."""
+    np.savez(plot_series_path(stockcode, yr1, yr2),
+             dates=dates, bc_mu=bc_mu, bc_lb=bc_lb, bc_ub=bc_ub, sout=sout)
+
+def plot_saved_series(stockcode, yr1, yr2, force=False):
+    """
+    Render the figures from the saved plot arrays unless the images already
+    exist for arrays with the same hash. Returns True if it rendered.
+    """
+    with np.load(plot_series_path(stockcode, yr1, yr2)) as series:
+        series = {key: series[key] for key in series.files}
+    digest = plot_series_hash(stockcode, series)
+    hash_path = plot_hash_path(stockcode, yr1, yr2)
+    if (not force and hash_path.exists() and hash_path.read_text().strip() == digest
+            and all(path.exists() for path in plot_image_paths(stockcode, yr1, yr2))):
+        print(f"⏭️  {stockcode}: plotted arrays unchanged, keeping existing figures")
+        return False
+    plot_bubble_series(stockcode, yr1, yr2, series['dates'], series['bc_mu'],
+                       series['bc_lb'], series['bc_ub'], series['sout'])
+    hash_path.write_text(digest + "\n")
+    return True
+
+def plot_stock(stockcode):
+    """Plot stage for one ticker (main() runs it across tickers after the JSON exports)."""
+    yr1, yr2 = export_years()
+    if not plot_series_path(stockcode, yr1, yr2).exists():
+        print(f"No saved plot arrays for {stockcode}, skipping its figures.")
+        return False
+    plot_saved_series(stockcode, yr1, yr2)
+    return True
+
+def plot_bubble_series(stockcode, yr1, yr2, dates, bc_mu, bc_lb, bc_ub, sout):
+    """Put, call and combined bubble figures (PLOT_FORMATS) over the plotted dates."""
+    esttitle = [r'$\hat\Pi_{p}(\tau)$', r'$\hat\Pi_{c}(\tau)$', r'$\hat\Pi_{cp}(\tau)$']
+    legname4 = [r'$\hat\Pi(\tau),\tau\in(0.25\mp 0.1)$',
+                r'$\hat\Pi(\tau),\tau\in(0.5\mp 0.15)$',
+                r'$\hat\Pi(\tau),\tau\in(1\mp 0.25)$',
+                f"{stockcode}"]
+    cptag = ['p', 'c', 'cp']
+
+    # MATLAB datenums to calendar days, so the date locator places the ticks
+    dates = (np.asarray(dates, dtype=np.int64) - 366 - date(1970, 1, 1).toordinal()).astype('datetime64[D]')
+
+    for idx, j in enumerate(range(3), start=1):
+        # Construct the bubble estimate plot for each of the three series.
+        rbubplot = np.column_stack((
+            bc_mu[:, 0, j],
+            bc_mu[:, 1, j],
+            bc_mu[:, 2, j]
+        ))
+        # Adjusted price series (sout) is plotted on the right axis.
+        rsplot = sout
+
+        if len(dates) == 0:
+            print(f"No data for plot index {j}, skipping this figure.")
+            continue
+
+        # Create a new figure.
+        fig, ax1 = plt.subplots(figsize=(8, 4))
+        ax1.set_ylabel('Bubble Estimate')
+
+        # Plot each bubble estimate curve on the left axis.
+        for col in range(rbubplot.shape[1]):
+            ax1.plot(dates, rbubplot[:, col], label=legname4[col])
+
+        # Fill confidence intervals for each series.
+        ax1.fill_between(dates, bc_lb[:, 0, j], bc_ub[:, 0, j], color='blue', alpha=0.5)
+        ax1.fill_between(dates, bc_lb[:, 1, j], bc_ub[:, 1, j], color='blue', alpha=0.3)
+        ax1.fill_between(dates, bc_lb[:, 2, j], bc_ub[:, 2, j], color='blue', alpha=0.2)
+
+        ax1.set_xlim([dates[0], dates[-1]])
+
+        # A handful of ticks at round dates, whatever the history length
+        locator = mdates.AutoDateLocator(maxticks=10)
+        ax1.xaxis.set_major_locator(locator)
+        ax1.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+
+        # Right axis: plot the adjusted price series.
+        ax2 = ax1.twinx()
+        ax2.plot(dates, rsplot, label="Adjusted Price", color='red')
+        ax2.set_ylabel("Adjusted Price")
+
+        # Add legend and title.
+        ax1.legend(loc='upper left', fontsize=12)
+        ax1.set_title(esttitle[j], fontsize=12)
+
+        fig.tight_layout()
+
+        # Save figure in each of PLOT_FORMATS
+        base = f"bub{cptag[j]}_{stockcode.lstrip('^')}_splitadj_{yr1}to{yr2}"
+        for ext in PLOT_FORMATS:
+            plt.savefig(IMG_DIR.joinpath(f"{base}.{ext}"), format=ext)
+        plt.close(fig)
+
+def load_stock_results(stockcode):
+    """Find and load a ticker's result files; returns (adjout, bubout, setout, dataout) or None."""
+    # Construct full paths for loading the result files (.npz or .mat)
+    # The files are now expected to be in the same directory as the script
+    dataname2_path = find_result_file(stockcode, splitadj=True)
+    if dataname2_path:
+        print(f"Using split-adjusted results file: {dataname2_path}")
+    else:
+        print(f"No split-adjusted results file found for {stockcode}")
+        return None
+    
+    reference_file_path = find_result_file(stockcode, splitadj=False)
+    if reference_file_path:
+        print(f"Using reference results file: {reference_file_path}")
+    else:
+        print(f"No reference results file found for {stockcode}")
+        return None
+
+    try:
+        # Load the split-adjusted file for adjout
+        if dataname2_path.suffix == ".npz":
+            adjout = ResultStore(dataname2_path).load('adjout')
+        else:
+            mat_data = sio.loadmat(dataname2_path, squeeze_me=True)
+            adjout = {name: mat_data['adjout'][name].item() if mat_data['adjout'][name].size == 1
+                      else mat_data['adjout'][name]
+                      for name in mat_data['adjout'].dtype.names}
+
+        if reference_file_path.suffix == ".npz":
+            # Columnar store: memory-map only the fields used below
+            store = ResultStore(reference_file_path)
+            lazy_split = 'sbub_qcdf_adj' not in adjout
+            bubout = store.load('bubout', BUBOUT_USED + (SPLIT_ADJ_FIELDS if lazy_split else ()))
+            setout = store.load('setout', ['nperiod'])
+            dataout = store.load('dataout', ['tau', 'cp', 'da', 'sout'])
+        else:
+            # Load the non-split-adjusted file for bubout, setout, dataout
+            mat_data1 = sio.loadmat(reference_file_path, squeeze_me=True)
+            bubout = {name: mat_data1['bubout'][name].item() if mat_data1['bubout'][name].size == 1
+                      else mat_data1['bubout'][name]
+                      for name in mat_data1['bubout'].dtype.names}
+            setout = {name: mat_data1['setout'][name].item() if mat_data1['setout'][name].size == 1
+                      else mat_data1['setout'][name]
+                      for name in mat_data1['setout'].dtype.names}
+            dataout = {name: mat_data1['dataout'][name].item() if mat_data1['dataout'][name].size == 1
+                       else mat_data1['dataout'][name]
+                       for name in mat_data1['dataout'].dtype.names}
+
+        # Factor-only split files: apply the split adjustment lazily
+        if 'sbub_qcdf_adj' not in adjout:
+            adjout.update(apply_split_factor(bubout, dataout['sout'], adjout['split_factor']))
+    except FileNotFoundError:
+        print(f"ERROR: One or more result files not found for {stockcode} in the script directory: {SCRIPT_DIR}")
+        print(f"  Missing: {dataname2_path} or {reference_file_path}")
+        return None
+    except Exception as e:
+        print(f"An error occurred while loading result files for {stockcode}: {e}")
+        return None
+
+    return adjout, bubout, setout, dataout
+
+def export_years():
+    """(yr1, yr2) of the exports: 2025 through the current year."""
+    return '2025', str(datetime.now().year)
+
+def process_stock(stockcode, plot=True, results=None):
+    """
+    Process a single stock and generate JSON.
+
+    results=(adjout, bubout, setout, dataout) skips the file lookup (fused
+    sbub_run --export-json); plot=False only saves the plot inputs, for plot_stock.
+    Returns the ticker's summary.json entry, or False on failure.
+    """
     print(f"\n{'='*50}")
     print(f"Processing {stockcode}...")
     print(f"{'='*50}")
 
-    current_year = datetime.now().year
-    yr1, yr2 = '2025', str(current_year)
+    yr1, yr2 = export_years()
     startday = f'01JAN{yr1}'
     endday   = f'31DEC{yr2}'
     price_series_data, canonical_price_map = download_canonical_price_series(
@@ -147,51 +615,11 @@ def process_stock(stockcode):
 
     scode, bubwin0, nstep, opth, hnumsd = stockcode, 63, 200, 0, 5
 
-    # Construct full paths for loading .mat files
-    # The files are now expected to be in the same directory as the script
-    splitadj_files = list(SCRIPT_DIR.glob(f"optout_{stockcode}_*_splitadj_h0_hsd5_nstep200.mat"))
-    if splitadj_files:
-        dataname2_path = splitadj_files[0]
-        print(f"Using split-adjusted .mat file: {dataname2_path}")
-    else:
-        print(f"No split-adjusted .mat file found for {stockcode}")
-        return False
-    
-    ref_files = list(SCRIPT_DIR.glob(f"optout_{stockcode}_*_h0_hsd5_nstep200.mat"))
-    # exclude the split-adjusted file
-    ref_files = [f for f in ref_files if "_splitadj_" not in f.name]
-    if ref_files:
-        reference_file_path = ref_files[0]
-        print(f"Using reference .mat file: {reference_file_path}")
-    else:
-        print(f"No reference .mat file found for {stockcode}")
-        return False
-
-    try:
-        # Load the split-adjusted file for adjout
-        mat_data = sio.loadmat(dataname2_path, squeeze_me=True)
-        adjout = {name: mat_data['adjout'][name].item() if mat_data['adjout'][name].size == 1
-                  else mat_data['adjout'][name]
-                  for name in mat_data['adjout'].dtype.names}
-
-        # Load the non-split-adjusted file for bubout, setout, dataout
-        mat_data1 = sio.loadmat(reference_file_path, squeeze_me=True)
-        bubout = {name: mat_data1['bubout'][name].item() if mat_data1['bubout'][name].size == 1
-                  else mat_data1['bubout'][name]
-                  for name in mat_data1['bubout'].dtype.names}
-        setout = {name: mat_data1['setout'][name].item() if mat_data1['setout'][name].size == 1
-                  else mat_data1['setout'][name]
-                  for name in mat_data1['setout'].dtype.names}
-        dataout = {name: mat_data1['dataout'][name].item() if mat_data1['dataout'][name].size == 1
-                   else mat_data1['dataout'][name]
-                   for name in mat_data1['dataout'].dtype.names}
-    except FileNotFoundError:
-        print(f"ERROR: One or more .mat files not found for {stockcode} in the script directory: {SCRIPT_DIR}")
-        print(f"  Missing: {dataname2_path} or {reference_file_path}")
-        return False
-    except Exception as e:
-        print(f"An error occurred while loading .mat files for {stockcode}: {e}")
-        return False
+    if results is None:
+        results = load_stock_results(stockcode)
+        if results is None:
+            return False
+    adjout, bubout, setout, dataout = results
 
     # Explicitly load tau, cp, and dab from dataout.
     tau = dataout['tau']  # Expecting a NumPy array of 1066 elements
@@ -262,18 +690,12 @@ def process_stock(stockcode):
     ti = np.where((dab_numeric >= st_dn) & (dab_numeric <= end_dn))[0]
 
     # ============================
-    # Impose the super big entry fix.
+    # Impose the super big entry fix: SEs above semax carry the previous date's value forward.
     # ============================
     if ti.size > 0:
         max_t = min(ti[-1] + 1, sbub_qcdf.shape[0])
-        for t in range(max(1, ti[0]), max_t):
-            for i in range(ntaugp):
-                if sbub_qcdf_se[t, i] > semax:
-                    sbub_qcdf_se[t, i] = sbub_qcdf_se[t - 1, i]
-                if sbub_qcdfp_se[t, i] > semax:
-                    sbub_qcdfp_se[t, i] = sbub_qcdfp_se[t - 1, i]
-                if sbub_qcdfc_se[t, i] > semax:
-                    sbub_qcdfc_se[t, i] = sbub_qcdfc_se[t - 1, i]
+        for se in (sbub_qcdf_se, sbub_qcdfp_se, sbub_qcdfc_se):
+            forward_fill_above(se[:, :ntaugp], max(1, ti[0]), max_t, semax)
 
     # --- Bubble estimates by group ---
     sbubcdf_mu      = np.zeros((nperiod, ntaugp, 3))
@@ -286,35 +708,26 @@ def process_stock(stockcode):
     sbubcdf_bc_mu_adj = np.zeros((nperiod, ntaugp, 3))
 
     # --- Bubble estimates by tau group ---
+    # Group membership of every (period, tau) cell as one nperiod x ntau x ntaugp
+    # mask; the last axis of each result is put (0), call (1) and combined (2).
     if ti.size > 0:
-        for t in range(nperiod):
-            tau_t = np.atleast_1d(tau[t])
-            cp_t  = np.atleast_1d(cp[t])
-            cp_bool = (cp_t != 0)
-            ptaulist = np.unique(tau_t[np.logical_not(cp_bool)])
-            ctaulist = np.unique(tau_t[cp_bool])
-            taulist = np.intersect1d(ptaulist, ctaulist)
-            for i in range(ntaugp):
-                # Find indices in taulist within the current tau group
-                gp = np.where((taulist >= taulb[i]) & (taulist <= tauub[i]))[0]
-                valid_gp = gp[gp < sbub_qcdfp.shape[1]]  # Filter out invalid indices
-                ngp = valid_gp.size
-
-                if ngp > 0:
-                    # Note: MATLAB third-dimension indices 1,2,3 correspond to 0,1,2 here.
-                    sbubcdf_bc_mu[t, i, 0] = nzmean(sbub_qcdfp[t, valid_gp] + qcdfp_bias[t, valid_gp])
-                    sbubcdf_bc_mu[t, i, 1] = nzmean(sbub_qcdfc[t, valid_gp] + qcdfc_bias[t, valid_gp])
-                    sbubcdf_bc_mu[t, i, 2] = nzmean(sbub_qcdf[t, valid_gp]  + qcdf_bias[t, valid_gp])
-                    sbubcdf_se[t, i, 0] = np.sqrt(nzsum(sbub_qcdfp_se[t, valid_gp]**2)) / ngp
-                    sbubcdf_se[t, i, 1] = np.sqrt(nzsum(sbub_qcdfc_se[t, valid_gp]**2)) / ngp
-                    sbubcdf_se[t, i, 2] = np.sqrt(nzsum(sbub_qcdf_se[t, valid_gp]**2))  / ngp
-                    # Compute corrected confidence bounds.
-                    sbubcdf_bc_ub[t, i, 0] = sbubcdf_bc_mu[t, i, 0] - nzmean(qcdf_Ap_lb[t, valid_gp])
-                    sbubcdf_bc_ub[t, i, 1] = sbubcdf_bc_mu[t, i, 1] - nzmean(qcdf_Ac_lb[t, valid_gp])
-                    sbubcdf_bc_ub[t, i, 2] = sbubcdf_bc_mu[t, i, 2] - nzmean(qcdf_A_lb[t, valid_gp])
-                    sbubcdf_bc_lb[t, i, 0] = sbubcdf_bc_mu[t, i, 0] - nzmean(qcdf_Ap_ub[t, valid_gp])
-                    sbubcdf_bc_lb[t, i, 1] = sbubcdf_bc_mu[t, i, 1] - nzmean(qcdf_Ac_ub[t, valid_gp])
-                    sbubcdf_bc_lb[t, i, 2] = sbubcdf_bc_mu[t, i, 2] - nzmean(qcdf_A_ub[t, valid_gp])
+        taucell = cell_tau_panel(bubout, tau, cp, nperiod, ntau)
+        ingp = (taucell[:, :, None] >= taulb) & (taucell[:, :, None] <= tauub)
+        ngp = ingp.sum(axis=1)
+
+        sbubcdf_bc_mu[...] = np.stack([group_nzmean(sbub_qcdfp + qcdfp_bias, ingp, ngp),
+                                       group_nzmean(sbub_qcdfc + qcdfc_bias, ingp, ngp),
+                                       group_nzmean(sbub_qcdf + qcdf_bias, ingp, ngp)], axis=-1)
+        sbubcdf_se[...] = np.stack([group_se(sbub_qcdfp_se, ingp, ngp),
+                                    group_se(sbub_qcdfc_se, ingp, ngp),
+                                    group_se(sbub_qcdf_se, ingp, ngp)], axis=-1)
+        # Compute corrected confidence bounds.
+        sbubcdf_bc_ub[...] = sbubcdf_bc_mu - np.stack([group_nzmean(qcdf_Ap_lb, ingp, ngp),
+                                                       group_nzmean(qcdf_Ac_lb, ingp, ngp),
+                                                       group_nzmean(qcdf_A_lb, ingp, ngp)], axis=-1)
+        sbubcdf_bc_lb[...] = sbubcdf_bc_mu - np.stack([group_nzmean(qcdf_Ap_ub, ingp, ngp),
+                                                       group_nzmean(qcdf_Ac_ub, ingp, ngp),
+                                                       group_nzmean(qcdf_A_ub, ingp, ngp)], axis=-1)
 
     # --- Rolling-window averages ---
     rsbubcdf_mu    = np.zeros((nperiod, ntaugp, 3))
@@ -323,37 +736,38 @@ def process_stock(stockcode):
     rsbubcdf_bc_lb = np.zeros((nperiod, ntaugp, 3))
     rsbubcdf_bc_ub = np.zeros((nperiod, ntaugp, 3))
 
+    # BUBBLE_SHARD_YEARS=2023,... regenerates only those year shards. The SE fix
+    # and grouping above cover every period, and each rolling window below only
+    # reaches back bubwin0 - 1 periods into them, so the restriction is exact.
+    if SHARD_YEARS:
+        ti = ti[np.isin([matlab_datenum_to_datetime(d).year for d in dab_numeric[ti]], list(SHARD_YEARS))]
+
     # Use a partial rolling window before the full 63-observation window is available.
     # Without this, pre-window Yahoo rows are exported as zero-valued estimates/CIs.
     tii = ti
     
-    mc = int(np.ceil(bubwin0 ** 0.25))
-    
-    if tii.size > 0:
-        for t in tii:
-            vt = np.arange(max(0, t - bubwin0 + 1), t + 1)
-            for i in range(ntaugp):
-                for j in range(3):
-                    rsbubcdf_mu[t, i, j] = nzmean(sbubcdf_mu[vt, i, j])
-                    rsbubcdf_se[t, i, j] = np.sqrt(
-                        nzsum(sbubcdf_se[vt, i, j] ** 2) + 2 * nw_cov(sbubcdf_mu[vt, i, j], mc)
-                    ) / len(vt)  # divide by actual number of points
-                    rsbubcdf_bc_mu[t, i, j] = nzmean(sbubcdf_bc_mu[vt, i, j])
-                    rsbubcdf_bc_lb[t, i, j] = nzmean(sbubcdf_bc_lb[vt, i, j]) - 1.96 * rsbubcdf_se[t, i, j]
-                    rsbubcdf_bc_ub[t, i, j] = nzmean(sbubcdf_bc_ub[vt, i, j]) + 1.96 * rsbubcdf_se[t, i, j]
-
+    # bubwin0 plus any BUBBLE_EXTRA_WINDOWS, all from the same prefix buffers
+    windows = [bubwin0] + [w for w in EXTRA_WINDOWS if w != bubwin0]
+    extra_bands = {}
 
-
-    # --- Plotting the bubble estimates ---
-    esttitle = [r'$\hat\Pi_{p}(\tau)$', r'$\hat\Pi_{c}(\tau)$', r'$\hat\Pi_{cp}(\tau)$']
-    legname4 = [r'$\hat\Pi(\tau),\tau\in(0.25\mp 0.1)$',
-                r'$\hat\Pi(\tau),\tau\in(0.5\mp 0.15)$',
-                r'$\hat\Pi(\tau),\tau\in(1\mp 0.25)$',
-                f"{stockcode}"]
+    # All tau-group/option-type series at once, from shared prefix-sum buffers
+    # built in one pass (with lag products up to the longest window's lag).
+    # Each window vt = [max(0, t - window + 1), t] then costs O(mc) per date.
+    if tii.size > 0:
+        stats = {
+            "mu": RollingWindowStats(sbubcdf_mu, nlags=max(nw_lags(w) for w in windows)),
+            "se2": RollingWindowStats(sbubcdf_se ** 2),
+            "bc_mu": RollingWindowStats(sbubcdf_bc_mu),
+            "bc_lb": RollingWindowStats(sbubcdf_bc_lb),
+            "bc_ub": RollingWindowStats(sbubcdf_bc_ub),
+        }
+        (rsbubcdf_mu[tii], rsbubcdf_se[tii], rsbubcdf_bc_mu[tii],
+         rsbubcdf_bc_lb[tii], rsbubcdf_bc_ub[tii]) = rolling_bands(stats, bubwin0, tii)
+        for window in windows[1:]:
+            extra_bands[window] = rolling_bands(stats, window, tii)
 
     # Select plotting indices: those indices in ti that are at least bubwin0.
     ttr0 = ti
-    cptag = ['p', 'c', 'cp']
 
     # Initialize JSON data structure 
     json_data = {
@@ -388,129 +802,63 @@ def process_stock(stockcode):
                 "combined"
             ],
             "time_series_start_date": matlab_datenum_to_datetime(dab_numeric[ttr0[0]]).isoformat() if len(ttr0) > 0 else None,
-            "time_series_end_date": matlab_datenum_to_datetime(dab_numeric[ttr0[-1]]).isoformat() if len(ttr0) > 0 else None
+            "time_series_end_date": matlab_datenum_to_datetime(dab_numeric[ttr0[-1]]).isoformat() if len(ttr0) > 0 else None,
+            "split_registry": {
+                "version": adjout.get('split_registry_version'),
+                "hash": adjout.get('split_registry_hash')
+            }
         },
-        "time_series_data": [],
-        "price_series_data": price_series_data
     }
 
     # Build time series data in your requested format
-    if len(ttr0) > 0:
-        for idx, t in enumerate(ttr0):
-            date_obj = matlab_datenum_to_datetime(dab_numeric[t])
-            date_key = date_obj.isoformat()
-            canonical_price = canonical_price_map.get(date_key)
-            if canonical_price is None:
-                raise ValueError(
-                    f"No canonical Yahoo close price for {stockcode} on bubble date {date_key}"
-                )
-
-            # Create bubble estimates for this time point
-            daily_grouped = []
-
-            # For each tau group (0, 1, 2)
-            for tau_idx in range(ntaugp):
-                tau_group_data = {
-                    "put": {
-                        "mu": float(rsbubcdf_bc_mu[t, tau_idx, 0]) if not np.isnan(rsbubcdf_bc_mu[t, tau_idx, 0]) else 0.0,
-                        "lb": float(rsbubcdf_bc_lb[t, tau_idx, 0]) if not np.isnan(rsbubcdf_bc_lb[t, tau_idx, 0]) else 0.0,
-                        "ub": float(rsbubcdf_bc_ub[t, tau_idx, 0]) if not np.isnan(rsbubcdf_bc_ub[t, tau_idx, 0]) else 0.0
-                    },
-                    "call": {
-                        "mu": float(rsbubcdf_bc_mu[t, tau_idx, 1]) if not np.isnan(rsbubcdf_bc_mu[t, tau_idx, 1]) else 0.0,
-                        "lb": float(rsbubcdf_bc_lb[t, tau_idx, 1]) if not np.isnan(rsbubcdf_bc_lb[t, tau_idx, 1]) else 0.0,
-                        "ub": float(rsbubcdf_bc_ub[t, tau_idx, 1]) if not np.isnan(rsbubcdf_bc_ub[t, tau_idx, 1]) else 0.0
-                    },
-                    "combined": {
-                        "mu": float(rsbubcdf_bc_mu[t, tau_idx, 2]) if not np.isnan(rsbubcdf_bc_mu[t, tau_idx, 2]) else 0.0,
-                        "lb": float(rsbubcdf_bc_lb[t, tau_idx, 2]) if not np.isnan(rsbubcdf_bc_lb[t, tau_idx, 2]) else 0.0,
-                        "ub": float(rsbubcdf_bc_ub[t, tau_idx, 2]) if not np.isnan(rsbubcdf_bc_ub[t, tau_idx, 2]) else 0.0
-                    }
-                }
-                daily_grouped.append(tau_group_data)
-
-            # Add this time point to the time series
-            time_point = {
-                "date": date_obj.isoformat() + "T00:00:00",
-                "stock_prices": {
-                    "adjusted": canonical_price["adjusted"],
-                    "regular": canonical_price["regular"]
-                },
-                "bubble_estimates": {
-                    "daily_grouped": daily_grouped
-                }
-            }
-
-            json_data["time_series_data"].append(time_point)
-
-    # Create the plots (same as original)
-    for idx, j in enumerate(range(3), start=1):
-        # Construct the bubble estimate plot for each of the three series.
-        rbubplot = np.column_stack((
-            rsbubcdf_bc_mu[ttr0, 0, j],
-            rsbubcdf_bc_mu[ttr0, 1, j],
-            rsbubcdf_bc_mu[ttr0, 2, j]
-        ))
-        # Adjusted price series (sout) is plotted on the right axis.
-        rsplot = sout[ttr0]
-
-        if len(ttr0) == 0:
-            print(f"No data for plot index {j}, skipping this figure.")
-            continue
-
-        # Create a new figure.
-        fig, ax1 = plt.subplots(figsize=(8, 4))
-        ax1.set_ylabel('Bubble Estimate')
-
-        # Plot each bubble estimate curve on the left axis.
-        for col in range(rbubplot.shape[1]):
-            ax1.plot(dab_numeric[ttr0], rbubplot[:, col], label=legname4[col])
-
-        # Fill confidence intervals for each series.
-        ax1.fill_between(dab_numeric[ttr0],
-                         rsbubcdf_bc_lb[ttr0, 0, j],
-                         rsbubcdf_bc_ub[ttr0, 0, j],
-                         color='blue', alpha=0.5)
-        ax1.fill_between(dab_numeric[ttr0],
-                         rsbubcdf_bc_lb[ttr0, 1, j],
-                         rsbubcdf_bc_ub[ttr0, 1, j],
-                         color='blue', alpha=0.3)
-        ax1.fill_between(dab_numeric[ttr0],
-                         rsbubcdf_bc_lb[ttr0, 2, j],
-                         rsbubcdf_bc_ub[ttr0, 2, j],
-                         color='blue', alpha=0.2)
-
-        ax1.set_xlim([dab_numeric[ttr0[0]], dab_numeric[ttr0[-1]]])
-
-        # Convert MATLAB datenums to Python datetime for x-axis formatting.
-        dt_dates = [matlab_datenum_to_datetime(d) for d in dab_numeric[ttr0]]
-        ax1.set_xticks(dab_numeric[ttr0])
-        ax1.xaxis.set_major_formatter(mdates.DateFormatter('%y'))
-        ax1.xaxis_date()
-
-        # Right axis: plot the adjusted price series.
-        ax2 = ax1.twinx()
-        ax2.plot(dab_numeric[ttr0], rsplot, label="Adjusted Price", color='red')
-        ax2.set_ylabel("Adjusted Price")
-
-        # Add legend and title.
-        ax1.legend(loc='upper left', fontsize=12)
-        ax1.set_title(esttitle[j], fontsize=12)
-
-        fig.tight_layout()
-
-        # Save figure as EPS and PNG
-        base = f"bub{cptag[j]}_{stockcode.lstrip('^')}_splitadj_{yr1}to{yr2}"
-        plt.savefig(IMG_DIR.joinpath(f"{base}.eps"), format="eps")
-        plt.savefig(IMG_DIR.joinpath(f"{base}.png"), format="png")
-        plt.close(fig)
+    columns = export_columns(stockcode, dab_numeric[ttr0], rsbubcdf_bc_mu[ttr0],
+                             rsbubcdf_bc_lb[ttr0], rsbubcdf_bc_ub[ttr0], canonical_price_map)
+    if JSON_SCHEMA == 2:
+        json_data["metadata"]["schema_version"] = 2
+        json_data["time_series"] = time_series_columns(columns, ntaugp)
+        json_data["price_series"] = price_series_columns(price_series_data)
+    else:
+        json_data["time_series_data"] = time_series_rows(columns)
+        json_data["price_series_data"] = price_series_data
+    # The year-shard, incremental and LOD exports carry only the primary
+    # window, so only the full JSON's (and the sidecar's) metadata lists the
+    # extra ones
+    export_metadata = json_data["metadata"]
+    if extra_bands:
+        json_data["metadata"] = dict(export_metadata, extra_rolling_window_days=list(extra_bands))
+        json_data["rolling_windows"] = [window_series(window, bands, ntaugp)
+                                        for window, bands in extra_bands.items()]
 
-    # Export JSON data with consistent naming
     json_filename = f"bubble_data_{stockcode.lstrip('^')}_splitadj_{yr1}to{yr2}.json"
     json_filepath = DATA_DIR.joinpath(json_filename)
+    if YEAR_SHARDS:
+        window_dates = [matlab_datenum_to_datetime(dn).isoformat()
+                        for dn in dab_numeric[np.maximum(ttr0 - bubwin0 + 1, 0)]]
+        write_year_exports(json_filepath.stem, export_metadata, columns,
+                           price_series_data, window_dates, ntaugp)
+        if SHARD_YEARS:
+            print(f"{stockcode}: regenerated year shard(s) {sorted(SHARD_YEARS)} only")
+            return True
+
+    # Save the plot inputs; the figures are rendered now or by a later plot stage
+    save_plot_series(stockcode, yr1, yr2, dab_numeric[ttr0], rsbubcdf_bc_mu[ttr0],
+                     rsbubcdf_bc_lb[ttr0], rsbubcdf_bc_ub[ttr0], sout[ttr0])
+    if plot:
+        plot_saved_series(stockcode, yr1, yr2)
 
-    with open(json_filepath, 'w') as f:
-        json.dump(json_data, f, indent=2, cls=NumpyEncoder)
+    # Export JSON data with consistent naming
+    digest = write_json(json_data, json_filepath, JSON_SCHEMA)
+    if BINARY_SIDECAR:
+        metadata = {k: v for k, v in json_data["metadata"].items() if k != "schema_version"}
+        write_sidecar(json_filepath.with_suffix(".bin"), metadata, columns,
+                      price_series_columns(price_series_data), json_data.get("rolling_windows", ()))
+    if INCREMENTAL:
+        metadata = {k: v for k, v in export_metadata.items() if k != "schema_version"}
+        rows = json_data.get("time_series_data") or time_series_rows(columns)
+        written, reused = write_incremental(DATA_DIR, json_filepath.stem, metadata, rows, price_series_data)
+        print(f"Incremental export: {written} shard(s) written, {reused} unchanged")
+    if LOD:
+        write_lod_exports(json_filepath.stem, export_metadata, columns, ntaugp)
 
     print(f"SUCCESS: {stockcode} - JSON saved to {json_filepath}")
     print(f"Images saved to: {IMG_DIR}")
@@ -521,10 +869,26 @@ def process_stock(stockcode):
         last_date = matlab_datenum_to_datetime(dab_numeric[ttr0[-1]])
         print(f"First date: {first_date} (MATLAB datenum: {dab_numeric[ttr0[0]]})")
         print(f"Last date: {last_date} (MATLAB datenum: {dab_numeric[ttr0[-1]]})")
-        print(f"Total time series points: {len(json_data['time_series_data'])}")
+        print(f"Total time series points: {len(columns['date'])}")
 
     print(f"{stockcode} processing complete!")
-    return True
+    return summary_entry(json_filepath, digest, json_data["metadata"], columns)
+
+def mat_size(stockcode):
+    """Fallback cost estimate: size of the ticker's reference results file (grows with its periods)."""
+    path = find_result_file(stockcode, splitadj=False)
+    return path.stat().st_size if path else 0
+
+def run_plots(tickers, workers=1):
+    """Plot stage across tickers, after (and independent of) the JSON exports."""
+    print(f"\nRendering figures for {len(tickers)} ticker(s) ({', '.join(PLOT_FORMATS)})...")
+    results = run_tickers(plot_stock, tickers, "bubble_plots", workers=workers)
+    failed = [stock for stock, ok in results.items() if not ok]
+    if failed:
+        print(f"⚠️  Figures failed for: {', '.join(failed)}")
+
+def print_header(idx, total, stockcode):
+    print(f"\n[{idx}/{total}] Processing {stockcode}...")
 
 def main():
     print(f"Processing {len(stockcodelist)} stocks...")
@@ -532,17 +896,19 @@ def main():
     # The creation of directories is moved to the global scope to avoid recreating them on each call,
     # and to ensure they exist before any stock processing starts.
 
-    # Process each stock
-    successful = []
-    failed = []
-
-    for i, stockcode in enumerate(stockcodelist, 1):
-        print(f"\n[{i}/{len(stockcodelist)}] Processing {stockcode}...")
-
-        if process_stock(stockcode):
-            successful.append(stockcode)
-        else:
-            failed.append(stockcode)
+    # Process each stock (--workers N runs them in a process pool, heaviest first)
+    # Each successful ticker returns its summary entry, collected for summary.json
+    summaries = {}
+    workers = parse_workers()
+    results = run_tickers(partial(process_stock, plot=False), stockcodelist, "bubble_estimator",
+                          workers=workers, fallback_cost=mat_size, header=print_header,
+                          outputs=summaries)
+    successful = [stock for stock, ok in results.items() if ok]
+    failed = [stock for stock, ok in results.items() if not ok]
+    if not SHARD_YEARS:
+        write_summary(summaries, failed)
+        if PLOTS:
+            run_plots(successful, workers)
 
     # Summary report
     print(f"\n{'='*60}")
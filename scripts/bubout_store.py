@@ -0,0 +1,120 @@
+from collections.abc import Mapping
+
+import numpy as np
+
+# Per-(period, tau) calibration outputs, in the order they are reported in bubout.
+BUBOUT_FIELDS = (
+    'otmc', 'call1',
+    'sbub_qcdfp', 'sbub_qcdfc', 'sbub_qcdf',
+    'sbub_qcdfp_se', 'sbub_qcdfc_se', 'sbub_qcdf_se',
+    'qcdfp_bias', 'qcdfc_bias', 'qcdf_bias',
+    'qcdf_A_lb', 'qcdf_A_ub', 'qcdf_Ap_lb', 'qcdf_Ap_ub', 'qcdf_Ac_lb', 'qcdf_Ac_ub',
+    'qcdf_B1', 'qcdf_B21', 'qcdf_B22', 'qcdf_B23', 'qcdf_B3',
+    'Bcbub_lb', 'Bcbub_ub',
+    'scene',
+    'qcdfp_lb', 'qcdfp_ub', 'qcdfc_lb', 'qcdfc_ub',
+    'lp', 'up', 'lc', 'uc',
+    'nkc', 'nkp', 'sumvolc', 'sumvolp',
+)
+
+# Fields that only ever hold integers: strike counts and the scene code (1-6).
+INT_FIELDS = {
+    'nkc': np.int32,
+    'nkp': np.int32,
+    'scene': np.int8,
+}
+
+# Per-cell metadata stored alongside the results: the maturity (in years) of
+# each calibrated column, NaN in the padding past a period's last maturity.
+CELL_FIELDS = {
+    'tau': np.float64,
+}
+
+
+def bubout_dtype(nperiod, mntau, precision='float64'):
+    """
+    Structured dtype holding every bubout field as one nperiod x mntau block.
+
+    Reporting fields use `precision` (e.g. 'float32'); counts and scene codes
+    use the integer types in INT_FIELDS, and CELL_FIELDS keep their own types.
+    """
+    float_dtype = np.dtype(precision)
+    return np.dtype([
+        (name, INT_FIELDS.get(name, float_dtype), (nperiod, mntau))
+        for name in BUBOUT_FIELDS
+    ] + [
+        (name, dtype, (nperiod, mntau)) for name, dtype in CELL_FIELDS.items()
+    ])
+
+
+class BubbleResults(Mapping):
+    """
+    Typed container for the calibration panel returned by sbub_lp_easy.
+
+    All fields live in a single contiguous buffer, one block per field, so
+    results['sbub_qcdf'] is a contiguous nperiod x mntau view. It behaves like
+    the old bubout dict as a mapping of field name to array (the set of fields
+    is fixed; values are written with set_period or set_field) and pickles as
+    one buffer, which keeps hand-offs between processes cheap.
+    """
+    __slots__ = ('data',)
+
+    def __init__(self, data):
+        self.data = data
+
+    @classmethod
+    def empty(cls, nperiod, mntau, precision='float64'):
+        data = np.zeros((), dtype=bubout_dtype(nperiod, mntau, precision))
+        data['tau'][...] = np.nan
+        return cls(data)
+
+    @classmethod
+    def from_dict(cls, bubout, precision='float64'):
+        nperiod, mntau = np.shape(bubout['sbub_qcdf'])
+        results = cls.empty(nperiod, mntau, precision)
+        for name in BUBOUT_FIELDS:
+            results.data[name][...] = bubout[name]
+        for name in CELL_FIELDS:
+            if name in bubout:
+                results.data[name][...] = bubout[name]
+        return results
+
+    @property
+    def shape(self):
+        return self.data['sbub_qcdf'].shape
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes
+
+    def set_period(self, t, record):
+        """Store one period record produced by sbub_lp_easy.calibrate_periods."""
+        ntau_t = len(record['tau'])
+        for name in BUBOUT_FIELDS:
+            self.data[name][t, :ntau_t] = record[name]
+        self.data['tau'][t, :ntau_t] = record['tau']
+
+    def set_field(self, name, values):
+        """Overwrite one field's block, e.g. with bootstrap standard errors."""
+        if name not in self.data.dtype.names:
+            raise KeyError(name)
+        self.data[name][...] = values
+
+    def as_dict(self):
+        """Plain {field: array} dict (views, no copy), e.g. for savemat."""
+        return {name: self.data[name] for name in BUBOUT_FIELDS + tuple(CELL_FIELDS)}
+
+    def __getitem__(self, name):
+        if name not in self.data.dtype.names:
+            raise KeyError(name)
+        return self.data[name]
+
+    def __iter__(self):
+        return iter(self.data.dtype.names)
+
+    def __len__(self):
+        return len(self.data.dtype.names)
+
+    def __repr__(self):
+        nperiod, mntau = self.shape
+        return f"BubbleResults(nperiod={nperiod}, mntau={mntau}, nbytes={self.nbytes})"
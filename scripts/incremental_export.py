@@ -0,0 +1,128 @@
+"""
+Append-only incremental layout for the bubble JSON exports.
+
+Alongside bubble_data_<TICKER>_splitadj_<yr1>to<yr2>.json, BUBBLE_INCREMENTAL=1
+writes public/data/incremental/<same stem>/:
+
+    shard-000-<hash12>.json   immutable: rows [0, SHARD_ROWS) plus their prices
+    shard-001-<hash12>.json   ...
+    tail.json                 the rows after the last full shard (rewritten daily)
+    manifest.json             metadata, shard/tail files, date bounds, counts, hashes
+
+Shards are fixed-size chunks counted from the first date, named by the hash of
+their content. A nightly run that only appends dates therefore rewrites the
+tail and the manifest, and seals a new shard every SHARD_ROWS dates. Shards
+are compared with the previous manifest by date range and content hash, and a
+shard is rewritten only when values inside it changed (e.g. a split
+correction or a parameter change rewriting history).
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+
+SHARD_ROWS = int(os.getenv("BUBBLE_SHARD_ROWS", "252"))
+INCREMENTAL_DIR = "incremental"
+MANIFEST_NAME = "manifest.json"
+TAIL_NAME = "tail.json"
+
+
+def _json_default(obj):
+    if hasattr(obj, "item"):  # NumPy scalars in the metadata
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def encode(obj):
+    """Compact, deterministic JSON bytes (the hashed and written form)."""
+    return json.dumps(obj, separators=(",", ":"), default=_json_default).encode()
+
+
+def row_day(row):
+    return row["date"][:10]
+
+
+def chunk(rows, price_series_data, shard_rows=SHARD_ROWS):
+    """
+    Full shards of shard_rows rows each, then the tail, as
+    {"time_series_data": [...], "price_series_data": [...]} pieces. Prices go
+    with the piece whose dates cover them; earlier prices go in the first piece.
+    """
+    nfull = len(rows) // shard_rows
+    bounds = [(k * shard_rows, (k + 1) * shard_rows) for k in range(nfull)]
+    bounds.append((nfull * shard_rows, len(rows)))
+
+    pieces, p = [], 0
+    for i, (start, stop) in enumerate(bounds):
+        last = row_day(rows[stop - 1]) if stop > start and i < nfull else None
+        prices = []
+        while p < len(price_series_data) and (last is None or price_series_data[p]["date"] <= last):
+            prices.append(price_series_data[p])
+            p += 1
+        pieces.append({"time_series_data": rows[start:stop], "price_series_data": prices})
+    return pieces[:-1], pieces[-1]
+
+
+def piece_entry(file, piece, content):
+    rows = piece["time_series_data"]
+    return {
+        "file": file,
+        "first_date": rows[0]["date"] if rows else None,
+        "last_date": rows[-1]["date"] if rows else None,
+        "count": len(rows),
+        "sha256": hashlib.sha256(content).hexdigest(),
+    }
+
+
+def load_manifest(out_dir):
+    try:
+        with open(out_dir / MANIFEST_NAME) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_incremental(json_dir, stem, metadata, rows, price_series_data):
+    """
+    Update the incremental layout for one export; returns (shards written,
+    shards reused). rows/price_series_data are in the schema 1 row format.
+    """
+    out_dir = Path(json_dir).joinpath(INCREMENTAL_DIR, stem)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    previous = {entry["file"]: entry for entry in load_manifest(out_dir).get("shards", [])}
+
+    shards, tail = chunk(rows, price_series_data)
+    entries, written, changed_from = [], 0, None
+    for k, piece in enumerate(shards):
+        content = encode(piece)
+        digest = hashlib.sha256(content).hexdigest()
+        file = f"shard-{k:03d}-{digest[:12]}.json"
+        entries.append(piece_entry(file, piece, content))
+        if file in previous and previous[file]["sha256"] == digest and out_dir.joinpath(file).exists():
+            continue
+        if changed_from is None and any(e["first_date"] == entries[-1]["first_date"] for e in previous.values()):
+            changed_from = entries[-1]["first_date"]
+        out_dir.joinpath(file).write_bytes(content)
+        written += 1
+
+    tail_content = encode(tail)
+    out_dir.joinpath(TAIL_NAME).write_bytes(tail_content)
+    manifest = {
+        "format": "bubble-incremental",
+        "version": 1,
+        "metadata": metadata,
+        "shard_rows": SHARD_ROWS,
+        "shards": entries,
+        "tail": piece_entry(TAIL_NAME, tail, tail_content),
+    }
+    out_dir.joinpath(MANIFEST_NAME).write_bytes(encode(manifest))
+
+    # Shards dropped from the manifest (history rewritten) are deleted
+    current = {entry["file"] for entry in entries}
+    for path in out_dir.glob("shard-*.json"):
+        if path.name not in current:
+            path.unlink()
+
+    if changed_from is not None:
+        print(f"⚠️  {stem}: published history changed from {changed_from}; rewrote its shards")
+    return written, len(entries) - written
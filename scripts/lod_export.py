@@ -0,0 +1,76 @@
+"""
+Pre-decimated (level-of-detail) versions of the bubble export series.
+
+With BUBBLE_LOD=1, bubble_estimator writes public/data/lod/<stem>.lod<N>.json
+(schema 2, see bubble_estimator.time_series_columns) for every target size N
+in LOD_TARGETS smaller than the series. The full-resolution export is
+unchanged. The LOD files are for local use (e.g. plotting long WRDS
+histories) and are not uploaded by update-blob-urls.ts.
+
+Decimation is min/max per bucket of one driving series, the adjusted price.
+The dates are cut into about N/2 equal-count buckets and each keeps the two
+dates where the adjusted price is lowest and highest, in date order, so price
+spikes survive at any level. Every series (prices and the 27
+tau-group/option-type/stat estimates) is taken at those same dates, so each
+kept row is a real observation and the lb <= mu <= ub bands stay consistent.
+"""
+import numpy as np
+
+LOD_TARGETS = (256, 1024, 4096)
+
+
+def minmax_decimate(values, target, driver=0):
+    """
+    Row indices and rows of the min/max-per-bucket decimation of an n x m
+    matrix to at most target rows, picking the rows by column driver.
+    """
+    n = values.shape[0]
+    width = -(-n // max(1, target // 2))
+    nbucket = -(-n // width)
+
+    padded = np.full(nbucket * width, np.nan)
+    padded[:n] = values[:, driver]
+    blocks = padded.reshape(nbucket, width)
+    offset = np.arange(nbucket) * width
+    imin = np.nanargmin(blocks, axis=1) + offset
+    imax = np.nanargmax(blocks, axis=1) + offset
+
+    index = np.empty(2 * nbucket, dtype=np.int64)
+    index[0::2] = np.minimum(imin, imax)
+    index[1::2] = np.maximum(imin, imax)
+    # Buckets whose min and max fall on the same date need only one row
+    keep = np.ones(2 * nbucket, dtype=bool)
+    keep[1::2] = index[1::2] > index[0::2]
+    index = index[keep]
+    return index, values[index]
+
+
+def lod_levels(columns, targets=LOD_TARGETS):
+    """
+    {target: columns} for every target smaller than the series, in the
+    bubble_estimator.export_columns layout, from one stacked matrix.
+    """
+    n = len(columns["date"])
+    estimates = columns["estimates"]
+    stats = list(estimates)
+    shape = estimates[stats[0]].shape[1:]
+    # Column 0, the adjusted price, drives the decimation
+    stacked = np.column_stack(
+        [np.asarray(columns["adjusted"], dtype=float), np.asarray(columns["regular"], dtype=float)]
+        + [estimates[stat].reshape(n, -1) for stat in stats]
+    ) if n else np.zeros((0, 2))
+
+    levels = {}
+    for target in sorted(targets):
+        if n <= target:
+            continue
+        index, rows = minmax_decimate(stacked, target)
+        blocks = np.split(rows[:, 2:], len(stats), axis=1)
+        levels[target] = {
+            "date": [columns["date"][i] for i in index],
+            "adjusted": rows[:, 0].tolist(),
+            "regular": rows[:, 1].tolist(),
+            "estimates": {stat: block.reshape((len(index),) + shape)
+                          for stat, block in zip(stats, blocks)},
+        }
+    return levels
@@ -3,6 +3,59 @@
 
 import numpy as np
 
+# Above this many lags the FFT autocorrelation beats direct lag products
+FFT_MIN_LAGS = 64
+
+
+def autocov_batch(q, m, method='auto'):
+    """
+    Lag 1..m autocovariances of every series in q, computed in one shot.
+
+    Parameters:
+        q : numpy array, shape (..., n)
+            One series per trailing row, e.g. (nseries, n) or a stack of
+            rolling windows (nwindow, nseries, n).
+        m : int
+            The number of lags.
+        method : 'auto', 'direct' or 'fft'
+
+    Returns:
+        gam : numpy array, shape (..., m)
+            gam[..., j-1] = sum((q[..., :n-j]-mu)*(q[..., j:]-mu))/n,
+            zero for lags j >= n.
+    """
+    q = np.asarray(q, dtype=float)
+    n = q.shape[-1]
+    gam = np.zeros(q.shape[:-1] + (m,))
+    if n == 0 or m == 0:
+        return gam
+    d = q - np.mean(q, axis=-1, keepdims=True)
+    nlag = min(m, n - 1)
+
+    if method == 'fft' or (method == 'auto' and nlag >= FFT_MIN_LAGS):
+        nfft = 1 << (2 * n - 1).bit_length()
+        spec = np.fft.rfft(d, nfft, axis=-1)
+        acov = np.fft.irfft(spec * np.conj(spec), nfft, axis=-1)
+        gam[..., :nlag] = acov[..., 1:nlag + 1] / n
+    else:
+        for j in range(1, nlag + 1):
+            gam[..., j - 1] = np.sum(d[..., :n - j] * d[..., j:], axis=-1) / n
+    return gam
+
+
+def nw_cov_batch(q, m, method='auto'):
+    """
+    Newey-West covariance term for a batch of series (see nw_cov).
+
+    q has shape (..., n); the result has shape q.shape[:-1].
+    """
+    gam = autocov_batch(q, m, method)
+    cov_val = np.zeros(gam.shape[:-1])
+    for j in range(1, m + 1):
+        cov_val += (1 - j / (m + 1)) * gam[..., j - 1]
+    return cov_val
+
+
 def nw_cov(q, m):
     """
     Newey-West covariance estimator.
@@ -22,14 +75,7 @@ def nw_cov(q, m):
       For j=1:m:
           gam(j) = sum((q(1:n-j)-mu).*(q(1+j:n)-mu))/n
       cov = sum_{j=1}^{m} (1 - j/(m+1))*gam(j)
+
+    Batched inputs are handled by nw_cov_batch.
     """
-    mu = np.mean(q)
-    n = len(q)
-    gam = np.zeros(m)
-    cov_val = 0.0
-    for j in range(1, m+1):
-        # q[0:n-j] corresponds to MATLAB q(1:n-j)
-        # q[j:n] corresponds to MATLAB q(1+j:n)
-        gam[j-1] = np.sum((q[:n-j] - mu) * (q[j:] - mu)) / n
-        cov_val += (1 - j/(m+1)) * gam[j-1]
-    return cov_val
+    return float(nw_cov_batch(q, m))
@@ -0,0 +1,266 @@
+"""
+Incremental per-ticker pipeline: merge → calibrate → split → export → plot.
+
+    python scripts/pipeline.py [--fetch] [--workers N] [TICKER ...]
+
+Each ticker is a branch of stages. A stage is keyed by the hashes of its input
+files, its parameters and the source files it runs. The key is recorded in
+data/pipeline_state/<TICKER>.json after the stage succeeds, and a stage whose
+key is unchanged (and whose outputs still exist) is skipped. A new CSV day,
+a split-registry correction or an edit to bubble_estimator.py therefore redoes
+only the stages downstream of the change. Ticker branches run concurrently
+with --workers N; a failing stage stops only its own branch.
+
+public/data/summary.json is rewritten at the end from every branch's export
+(a skipped export is summarised from its unchanged JSON); with an explicit
+ticker list only those tickers' entries are replaced.
+
+--fetch first runs yf_data_scraper.py (fetch + CSV merge for every ticker) and
+refreshes the Yahoo price caches. Remote data has no content hash, so the fetch
+always runs when requested; the export stage is keyed on the cached prices and
+on the BUBBLE_* export settings.
+Delete data/pipeline_state to force a full rebuild.
+"""
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime
+from graphlib import TopologicalSorter
+from pathlib import Path
+from typing import Callable
+
+
+import bubble_estimator
+import sbub_run
+import incremental_export
+import price_cache
+from artifact_manifest import content_hash, recorded_hash
+from sbub_split import registry_hash, sbub_split
+from ticker_pool import run_tickers
+from year_shard_export import SHARD_YEARS
+from yahoo_csv_utils import rebuild_count_csv
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+STATE_DIR = Path("data/pipeline_state")
+
+
+@dataclass
+class Stage:
+    name: str
+    run: Callable[[str], object]            # returns False on failure
+    inputs: Callable[[str], list]           # files hashed into the stage key
+    outputs: Callable[[str], list]          # files the stage must leave behind
+    deps: tuple = ()
+    code: tuple = ()                        # scripts/ sources the stage executes
+    params: Callable[[str], dict] = field(default=lambda ticker: {})
+
+
+# ──────────────── Stage bodies ────────────────
+def csv_paths(ticker):
+    return [f"{sbub_run.csv_dir}/optout_{ticker}.csv", f"{sbub_run.csv_dir}/optout_{ticker}_count.csv"]
+
+
+def merge_stage(ticker):
+    data_file, count_file = csv_paths(ticker)
+    rebuild_count_csv(data_file, count_file)
+
+
+def calibrate_stage(ticker):
+    sbub_run.calibrate_ticker(ticker, *csv_paths(ticker))
+
+
+def split_stage(ticker):
+    matfile, _ = sbub_run.result_paths(ticker)
+    adjout = sbub_split(ticker, matfile, sbub_run.yr1, sbub_run.yr2)[0]
+    sbub_run.save_split_adjusted(ticker, adjout)
+
+
+def export_stage(ticker):
+    return bubble_estimator.process_stock(ticker, plot=False)
+
+
+def plot_stage(ticker):
+    bubble_estimator.plot_saved_series(ticker, sbub_run.yr1, sbub_run.yr2)
+
+
+def calibration_params(ticker):
+    return {name: getattr(sbub_run, name)
+            for name in ("yr1", "yr2", "pow", "nstep", "opth", "hnumsd", "precision", "nboot",
+                         "store_format")}
+
+
+def price_cache_file(ticker):
+    return price_cache.cache_path(bubble_estimator.to_yahoo_symbol(ticker))
+
+
+def export_params(ticker):
+    """Export settings that change its outputs, and the Yahoo prices merged into the JSON."""
+    return {
+        "schema": bubble_estimator.JSON_SCHEMA,
+        "sidecar": bubble_estimator.BINARY_SIDECAR,
+        "incremental": bubble_estimator.INCREMENTAL and incremental_export.SHARD_ROWS,
+        "lod": bubble_estimator.LOD,
+        "extra_windows": bubble_estimator.EXTRA_WINDOWS,
+        "year_shards": bubble_estimator.YEAR_SHARDS and sorted(SHARD_YEARS),
+        "prices": content_hash(price_cache_file(ticker)),
+    }
+
+
+def json_path(ticker):
+    return str(bubble_estimator.DATA_DIR.joinpath(
+        f"bubble_data_{ticker.lstrip('^')}_splitadj_{sbub_run.yr1}to{sbub_run.yr2}.json"))
+
+
+STAGES = [
+    Stage("merge", merge_stage,
+          inputs=lambda t: csv_paths(t)[:1],
+          outputs=lambda t: csv_paths(t)[1:],
+          code=("yahoo_csv_utils.py",)),
+    Stage("calibrate", calibrate_stage,
+          inputs=csv_paths,
+          outputs=lambda t: sbub_run.result_paths(t)[:1],
+          deps=("merge",),
+          code=("sbub_run.py", "sbub_lp_easy.py", "anticonv_put.py", "anticonv_call.py",
+                "lpoly2.py", "bubout_store.py", "sbub_bootstrap.py", "sbub_checkpoint.py",
+                "artifact_manifest.py"),
+          params=calibration_params),
+    Stage("split", split_stage,
+          inputs=lambda t: sbub_run.result_paths(t)[:1],
+          outputs=lambda t: sbub_run.result_paths(t)[1:],
+          deps=("calibrate",),
+          code=("sbub_split.py",),
+          params=lambda t: {"registry": registry_hash(t),
+                            "factor_only": sbub_run.split_factor_only}),
+    Stage("export", export_stage,
+          inputs=lambda t: list(sbub_run.result_paths(t)),
+          outputs=lambda t: [json_path(t), str(bubble_estimator.plot_series_path(t, sbub_run.yr1, sbub_run.yr2))],
+          deps=("split",),
+          code=("bubble_estimator.py", "rolling_stats.py", "nw_cov.py", "sbub_split.py",
+                "binary_export.py", "incremental_export.py", "lod_export.py",
+                "year_shard_export.py", "price_cache.py"),
+          params=export_params),
+    Stage("plot", plot_stage,
+          inputs=lambda t: [str(bubble_estimator.plot_series_path(t, sbub_run.yr1, sbub_run.yr2))],
+          outputs=lambda t: [str(p) for p in bubble_estimator.plot_image_paths(t, sbub_run.yr1, sbub_run.yr2)],
+          deps=("export",),
+          code=("bubble_estimator.py",)),
+]
+STAGE_BY_NAME = {stage.name: stage for stage in STAGES}
+STAGE_ORDER = list(TopologicalSorter({s.name: s.deps for s in STAGES}).static_order())
+
+
+# ──────────────── Up-to-date checks ────────────────
+def input_hash(path, ticker):
+    """Content hash of a stage input, taken from the artifact manifest while the file is unchanged."""
+    return recorded_hash(path, ticker) or content_hash(path)
+
+
+def stage_key(stage, ticker):
+    """Hash of everything a stage's result depends on."""
+    digest = hashlib.sha256(stage.name.encode())
+    digest.update(json.dumps(stage.params(ticker), sort_keys=True, default=str).encode())
+    for source in stage.code:
+        digest.update(f"{source}:{content_hash(SCRIPT_DIR / source)}".encode())
+    for path in stage.inputs(ticker):
+        digest.update(f"{path}:{input_hash(path, ticker)}".encode())
+    return digest.hexdigest()
+
+
+def state_path(ticker):
+    return STATE_DIR.joinpath(f"{ticker}.json")
+
+
+def load_state(ticker):
+    try:
+        with open(state_path(ticker)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(ticker, state):
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    with open(state_path(ticker), "w") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+
+
+def run_branch(ticker):
+    """
+    Run one ticker's stages in dependency order, skipping those that are up to
+    date. Returns the ticker's summary.json entry, or False on failure.
+    """
+    state = load_state(ticker)
+    summary = None
+    for name in STAGE_ORDER:
+        stage = STAGE_BY_NAME[name]
+        missing = [p for p in stage.inputs(ticker) if not os.path.exists(p)]
+        if missing:
+            print(f"❌ {ticker}/{name}: missing input {', '.join(missing)}")
+            return False
+
+        key = stage_key(stage, ticker)
+        if state.get(name) == key and all(os.path.exists(p) for p in stage.outputs(ticker)):
+            print(f"⏭️  {ticker}/{name} is up to date")
+            continue
+
+        print(f"▶️  {ticker}/{name}")
+        try:
+            value = stage.run(ticker)
+            ok = value is not False
+        except Exception as e:
+            print(f"❌ {ticker}/{name} failed: {e}")
+            ok = False
+        if not ok:
+            state.pop(name, None)
+            save_state(ticker, state)
+            return False
+        if name == "export":
+            summary = value
+        # Re-key after running: merge normalises its input CSV in place
+        state[name] = stage_key(stage, ticker)
+        save_state(ticker, state)
+    # A skipped export leaves its JSON unchanged: summarise the file on disk
+    return summary or bubble_estimator.json_summary_entry(json_path(ticker))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental per-ticker bubble pipeline")
+    parser.add_argument("tickers", nargs="*", help="tickers to run (default: all)")
+    parser.add_argument("--fetch", action="store_true", help="run yf_data_scraper.py first")
+    parser.add_argument("--workers", type=int, default=1, help="ticker branches run in parallel")
+    args = parser.parse_args()
+    tickers = args.tickers or bubble_estimator.stockcodelist
+
+    if args.fetch:
+        print("Running yf_data_scraper.py (fetch + merge CSV)...")
+        subprocess.run([sys.executable, str(SCRIPT_DIR / "yf_data_scraper.py")], check=True)
+        # Bring the price caches up to date too, so a Yahoo price revision
+        # changes the export stage keys even without a new CSV day
+        for ticker in tickers:
+            bubble_estimator.download_canonical_price_series(
+                ticker, f"{sbub_run.yr1}-01-01", datetime.now().strftime("%Y-%m-%d"))
+
+    os.makedirs(sbub_run.csv_dir, exist_ok=True)
+    os.makedirs(sbub_run.output_dir, exist_ok=True)
+    summaries = {}
+    results = run_tickers(run_branch, tickers, "pipeline", workers=max(1, args.workers),
+                          fallback_cost=sbub_run.csv_size,
+                          header=lambda idx, total, ticker: print(f"\n[{idx}/{total}] {ticker}"),
+                          outputs=summaries)
+
+    failed = [ticker for ticker, ok in results.items() if not ok]
+    if not bubble_estimator.SHARD_YEARS:
+        # An explicit ticker list updates just those tickers' entries
+        bubble_estimator.write_summary(summaries, failed, merge=bool(args.tickers))
+    print(f"\nPipeline complete: {len(results) - len(failed)}/{len(results)} tickers up to date")
+    if failed:
+        print(f"Failed: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
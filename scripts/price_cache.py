@@ -0,0 +1,149 @@
+"""
+Local cache of the canonical Yahoo daily prices used by the JSON exports.
+
+One .npz per Yahoo symbol in PRICE_CACHE_DIR (default ./data/prices) holds
+the dates, Close and Adj Close, and the start date it was fetched from. A run
+downloads only from a few cached days before the last cached date onwards:
+
+- the overlapping days (except the last cached one, which may have been a
+  partial day) must match the cache, otherwise Yahoo has revised its
+  history and the whole range is fetched again;
+- a dividend or split dated after the last cached day also triggers a full
+  refetch, since Yahoo back-adjusts the whole Adj Close history for it;
+- fetched days replace the cached ones from the start of the overlap.
+
+BUBBLE_PRICE_CACHE=0 always downloads the full range (the previous behaviour).
+"""
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+PRICE_CACHE_DIR = Path(os.environ.get("BUBBLE_PRICE_CACHE_DIR", "data/prices"))
+USE_CACHE = os.getenv("BUBBLE_PRICE_CACHE", "1") != "0"
+# Cached days re-downloaded on every run to detect revised history
+OVERLAP_DAYS = 5
+# Relative difference above which an overlapping day counts as revised. Yahoo
+# serves prices rounded to a few significant digits (and Adj Close recomputed
+# in float32), so repeated downloads of an unchanged day can differ by ~1e-7;
+# a real revision moves a price by at least a cent, well above that below
+# $10,000 a share.
+REVISION_RTOL = 1e-6
+ACTION_COLUMNS = ("Dividends", "Stock Splits")
+
+
+def cache_path(yahoo_symbol):
+    return PRICE_CACHE_DIR.joinpath(f"{yahoo_symbol.lstrip('^')}.npz")
+
+
+def fetch_history(yahoo_symbol, start_date, end_exclusive):
+    """
+    Yahoo daily history from start_date as (dates, regular, adjusted,
+    action_dates): datetime64[D] and float64 arrays without non-finite Close
+    rows (a missing Adj Close falls back to Close), and the dates carrying a
+    dividend or split.
+    """
+    history = yf.download(
+        yahoo_symbol,
+        start=start_date,
+        end=end_exclusive,
+        auto_adjust=False,
+        actions=True,
+        progress=False,
+    )
+    if history.empty:
+        return None
+
+    if isinstance(history.columns, pd.MultiIndex):
+        if yahoo_symbol in history.columns.get_level_values(-1):
+            history = history.xs(yahoo_symbol, axis=1, level=-1)
+        else:
+            history.columns = history.columns.get_level_values(0)
+
+    history = history.reset_index()
+    date_column = "Date" if "Date" in history.columns else history.columns[0]
+    if "Close" not in history.columns:
+        raise ValueError(f"Yahoo price history for {yahoo_symbol} is missing Close")
+
+    dates = pd.to_datetime(history[date_column]).dt.strftime("%Y-%m-%d").to_numpy().astype("datetime64[D]")
+    regular = pd.to_numeric(history["Close"], errors="coerce").to_numpy(dtype=float)
+    adjusted = (pd.to_numeric(history["Adj Close"], errors="coerce").to_numpy(dtype=float)
+                if "Adj Close" in history.columns else regular.copy())
+    adjusted = np.where(np.isfinite(adjusted), adjusted, regular)
+
+    actions = np.zeros(len(history), dtype=bool)
+    for column in ACTION_COLUMNS:
+        if column in history.columns:
+            actions |= pd.to_numeric(history[column], errors="coerce").fillna(0).to_numpy() != 0
+
+    keep = np.isfinite(regular) & (dates >= np.datetime64(start_date, "D"))
+    return dates[keep], regular[keep], adjusted[keep], dates[actions]
+
+
+def load_cache(yahoo_symbol, start_date):
+    """Cached (start, dates, regular, adjusted), or None if missing or fetched from a later start."""
+    path = cache_path(yahoo_symbol)
+    if not path.exists():
+        return None
+    try:
+        with np.load(path) as cache:
+            start = str(cache["start"])
+            if np.datetime64(start, "D") > np.datetime64(start_date, "D"):
+                return None
+            return start, cache["dates"], cache["regular"], cache["adjusted"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def save_cache(yahoo_symbol, start_date, dates, regular, adjusted):
+    PRICE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    path = cache_path(yahoo_symbol)
+    tmp = path.with_suffix(".tmp.npz")
+    np.savez(tmp, start=np.array(start_date), dates=dates, regular=regular, adjusted=adjusted)
+    os.replace(tmp, path)
+
+
+def date_range(dates, regular, adjusted, start_date, end_exclusive):
+    keep = (dates >= np.datetime64(start_date, "D")) & (dates < np.datetime64(end_exclusive, "D"))
+    return dates[keep], regular[keep], adjusted[keep]
+
+
+def cached_history(yahoo_symbol, start_date, end_exclusive):
+    """
+    (dates, regular, adjusted) in [start_date, end_exclusive), as
+    fetch_history would return them, downloading only the days the cache is
+    missing when it can.
+    """
+    cached = load_cache(yahoo_symbol, start_date) if USE_CACHE else None
+    if cached is not None and cached[1].size > 0:
+        cache_start, dates, regular, adjusted = cached
+        overlap = max(0, dates.size - OVERLAP_DAYS)
+        fetched = fetch_history(yahoo_symbol, str(dates[overlap]), end_exclusive)
+        if fetched is not None:
+            new_dates, new_regular, new_adjusted, action_dates = fetched
+            # Days in both, apart from the possibly partial last cached day
+            both = np.flatnonzero(np.isin(dates[overlap:-1], new_dates)) + overlap
+            at = np.searchsorted(new_dates, dates[both])
+            revised = not (np.allclose(new_regular[at], regular[both], rtol=REVISION_RTOL, atol=0)
+                           and np.allclose(new_adjusted[at], adjusted[both],
+                                           rtol=REVISION_RTOL, atol=0))
+            if revised or np.any(action_dates > dates[-1]):
+                reason = "revised history" if revised else "new dividend/split"
+                print(f"🔄 {yahoo_symbol}: {reason}, refetching the full price history")
+            else:
+                print(f"📈 {yahoo_symbol}: {int(np.sum(new_dates > dates[-1]))} new day(s) after cached {dates[-1]}")
+                dates = np.concatenate([dates[:overlap], new_dates])
+                regular = np.concatenate([regular[:overlap], new_regular])
+                adjusted = np.concatenate([adjusted[:overlap], new_adjusted])
+                save_cache(yahoo_symbol, cache_start, dates, regular, adjusted)
+                return date_range(dates, regular, adjusted, start_date, end_exclusive)
+
+    fetched = fetch_history(yahoo_symbol, start_date, end_exclusive)
+    if fetched is None:
+        return None
+    dates, regular, adjusted, _ = fetched
+    if USE_CACHE:
+        save_cache(yahoo_symbol, start_date, dates, regular, adjusted)
+    return date_range(dates, regular, adjusted, start_date, end_exclusive)
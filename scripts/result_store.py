@@ -0,0 +1,153 @@
+"""
+Columnar .npz storage for sbub_run results, an alternative to .mat.
+
+Each result file is one uncompressed .npz with a member per field, named
+"<group>/<field>" (e.g. "bubout/sbub_qcdf", "adjout/sout_adj"). Dense panels
+are stored as plain arrays. Ragged per-period data (dataout tau, X, cp, ...)
+is stored as "<group>/<field>/values" plus "<group>/<field>/offsets", where
+period t is values[offsets[t]:offsets[t+1]]. Readers memory-map members
+straight out of the archive and only touch the fields they ask for.
+
+    python scripts/result_store.py data/mat/*.mat    # convert existing files
+"""
+import os
+import struct
+import sys
+import zipfile
+from pathlib import Path
+
+import numpy as np
+from numpy.lib import format as npformat
+from scipy.io import loadmat
+
+from artifact_manifest import record_converted
+
+VALUES, OFFSETS = "values", "offsets"
+
+
+def pack_ragged(seq):
+    """Flat values and offsets (length len(seq) + 1) for a sequence of 1-D arrays."""
+    parts = [np.ravel(np.asarray(x, dtype=float)) for x in seq]
+    offsets = np.zeros(len(parts) + 1, dtype=np.int64)
+    np.cumsum([p.size for p in parts], out=offsets[1:])
+    values = np.concatenate(parts) if parts else np.zeros(0)
+    return values, offsets
+
+
+def unpack_ragged(values, offsets):
+    """Per-period views into values."""
+    return np.split(values, np.asarray(offsets[1:-1]))
+
+
+def save_results(path, **groups):
+    """
+    Write groups of fields, e.g. save_results(path, bubout=..., dataout=...).
+
+    Lists and object arrays (MATLAB cell-style per-period data) are stored
+    ragged; everything else, including scalars and strings, as plain arrays.
+    """
+    members = {}
+    for group, fields in groups.items():
+        for name, value in fields.items():
+            if value is None:
+                continue
+            key = f"{group}/{name}"
+            if isinstance(value, (list, tuple)) or getattr(value, "dtype", None) == object:
+                seq = value if isinstance(value, (list, tuple)) else value.ravel()
+                members[f"{key}/{VALUES}"], members[f"{key}/{OFFSETS}"] = pack_ragged(seq)
+            else:
+                members[key] = np.asarray(value)
+
+    # Write-then-rename: readers holding memory maps of the old file stay valid
+    tmp = f"{path}.tmp.npz"
+    np.savez(tmp, **members)
+    os.replace(tmp, path)
+
+
+class ResultStore:
+    """Read-only, field-at-a-time access to a result .npz."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        with zipfile.ZipFile(self.path) as zf:
+            self._members = {info.filename[:-len(".npy")]: info for info in zf.infolist()}
+
+    def __contains__(self, key):
+        return key in self._members or f"{key}/{VALUES}" in self._members
+
+    def fields(self, group):
+        """Field names stored under a group (ragged fields listed once)."""
+        prefix = group + "/"
+        names = []
+        for key in self._members:
+            if key.startswith(prefix):
+                name = key[len(prefix):]
+                for suffix in ("/" + VALUES, "/" + OFFSETS):
+                    if name.endswith(suffix):
+                        name = name[:-len(suffix)]
+                if name not in names:
+                    names.append(name)
+        return names
+
+    def array(self, key):
+        """One member as an array, memory-mapped when stored uncompressed."""
+        info = self._members[key]
+        with open(self.path, "rb") as f:
+            if info.compress_type == zipfile.ZIP_STORED:
+                f.seek(info.header_offset + 26)
+                name_len, extra_len = struct.unpack("<HH", f.read(4))
+                f.seek(info.header_offset + 30 + name_len + extra_len)
+                version = npformat.read_magic(f)
+                if version == (1, 0):
+                    shape, fortran, dtype = npformat.read_array_header_1_0(f)
+                else:
+                    shape, fortran, dtype = npformat.read_array_header_2_0(f)
+                offset = f.tell()
+                if dtype.hasobject or np.prod(shape) == 0 or shape == ():
+                    f.seek(info.header_offset + 30 + name_len + extra_len)
+                    return npformat.read_array(f)
+                # copy-on-write: callers may patch values without touching the file
+                return np.memmap(self.path, dtype=dtype, mode="c", offset=offset,
+                                 shape=shape, order="F" if fortran else "C")
+        with zipfile.ZipFile(self.path) as zf, zf.open(info) as member:
+            return npformat.read_array(member)
+
+    def get(self, group, name):
+        """A field: dense array, list of per-period arrays, or Python scalar/str."""
+        key = f"{group}/{name}"
+        if key in self._members:
+            value = self.array(key)
+            return value.item() if value.ndim == 0 else value
+        return unpack_ragged(self.array(f"{key}/{VALUES}"), self.array(f"{key}/{OFFSETS}"))
+
+    def load(self, group, fields=None):
+        """Dict of the requested fields of a group (all of them by default)."""
+        names = self.fields(group) if fields is None else [f for f in fields if f"{group}/{f}" in self]
+        return {name: self.get(group, name) for name in names}
+
+
+def mat_to_npz(matfile, npzfile=None):
+    """Convert a sbub_run .mat (raw or split-adjusted) to the .npz layout."""
+    matfile = Path(matfile)
+    npzfile = matfile.with_suffix(".npz") if npzfile is None else npzfile
+    mat = loadmat(matfile, squeeze_me=True)
+
+    groups, meta = {}, {}
+    for key, value in mat.items():
+        if key.startswith("__"):
+            continue
+        if isinstance(value, np.ndarray) and value.dtype.names:
+            groups[key] = {name: value[name].item() for name in value.dtype.names}
+        else:
+            meta[key] = value
+    if meta:
+        groups["meta"] = meta
+    save_results(npzfile, **groups)
+    # Manifest lookups (artifact_manifest.find_artifact) then resolve to the .npz
+    record_converted(matfile, npzfile)
+    return npzfile
+
+
+if __name__ == "__main__":
+    for matfile in sys.argv[1:]:
+        print(f"✅ {matfile} → {mat_to_npz(matfile)}")
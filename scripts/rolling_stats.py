@@ -0,0 +1,84 @@
+import numpy as np
+
+
+def _prefix(x):
+    """Prefix sums along axis 0 with a leading zero row: out[k] = sum(x[:k])."""
+    out = np.zeros((x.shape[0] + 1,) + x.shape[1:])
+    np.cumsum(x, axis=0, out=out[1:])
+    return out
+
+
+class RollingWindowStats:
+    """
+    Rolling NaN-aware sums, means and Newey-West terms along axis 0.
+
+    The series (time on axis 0, any number of series on the remaining axes)
+    is summarised once into prefix buffers: valid counts, sums, NaN counts and
+    lag-j cross-products for j = 1..nlags. Any trailing window is then two
+    lookups per statistic, so a full pass over T dates costs O(T * nlags)
+    regardless of the window length. Windows are right-aligned at `ends` and
+    truncated at the start of the series (partial windows), like
+    vt = arange(max(0, t - window + 1), t + 1).
+    """
+
+    def __init__(self, x, nlags=0):
+        x = np.asarray(x, dtype=float)
+        valid = ~np.isnan(x)
+        nvalid = valid.sum(axis=0)
+        # Centre each series before accumulating to keep the prefix sums small
+        self.ref = np.divide(np.where(valid, x, 0).sum(axis=0), nvalid,
+                             out=np.zeros(x.shape[1:]), where=nvalid > 0)
+        xc = np.where(valid, x - self.ref, 0.0)
+
+        self.nlags = nlags
+        self._count = _prefix(valid.astype(float))
+        self._sum = _prefix(xc)
+        self._lag = []
+        for j in range(1, nlags + 1):
+            prod = np.zeros_like(xc)
+            prod[j:] = xc[j:] * xc[:-j]
+            self._lag.append(_prefix(prod))
+
+    def _bounds(self, window, ends):
+        ends = np.asarray(ends, dtype=int)
+        starts = np.maximum(0, ends - window + 1)
+        length = (ends - starts + 1).reshape((-1,) + (1,) * (self._sum.ndim - 1))
+        return starts, ends + 1, length
+
+    def count(self, window, ends):
+        starts, stops, _ = self._bounds(window, ends)
+        return self._count[stops] - self._count[starts]
+
+    def sum(self, window, ends):
+        """np.nansum over each window (0 for all-NaN windows)."""
+        starts, stops, _ = self._bounds(window, ends)
+        return self._sum[stops] - self._sum[starts] + self.ref * self.count(window, ends)
+
+    def mean(self, window, ends):
+        """np.nanmean over each window (NaN for all-NaN windows)."""
+        starts, stops, _ = self._bounds(window, ends)
+        count = self._count[stops] - self._count[starts]
+        csum = self._sum[stops] - self._sum[starts]
+        return np.divide(csum, count, out=np.full(count.shape, np.nan), where=count > 0) + self.ref
+
+    def nw_cov(self, window, ends, m):
+        """nw_cov(x[window], m) for each window; NaN if a NaN enters any lag pair."""
+        if m > self.nlags:
+            raise ValueError(f"nw_cov needs {m} lags but only {self.nlags} were accumulated")
+        starts, stops, length = self._bounds(window, ends)
+        count = self._count[stops] - self._count[starts]
+        total = self._sum[stops] - self._sum[starts]
+        mbar = total / length
+
+        cov_val = np.zeros(total.shape)
+        for j in range(1, m + 1):
+            lagged = self._lag[j - 1]
+            pairs = np.maximum(stops - np.minimum(starts + j, stops), 0)
+            lo = np.minimum(starts + j, stops)
+            cross = lagged[stops] - lagged[lo]
+            head = self._sum[np.maximum(stops - j, starts)] - self._sum[starts]
+            tail = self._sum[stops] - self._sum[lo]
+            npairs = pairs.reshape(length.shape)
+            gam = (cross - mbar * (head + tail) + npairs * mbar ** 2) / length
+            cov_val += (1 - j / (m + 1)) * np.where(npairs > 0, gam, 0.0)
+        return np.where((count == length) | (length == 1), cov_val, np.nan)
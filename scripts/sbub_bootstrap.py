@@ -0,0 +1,235 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from math import factorial
+
+from anticonv_put import anticonv_put
+from anticonv_call import anticonv_call
+from lpoly2 import lpoly2, phi
+from sbub_lp_easy import MINRANGE, MAXCDFJUMP, NINT, PRECIS, common_taulist
+
+# bubout fields replaced by their bootstrap counterparts
+BOOT_SE_FIELDS = ('sbub_qcdfp_se', 'sbub_qcdfc_se', 'sbub_qcdf_se')
+
+
+def lpoly_smoother(xgrid, pk, pow, h, deriv):
+    """
+    Linear smoother for a local-polynomial estimate on a grid.
+
+    With a fixed bandwidth (opth=0), lpoly2(x, pk, g, ...)[0][deriv] is a
+    linear function of g. It equals L[i] @ g for every g, where L is the
+    (len(xgrid), len(pk)) matrix returned here (deriv 0 = level, 1 = slope).
+    """
+    d = pk[None, :] - xgrid[:, None]                       # (nx, nk)
+    w = phi(d / h) / h
+    XX = d[:, :, None] ** np.arange(pow + 1)               # (nx, nk, pow+1)
+    XtW = np.swapaxes(XX * w[:, :, None], 1, 2)            # (nx, pow+1, nk)
+    # lpoly2 solves with lstsq, i.e. the minimum-norm (pseudo-inverse) solution
+    L = np.linalg.pinv(XtW @ XX) @ XtW                     # (nx, pow+1, nk)
+    return factorial(deriv) * L[:, deriv, :]
+
+
+def lpoly_grid(xgrid, pk, G, pow, opth, hnumsd, deriv=1):
+    """lpoly2 estimates (level or slope) of every row of G on xgrid, shape (nrep, nx)."""
+    dk = np.diff(pk) if len(pk) > 1 else np.array([0])
+    h0 = np.mean(dk) * hnumsd if np.any(dk) else 0
+    if opth == 0:
+        return G @ lpoly_smoother(xgrid, pk, pow, h0, deriv).T
+
+    # Data-dependent bandwidths: no shared smoother, evaluate point by point
+    out = np.zeros((G.shape[0], len(xgrid)))
+    for b in range(G.shape[0]):
+        for i in range(len(xgrid)):
+            bg, _, hopt = lpoly2(xgrid[i], pk.reshape(-1, 1), G[b], pow, 0, opth, h0)
+            if opth in (1, 11):
+                bg, _, _ = lpoly2(xgrid[i], pk.reshape(-1, 1), G[b], pow, 0, 0, hopt)
+            out[b, i] = bg[deriv]
+    return out
+
+
+def anticonv_batch(side, x, Y, upbd, nint=NINT, precis=PRECIS):
+    """
+    Batched anticonv_put / anticonv_call.
+
+    Fits every row of Y (nrep, n) on the common strikes x with the same cyclic
+    projection scheme, running all replications in lock-step until each has
+    converged (or nint sweeps). Returns the fitted curves, shape (nrep, n).
+    """
+    nrep, n = Y.shape
+    dx = np.diff(x)
+    dy = np.diff(Y, axis=1)
+    d2y = (Y[:, :n-2] / dx[:n-2]) - ((1/dx[:n-2] + 1/dx[1:]) * Y[:, 1:n-1]) + (Y[:, 2:] / dx[1:])
+
+    # Constraint rows: n-2 convexity rows followed by the two slope bounds
+    a = np.zeros((nrep, n, n+1))
+    i = np.arange(n-2)
+    a[:, i, i] = -1/dx[:n-2]
+    a[:, i, i+1] = 1/dx[:n-2] + 1/dx[1:]
+    a[:, i, i+2] = -1/dx[1:]
+    a[:, i, n] = -d2y
+    if side == 'put':
+        a[:, n-2, 0] = 1
+        a[:, n-2, 1] = -1
+        a[:, n-2, n] = -dy[:, 0]
+        a[:, n-1, n-2] = -1
+        a[:, n-1, n-1] = 1
+        a[:, n-1, n] = dy[:, n-2] - upbd*dx[n-2]
+    else:
+        a[:, n-2, n-1] = 1
+        a[:, n-2, n-2] = -1
+        a[:, n-2, n] = dy[:, n-2]
+        a[:, n-1, 0] = 1
+        a[:, n-1, 1] = -1
+        a[:, n-1, n] = -dy[:, 0] - upbd*dx[0]
+    denom = np.sum(a**2, axis=2)
+
+    u = np.zeros((nrep, n+1))
+    u[:, n] = 1
+    dI = np.zeros((nrep, n+1, n+1))    # one increment per constraint + the u[n] >= 0 step
+    active = np.ones(nrep, dtype=bool)
+    k = 1
+    while k <= nint and active.any():
+        keep = active[:, None]
+        for i in range(n):
+            temp = u - dI[:, :, i]
+            scalar = np.einsum('bk,bk->b', a[:, i, :], temp)
+            hit = (scalar > 0)[:, None]
+            unew = np.where(hit, temp - (scalar / denom[:, i])[:, None] * a[:, i, :], temp)
+            dI[:, :, i] = np.where(keep, unew - temp, dI[:, :, i])
+            u = np.where(keep, unew, u)
+
+        temp = u - dI[:, :, n]
+        unew = temp.copy()
+        unew[-temp[:, n] > precis, n] = 0
+        dI[:, :, n] = np.where(keep, unew - temp, dI[:, :, n])
+        u = np.where(keep, unew, u)
+
+        violated = (np.einsum('bik,bk->bi', a, u) > precis).any(axis=1) | (-u[:, 0] > precis)
+        active &= violated
+        k += 1
+
+    u = u / u[:, n:]
+    return Y + u[:, :n]
+
+
+def cdf_mean(q, xgrid, step, upbd, sout):
+    """
+    Vectorised version of sbub_lp_easy's CDF post-processing for a batch of
+    curves q (nrep, nx): clip, flatten past the first 1 / before the last 0,
+    apply the range/jump acceptance rule and integrate to the implied mean.
+    Returns (mu, accepted), both of shape (nrep,).
+    """
+    q = np.clip(q, 0, 1)
+    q[np.maximum.accumulate(q == 1, axis=1)] = 1
+    q[np.maximum.accumulate((q == 0)[:, ::-1], axis=1)[:, ::-1]] = 0
+
+    qmin, qmax = q.min(axis=1), q.max(axis=1)
+    qrange = qmax - qmin
+    accepted = (qrange > MINRANGE) & (np.diff(q, axis=1).max(axis=1) < MAXCDFJUMP)
+
+    safe_range = np.where(accepted, qrange, 1.0)
+    qnorm = (q - qmin[:, None]) / safe_range[:, None]
+    mu = (np.nansum(1 - qnorm, axis=1) * step + xgrid[0]) * upbd
+    return np.where(accepted, mu, sout), accepted
+
+
+def cell_curves(dataout, t, tau_j):
+    """Put and call strikes/prices, discount bound and spot for one (period, tau) cell."""
+    tau_t = np.array(dataout['tau'][t], dtype=float)
+    cp_t = np.array(dataout['cp'][t], dtype=bool)
+    X_t = np.array(dataout['X'][t], dtype=float)
+    oprice_t = np.array(dataout['oprice'][t], dtype=float)
+    vput = (tau_t == tau_j) & ~cp_t
+    vcall = (tau_t == tau_j) & cp_t
+    upbd = np.exp(-np.array(dataout['tr'][t], dtype=float)[0] * tau_j)
+    return X_t[vput], oprice_t[vput], X_t[vcall], oprice_t[vcall], upbd, float(dataout['sout'][t])
+
+
+def bootstrap_cell(pk, put_prices, ck, call_prices, upbd, sout, pow, nstep, opth, hnumsd,
+                   nboot, seed):
+    """
+    Wild (Rademacher) residual bootstrap of one (period, tau) cell.
+
+    The quote residuals (observed option prices minus the shape-constrained
+    fit) are resampled around the fitted curve, so the replications carry the
+    price noise of the cell. Each replicated quote curve is refitted with the
+    antitonic-convex solver and then put through the batched lpoly grid. The
+    function returns the standard deviations of the put, call and combined
+    bubble estimates across replications (zero for a cell whose quotes already
+    satisfy the shape constraints exactly).
+    """
+    rng = np.random.default_rng(seed)
+    g = anticonv_put(NINT, PRECIS, pk, put_prices, upbd)
+    gc = anticonv_call(NINT, PRECIS, ck, call_prices, upbd)
+    ep, ec = put_prices - g, call_prices - gc
+
+    vp = rng.choice((-1.0, 1.0), size=(nboot, len(pk)))
+    vc = rng.choice((-1.0, 1.0), size=(nboot, len(ck)))
+    Gp = anticonv_batch('put', pk, g + ep * vp, upbd)
+    Gc = anticonv_batch('call', ck, gc + ec * vc, upbd)
+
+    xpk = np.linspace(pk[0], pk[-1], num=nstep + 1)
+    pstep = (pk[-1] - pk[0]) / nstep if nstep != 0 else 0
+    qp = lpoly_grid(xpk, pk, Gp, pow, opth, hnumsd) / upbd
+    mu_p, ok_p = cdf_mean(qp, xpk, pstep, upbd, sout)
+
+    xck = np.linspace(ck[0], ck[-1], num=nstep + 1)
+    cstep = (ck[-1] - ck[0]) / nstep if nstep != 0 else 0
+    qc = 1 + lpoly_grid(xck, ck, Gc, pow, opth, hnumsd) / upbd
+    mu_c, ok_c = cdf_mean(qc, xck, cstep, upbd, sout)
+
+    np_val = np.where(ok_p, len(pk), 0)
+    nc_val = np.where(ok_c, len(ck), 0)
+    n = np_val + nc_val
+    mu = np.where(n > 0, (np_val * mu_p + nc_val * mu_c) / np.maximum(n, 1), sout)
+
+    ddof = 1 if nboot > 1 else 0
+    return (np.std(sout - mu_p, ddof=ddof),
+            np.std(sout - mu_c, ddof=ddof),
+            np.std(sout - mu, ddof=ddof))
+
+
+def _bootstrap_task(args):
+    t, j, curves, params = args
+    return t, j, bootstrap_cell(*curves, *params)
+
+
+def bootstrap_bubble_se(dataout, pow, nstep, opth, hnumsd, nboot=200, workers=None, seed=1234):
+    """
+    Bootstrap standard errors for every (period, tau) cell of a calibration.
+
+    dataout is the dict returned by sbub_lp_easy. Cells are spread over a
+    process pool of `workers` processes (all cores by default, 1 runs in
+    process); each cell draws from its own SeedSequence([seed, t, j]) so
+    results do not depend on the number of workers or their scheduling.
+
+    Returns {field: nperiod x mntau array} for the fields in BOOT_SE_FIELDS.
+    """
+    nperiod = len(dataout['sout'])
+    taulists = [common_taulist(dataout['tau'][t], dataout['cp'][t]) for t in range(nperiod)]
+    mntau = max(len(taulist) for taulist in taulists)
+
+    tasks = [
+        (t, j, cell_curves(dataout, t, tau_j),
+         (pow, nstep, opth, hnumsd, nboot, np.random.SeedSequence([seed, t, j])))
+        for t, taulist in enumerate(taulists)
+        for j, tau_j in enumerate(taulist)
+    ]
+
+    se = {name: np.zeros((nperiod, mntau)) for name in BOOT_SE_FIELDS}
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        results = map(_bootstrap_task, tasks)
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        results = pool.map(_bootstrap_task, tasks, chunksize=max(1, len(tasks) // (4 * workers)))
+
+    try:
+        for t, j, cell_se in results:
+            for name, value in zip(BOOT_SE_FIELDS, cell_se):
+                se[name][t, j] = value
+    finally:
+        if workers != 1:
+            pool.shutdown()
+    return se
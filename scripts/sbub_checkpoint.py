@@ -0,0 +1,79 @@
+"""
+Resumable calibration: periodic checkpoints of the completed sbub_lp_easy periods.
+
+A checkpoint is a small .npz next to the results file holding the bubout rows
+calibrated so far (only the completed periods, not the padded buffer), the
+index of the next period, any cost-ledger rows, and a fingerprint of the
+inputs and settings. Periods are calibrated independently and nothing is
+carried from one period to the next, so resuming from period t gives the same
+results as an uninterrupted run. A checkpoint whose fingerprint does not match
+the current inputs is ignored.
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from sbub_profile import LEDGER_COLUMNS
+
+# Periods between checkpoint writes (SBUB_CHECKPOINT_EVERY=0 disables checkpoints)
+CHECKPOINT_EVERY = int(os.getenv("SBUB_CHECKPOINT_EVERY", "10"))
+
+
+def checkpoint_fingerprint(data_file, count_file, **params):
+    """Hash of the input CSVs and calibration settings a checkpoint belongs to."""
+    digest = hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode())
+    for path in (data_file, count_file):
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def save_checkpoint(path, bubout, next_t, fingerprint, ledger=None):
+    """Atomically write the periods before next_t (bubout is a BubbleResults)."""
+    members = {f'bubout/{name}': bubout.data[name][:next_t] for name in bubout}
+    members['next_t'] = np.int64(next_t)
+    members['fingerprint'] = np.array(fingerprint)
+    if ledger:
+        for col in LEDGER_COLUMNS:
+            members[f'ledger/{col}'] = np.array([row[col] for row in ledger], dtype=float)
+
+    tmp = f"{path}.tmp.npz"
+    np.savez(tmp, **members)
+    os.replace(tmp, path)
+
+
+def load_checkpoint(path, bubout, fingerprint, ledger=None):
+    """
+    Restore a checkpoint's periods into bubout (and ledger) and return the
+    index of the next period to calibrate.
+
+    Returns 0 when there is no usable checkpoint for these inputs.
+    """
+    if not os.path.exists(path):
+        return 0
+    nperiod, mntau = bubout.shape
+    with np.load(path) as ckpt:
+        next_t = int(ckpt['next_t']) if 'next_t' in ckpt.files else -1
+        usable = (str(ckpt['fingerprint']) == fingerprint and 0 <= next_t <= nperiod and all(
+            f'bubout/{name}' in ckpt.files
+            and ckpt[f'bubout/{name}'].dtype == bubout.data[name].dtype
+            and ckpt[f'bubout/{name}'].shape == (next_t, mntau)
+            for name in bubout))
+        if not usable:
+            print(f"⚠️  Ignoring checkpoint {path}: inputs or settings have changed")
+            return 0
+        for name in bubout:
+            bubout.data[name][:next_t] = ckpt[f'bubout/{name}']
+        if ledger is not None and f'ledger/{LEDGER_COLUMNS[0]}' in ckpt.files:
+            columns = [ckpt[f'ledger/{col}'] for col in LEDGER_COLUMNS]
+            ledger.extend(dict(zip(LEDGER_COLUMNS, values)) for values in zip(*columns))
+    print(f"⏯️  Resuming from checkpoint {path} at period {next_t + 1}")
+    return next_t
+
+
+def clear_checkpoint(path):
+    if path and os.path.exists(path):
+        os.remove(path)
@@ -2,31 +2,45 @@ import warnings
 import numpy as np
 import pandas as pd
 import os
+import time
 from anticonv_put import anticonv_put
 from anticonv_call import anticonv_call
 from lpoly2 import lpoly2
 from nw_cov import nw_cov
+from bubout_store import BUBOUT_FIELDS, BubbleResults
+from sbub_checkpoint import (CHECKPOINT_EVERY, checkpoint_fingerprint, clear_checkpoint,
+                             load_checkpoint, save_checkpoint)
 from datetime import datetime
 
 DEBUG = os.getenv("SBUB_DEBUG") == "1"
-
+
+# Curve acceptance thresholds and shape-constrained solver settings
+MINRANGE, MAXCDFJUMP = 0.3, 0.7
+NINT, PRECIS = 500, 1e-5
+
 
 def debug_print(*args, **kwargs):
     if DEBUG:
         print(*args, **kwargs)
 
 
-def sbub_lp_easy(data_file, count_file, yr1, yr2, pow, nstep, opth, hnumsd):
-    # --- settings &  warnings off ---
-    warnings.filterwarnings("ignore", message="Python:nearlySingularMatrix")
-    warnings.filterwarnings("ignore", message="Python:SingularMatrix")
-    minrange, maxcdfjump = 0.3, 0.7
-    nint, precis = 500, 1e-5
-
-    ind_se = 0
-    modelname = 'cls6secp'
-    np.random.seed(1234)
-
+def common_taulist(tau_t, cp_t):
+    """Maturities quoted on both the put and the call side of one period."""
+    tau_t = np.asarray(tau_t, dtype=float)
+    cp_t = np.asarray(cp_t, dtype=bool)
+    ptaulist = np.unique(tau_t[~cp_t])
+    ctaulist = np.unique(tau_t[cp_t])
+    return np.intersect1d(ptaulist, ctaulist)
+
+
+def read_option_panel(data_file, count_file):
+    """
+    Read the option CSV and its count CSV into per-period lists.
+
+    Returns a dict with 'nperiod' plus one {t: list} mapping per column
+    (X, tr, oprice, volume, cp, tau, ...) and the per-period scalars
+    sout (underlying price) and da (MATLAB datenum).
+    """
     # ========= Importing Count Data =========
     if not os.path.exists(count_file):
         raise FileNotFoundError(f"Count file not found: {count_file}")
@@ -98,88 +112,81 @@ def sbub_lp_easy(data_file, count_file, yr1, yr2, pow, nstep, opth, hnumsd):
         # da(t,1)=datenum(dateraw{t}(1),'ddmmmyyyy')
         da[t] = datetime.strptime(dateraw[t][0], '%d%b%Y').toordinal() +366
 
+    return {
+        'nperiod': nperiod,
+        'dateraw': dateraw,
+        'cp_flag': cp_flag,
+        'exdateraw': exdateraw,
+        'tauday': tauday,
+        'X': X,
+        's': s,
+        'tr': tr,
+        'money': money,
+        'oprice': oprice,
+        'volume': volume,
+        'iv': iv,
+        'deltachk': deltachk,
+        'cp': cp,
+        'ncall': ncall,
+        'tau': tau,
+        'sout': sout,
+        'da': da,
+    }
+
+
+def calibrate_periods(panel, pow, nstep, opth, hnumsd, ledger=None, start=0):
+    """
+    Calibrate every period of an option panel, yielding one record per period.
+
+    Each record is a dict with the period index 't', its datenum 'da', the
+    underlying price 'sout', the common maturities 'tau' and, for every name in
+    BUBOUT_FIELDS, a 1-D array with one entry per maturity in 'tau'.
+
+    If ledger is a list, one cost row per (period, tau) cell is appended to it
+    (see sbub_profile.LEDGER_COLUMNS).
+
+    start resumes a run from a checkpoint: periods before start are skipped.
+    """
+    # --- settings &  warnings off ---
+    warnings.filterwarnings("ignore", message="Python:nearlySingularMatrix")
+    warnings.filterwarnings("ignore", message="Python:SingularMatrix")
+    minrange, maxcdfjump = MINRANGE, MAXCDFJUMP
+    nint, precis = NINT, PRECIS
 
+    ind_se = 0
+    np.random.seed(1234)
 
-
-
-    # ========= Calibration =========
-    max_groups = max(
-        len(np.intersect1d(
-            np.unique(np.array(tau[t])[np.array(cp[t],bool)==0]),
-            np.unique(np.array(tau[t])[np.array(cp[t],bool)==1])
-        ))
-        for t in range(nperiod)
-    )
-    mntau = max_groups
-
-    # Create arrays for calibration (dimensions: nperiod x mntau)
-    nkc = np.zeros((nperiod, mntau))
-    nkp = np.zeros((nperiod, mntau))
-    sumvolc = np.zeros((nperiod, mntau))
-    sumvolp = np.zeros((nperiod, mntau))
-
-    otmc = np.zeros((nperiod, mntau))
-    call1_arr = np.zeros((nperiod, mntau))
-    sbub_qcdfp = np.zeros((nperiod, mntau))
-    sbub_qcdfc = np.zeros((nperiod, mntau))
-    sbub_qcdf  = np.zeros((nperiod, mntau))
-
-    sbub_qcdfp_se = np.zeros((nperiod, mntau))
-    sbub_qcdfc_se = np.zeros((nperiod, mntau))
-    sbub_qcdf_se  = np.zeros((nperiod, mntau))
-
-    qcdfp_bias = np.zeros((nperiod, mntau))
-    qcdfc_bias = np.zeros((nperiod, mntau))
-    qcdf_bias  = np.zeros((nperiod, mntau))
-    qcdf_A_lb  = np.zeros((nperiod, mntau))
-    qcdf_A_ub  = np.zeros((nperiod, mntau))
-    qcdf_Ap_lb = np.zeros((nperiod, mntau))
-    qcdf_Ap_ub = np.zeros((nperiod, mntau))
-    qcdf_Ac_lb = np.zeros((nperiod, mntau))
-    qcdf_Ac_ub = np.zeros((nperiod, mntau))
-    qcdf_B1    = np.zeros((nperiod, mntau))
-    qcdf_B21   = np.zeros((nperiod, mntau))
-    qcdf_B22   = np.zeros((nperiod, mntau))
-    qcdf_B23   = np.zeros((nperiod, mntau))
-    qcdf_B3    = np.zeros((nperiod, mntau))
-
-    Bcbub_lb = np.zeros((nperiod, mntau))
-    Bcbub_ub = np.zeros((nperiod, mntau))
-
-    scene = np.zeros((nperiod, mntau))
-    qcdfp_lb = np.zeros((nperiod, mntau))
-    qcdfp_ub = np.zeros((nperiod, mntau))
-    qcdfc_lb = np.zeros((nperiod, mntau))
-    qcdfc_ub = np.zeros((nperiod, mntau))
-    lp = np.zeros((nperiod, mntau))
-    up = np.zeros((nperiod, mntau))
-    lc = np.zeros((nperiod, mntau))
-    uc = np.zeros((nperiod, mntau))
-
-
-
-    # For storing optimal bandwidths, etc.
-    hxopt = {}
+    nperiod = panel['nperiod']
+    X, tr, oprice, volume = panel['X'], panel['tr'], panel['oprice'], panel['volume']
+    cp, tau, sout, da = panel['cp'], panel['tau'], panel['sout'], panel['da']
 
     # Loop over each period t ( t = 0, ..., nperiod-1)
-    for t in range(nperiod):
+    for t in range(start, nperiod):
 
         pb = np.floor(10 * (t+1) / (nperiod+1))
         if t > 0 and pb > np.floor(10 * t / (nperiod+1)):
             print(f"{int(pb):2d} ", end='')
 
-        # Extract tau and cp for period t (as numpy arrays)
+        taulist_common = common_taulist(tau[t], cp[t])
         tau_t = np.array(tau[t])
         cp_t  = np.array(cp[t], dtype=bool)
 
-        # Determine unique tau values for puts and calls respectively:
-        ptaulist = np.unique(tau_t[~cp_t])
-        ctaulist = np.unique(tau_t[cp_t])
-        taulist_common = np.intersect1d(ptaulist, ctaulist)
-
         ntau_t = len(taulist_common)
 
+        # Per-period result rows, one entry per common maturity
+        (otmc, call1_arr, sbub_qcdfp, sbub_qcdfc, sbub_qcdf,
+         sbub_qcdfp_se, sbub_qcdfc_se, sbub_qcdf_se,
+         qcdfp_bias, qcdfc_bias, qcdf_bias,
+         qcdf_A_lb, qcdf_A_ub, qcdf_Ap_lb, qcdf_Ap_ub, qcdf_Ac_lb, qcdf_Ac_ub,
+         qcdf_B1, qcdf_B21, qcdf_B22, qcdf_B23, qcdf_B3,
+         Bcbub_lb, Bcbub_ub,
+         scene,
+         qcdfp_lb, qcdfp_ub, qcdfc_lb, qcdfc_ub,
+         lp, up, lc, uc,
+         nkc, nkp, sumvolc, sumvolp) = (np.zeros(ntau_t) for _ in BUBOUT_FIELDS)
+
         for j in range(ntau_t):
+            cell_start = time.perf_counter()
             # For the j-th tau group in period t:
             vput = (tau_t == taulist_common[j]) & (~cp_t)
             np_val = np.sum(vput)
@@ -214,14 +221,18 @@ def sbub_lp_easy(data_file, count_file, yr1, yr2, pow, nstep, opth, hnumsd):
             upbd = np.exp(-np.array(tr[t])[0] * taulist_common[j])
 
             # Compute puts’ “density” and force it into an N×1 column vector
+            put_stats = {}
+            tic = time.perf_counter()
             g = anticonv_put(
         +       nint, precis,
         +       pk.flatten(),
         +       put_prices.flatten(),
-        +       upbd)
+        +       upbd, stats=put_stats)
+            put_solver_s = time.perf_counter() - tic
 
 
             # Now proceed with the local‐polynomial grid for puts
+            tic = time.perf_counter()
             qcdfp = np.zeros(nxp)
             qcdfp_se_pt = np.zeros(nxp)
             hx0 = np.mean(dk) * hnumsd if np.any(dk) else 0
@@ -243,7 +254,7 @@ def sbub_lp_easy(data_file, count_file, yr1, yr2, pow, nstep, opth, hnumsd):
                 qcdfp_out = bg[1] / upbd
                 qcdfp_se_pt[i] = bg_se[1] / upbd
                 qcdfp[i] = np.clip(qcdfp_out, 0, 1)
-                hxopt.setdefault((t, j), []).append(hpopt0)
+            put_grid_s = time.perf_counter() - tic
 
             # Adjust qcdfp for flat portions
             for i in range(1, nxp):
@@ -279,15 +290,19 @@ def sbub_lp_easy(data_file, count_file, yr1, yr2, pow, nstep, opth, hnumsd):
 
             # === Process Calls (analogous to puts) ===
 
+            call_stats = {}
+            tic = time.perf_counter()
             gc = anticonv_call(
         +        nint, precis,
         +        ck.flatten(),
         +        call_prices.flatten(),
-        +        upbd)
+        +        upbd, stats=call_stats)
+            call_solver_s = time.perf_counter() - tic
 
             cstep = (ck[-1] - ck[0]) / nstep if nstep != 0 else 0
             xck = np.linspace(ck[0], ck[-1], num=nstep+1)
             nxc = len(xck)  
+            tic = time.perf_counter()
             qcdfc = np.zeros(nxc)
             qcdfc_se_pt = np.zeros(nxc)
             hx0 = np.mean(dck) * hnumsd if np.any(dck) else 0
@@ -300,7 +315,7 @@ def sbub_lp_easy(data_file, count_file, yr1, yr2, pow, nstep, opth, hnumsd):
                 qcdfc_out = 1 + bgc[1] / upbd
                 qcdfc_se_pt[i] = bgc_se[1] / upbd
                 qcdfc[i] = np.clip(qcdfc_out, 0, 1)
-                hxopt.setdefault((t, j, 'call'), []).append(hcopt0)
+            call_grid_s = time.perf_counter() - tic
 
             for i in range(1, nxc):
                 if qcdfc[i-1] == 1:
@@ -408,28 +423,28 @@ def sbub_lp_easy(data_file, count_file, yr1, yr2, pow, nstep, opth, hnumsd):
                 if pk[0] <= ck[0] and pk[-1] <= ck[-1] and ck[0] <= pk[-1]:
                     B22 = np_val/n*(upbd*(ck[-1]-pk[-1]) + call_prices[-1] - call_prices[up_c])
                     B23 = nc_val/n*(put_prices[lc_p]-put_prices[0])
-                    scene[t, j] = 1
+                    scene[j] = 1
                 elif ck[0] <= pk[0] and ck[-1] <= pk[-1] and pk[0] <= ck[-1]:
                     B22 = -np_val/n*(put_prices[-1]-put_prices[uc_p])
                     B23 = -nc_val/n*(upbd*(pk[0]-ck[0]) + call_prices[lp_c]-call_prices[0])
-                    scene[t, j] = 2
+                    scene[j] = 2
                 elif pk[0] <= ck[0] and ck[-1] <= pk[-1]:
                     B22 = nc_val/n*(put_prices[lc_p]-put_prices[0])
                     B23 = -np_val/n*(put_prices[-1]-put_prices[uc_p])
-                    scene[t, j] = 3
+                    scene[j] = 3
                 elif ck[0] <= pk[0] and pk[-1] <= ck[-1]:
                     B22 = -nc_val/n*(upbd*(pk[0]-ck[0]) + call_prices[lp_c]-call_prices[0])
                     B23 = np_val/n*(upbd*(ck[-1]-pk[-1]) + call_prices[-1]-call_prices[up_c])
-                    scene[t, j] = 4
+                    scene[j] = 4
                 elif pk[-1] < ck[0]:
                     B22 = nc_val/n*(put_prices[-1]-put_prices[0])
                     B23 = np_val/n*(upbd*(ck[-1]-ck[0]) + call_prices[-1]-call_prices[0])
                     A_ub = call_prices[-1] + upbd
-                    scene[t, j] = 5
+                    scene[j] = 5
                 else:
                     B22 = 0
                     B23 = 0
-                    scene[t, j] = 6
+                    scene[j] = 6
 
             else:
                 B1 = 0
@@ -438,106 +453,144 @@ def sbub_lp_easy(data_file, count_file, yr1, yr2, pow, nstep, opth, hnumsd):
                 B23 = 0
                 B3 = 0
 
-            qcdfp_bias[t, j] = B1p - B2p
-            qcdfc_bias[t, j] = B1c - B2c
-            qcdf_bias[t, j] = B1 - B21 + B22 + B23 - B3
-            qcdf_A_lb[t, j] = A_lb
-            qcdf_A_ub[t, j] = A_ub
-            qcdf_Ap_lb[t, j] = Ap_lb
-            qcdf_Ap_ub[t, j] = Ap_ub
-            qcdf_Ac_lb[t, j] = Ac_lb
-            qcdf_Ac_ub[t, j] = Ac_ub
-            qcdf_B1[t, j] = B1
-            qcdf_B21[t, j] = B21
-            qcdf_B22[t, j] = B22
-            qcdf_B23[t, j] = B23
-            qcdf_B3[t, j] = B3
+            qcdfp_bias[j] = B1p - B2p
+            qcdfc_bias[j] = B1c - B2c
+            qcdf_bias[j] = B1 - B21 + B22 + B23 - B3
+            qcdf_A_lb[j] = A_lb
+            qcdf_A_ub[j] = A_ub
+            qcdf_Ap_lb[j] = Ap_lb
+            qcdf_Ap_ub[j] = Ap_ub
+            qcdf_Ac_lb[j] = Ac_lb
+            qcdf_Ac_ub[j] = Ac_ub
+            qcdf_B1[j] = B1
+            qcdf_B21[j] = B21
+            qcdf_B22[j] = B22
+            qcdf_B23[j] = B23
+            qcdf_B3[j] = B3
 
 
             # compute bub
 
-            otmc[t, j] = call_prices[-1]
-            call1_arr[t, j] = call_prices[0]
+            otmc[j] = call_prices[-1]
+            call1_arr[j] = call_prices[0]
 
-            sbub_qcdfp[t, j] = sout[t] - qcdfp_mu
-            sbub_qcdfc[t, j] = sout[t] - qcdfc_mu
-            sbub_qcdf[t, j] = sout[t] - qcdf_mu
+            sbub_qcdfp[j] = sout[t] - qcdfp_mu
+            sbub_qcdfc[j] = sout[t] - qcdfc_mu
+            sbub_qcdf[j] = sout[t] - qcdf_mu
 
-            sbub_qcdfp_se[t, j] = qcdfp_se
-            sbub_qcdfc_se[t, j] = qcdfc_se
+            sbub_qcdfp_se[j] = qcdfp_se
+            sbub_qcdfc_se[j] = qcdfc_se
             if DEBUG:
-                print(f"[t={t}, j={j}] sbub_qcdfc_se[t, j] (assigned) = {sbub_qcdfc_se[t, j]}")
-            sbub_qcdf_se[t, j] = qcdf_se
+                print(f"[t={t}, j={j}] sbub_qcdfc_se[j] (assigned) = {sbub_qcdfc_se[j]}")
+            sbub_qcdf_se[j] = qcdf_se
 
-            qcdfp_lb[t, j] = np.min(qcdfp)
-            qcdfp_ub[t, j] = np.max(qcdfp)
-            qcdfc_lb[t, j] = np.min(qcdfc)
-            qcdfc_ub[t, j] = np.max(qcdfc)
+            qcdfp_lb[j] = np.min(qcdfp)
+            qcdfp_ub[j] = np.max(qcdfp)
+            qcdfc_lb[j] = np.min(qcdfc)
+            qcdfc_ub[j] = np.max(qcdfc)
 
-            lp[t, j] = pk[0]
-            up[t, j] = pk[-1]
-            lc[t, j] = ck[0]
-            uc[t, j] = ck[-1]
+            lp[j] = pk[0]
+            up[j] = pk[-1]
+            lc[j] = ck[0]
+            uc[j] = ck[-1]
 
-            nkp[t, j] = np_val
-            nkc[t, j] = nc_val
+            nkp[j] = np_val
+            nkc[j] = nc_val
 
-            sumvolc[t, j] = np.sum(volc)
-            sumvolp[t, j] = np.sum(volp)
+            sumvolc[j] = np.sum(volc)
+            sumvolp[j] = np.sum(volp)
 
             qcdfc_range = np.max(qcdfc) - np.min(qcdfc)
             if qcdfc_range > 0:
                 factor = -(1.0 / qcdfc_range - 1.0)
-                Bcbub_lb[t, j] = factor * call_prices[0]
-                Bcbub_ub[t, j] = factor * call_prices[-1]
+                Bcbub_lb[j] = factor * call_prices[0]
+                Bcbub_ub[j] = factor * call_prices[-1]
             else:
-                Bcbub_lb[t, j] = 0.0
-                Bcbub_ub[t, j] = 0.0
-    # end for t
-    # end calibration
+                Bcbub_lb[j] = 0.0
+                Bcbub_ub[j] = 0.0
+
+            if ledger is not None:
+                total_s = time.perf_counter() - cell_start
+                ledger.append({
+                    't': t,
+                    'da': da[t],
+                    'j': j,
+                    'tau': taulist_common[j],
+                    'nput': len(pk),
+                    'ncall': len(ck),
+                    'ngrid': nxp + nxc,
+                    'put_iters': put_stats.get('iterations', 0),
+                    'call_iters': call_stats.get('iterations', 0),
+                    'put_solver_s': put_solver_s,
+                    'call_solver_s': call_solver_s,
+                    'put_grid_s': put_grid_s,
+                    'call_grid_s': call_grid_s,
+                    'post_s': total_s - put_solver_s - call_solver_s - put_grid_s - call_grid_s,
+                    'total_s': total_s,
+                })
+
+        record = {'t': t, 'da': da[t], 'sout': sout[t], 'tau': taulist_common}
+        record.update(zip(BUBOUT_FIELDS, (
+            otmc, call1_arr, sbub_qcdfp, sbub_qcdfc, sbub_qcdf,
+            sbub_qcdfp_se, sbub_qcdfc_se, sbub_qcdf_se,
+            qcdfp_bias, qcdfc_bias, qcdf_bias,
+            qcdf_A_lb, qcdf_A_ub, qcdf_Ap_lb, qcdf_Ap_ub, qcdf_Ac_lb, qcdf_Ac_ub,
+            qcdf_B1, qcdf_B21, qcdf_B22, qcdf_B23, qcdf_B3,
+            Bcbub_lb, Bcbub_ub,
+            scene,
+            qcdfp_lb, qcdfp_ub, qcdfc_lb, qcdfc_ub,
+            lp, up, lc, uc,
+            nkc, nkp, sumvolc, sumvolp,
+        )))
+        yield record
+
+
+def sbub_lp_easy_iter(data_file, count_file, pow, nstep, opth, hnumsd, ledger=None):
+    """
+    Streaming variant of sbub_lp_easy.
+
+    Yields one compact record per period (see calibrate_periods) as soon as that
+    period is calibrated, so consumers can write or aggregate results without
+    holding the full nperiod x mntau panel in memory.
+    """
+    panel = read_option_panel(data_file, count_file)
+    yield from calibrate_periods(panel, pow, nstep, opth, hnumsd, ledger=ledger)
+
+
+def sbub_lp_easy(data_file, count_file, yr1, yr2, pow, nstep, opth, hnumsd, ledger=None,
+                 precision='float64', checkpoint=None, resume=False):
+    """
+    Calibrate a ticker's option panel; returns (bubout, dataout, setout).
+
+    If checkpoint is a path, the completed periods are saved there every
+    CHECKPOINT_EVERY periods and the file is removed once the run finishes.
+    resume=True continues from that checkpoint (see sbub_checkpoint).
+    """
+    modelname = 'cls6secp'
 
-    # --- Report ---
-    bubout = {}
-    bubout['otmc'] = otmc
-    bubout['call1'] = call1_arr
-    bubout['sbub_qcdfp'] = sbub_qcdfp
-    bubout['sbub_qcdfc'] = sbub_qcdfc
-    bubout['sbub_qcdf'] = sbub_qcdf
-    bubout['sbub_qcdfp_se'] = sbub_qcdfp_se
-    bubout['sbub_qcdfc_se'] = sbub_qcdfc_se
-    bubout['sbub_qcdf_se'] = sbub_qcdf_se
-
-    bubout['qcdfp_bias'] = qcdfp_bias
-    bubout['qcdfc_bias'] = qcdfc_bias
-    bubout['qcdf_bias'] = qcdf_bias
-    bubout['qcdf_A_lb'] = qcdf_A_lb
-    bubout['qcdf_A_ub'] = qcdf_A_ub
-    bubout['qcdf_Ap_lb'] = qcdf_Ap_lb
-    bubout['qcdf_Ap_ub'] = qcdf_Ap_ub
-    bubout['qcdf_Ac_lb'] = qcdf_Ac_lb
-    bubout['qcdf_Ac_ub'] = qcdf_Ac_ub
-    bubout['qcdf_B1'] = qcdf_B1
-    bubout['qcdf_B21'] = qcdf_B21
-    bubout['qcdf_B22'] = qcdf_B22
-    bubout['qcdf_B23'] = qcdf_B23
-    bubout['qcdf_B3'] = qcdf_B3
-
-    bubout['Bcbub_lb'] = Bcbub_lb
-    bubout['Bcbub_ub'] = Bcbub_ub
-
-    bubout['scene'] = scene
-    bubout['qcdfp_lb'] = qcdfp_lb
-    bubout['qcdfp_ub'] = qcdfp_ub
-    bubout['qcdfc_lb'] = qcdfc_lb
-    bubout['qcdfc_ub'] = qcdfc_ub
-    bubout['lp'] = lp
-    bubout['up'] = up
-    bubout['lc'] = lc
-    bubout['uc'] = uc
-    bubout['nkc'] = nkc
-    bubout['nkp'] = nkp
-    bubout['sumvolc'] = sumvolc
-    bubout['sumvolp'] = sumvolp
+    panel = read_option_panel(data_file, count_file)
+    nperiod = panel['nperiod']
+
+    # ========= Calibration =========
+    mntau = max(len(common_taulist(panel['tau'][t], panel['cp'][t])) for t in range(nperiod))
+
+    # Collect the per-period records into one nperiod x mntau result store
+    bubout = BubbleResults.empty(nperiod, mntau, precision)
+    start = 0
+    if checkpoint:
+        fingerprint = checkpoint_fingerprint(data_file, count_file, yr1=yr1, yr2=yr2, pow=pow,
+                                             nstep=nstep, opth=opth, hnumsd=hnumsd,
+                                             precision=precision)
+        if resume:
+            start = load_checkpoint(checkpoint, bubout, fingerprint, ledger)
+    for record in calibrate_periods(panel, pow, nstep, opth, hnumsd, ledger=ledger,
+                                    start=start):
+        bubout.set_period(record['t'], record)
+        done = record['t'] + 1
+        if checkpoint and CHECKPOINT_EVERY > 0 and done % CHECKPOINT_EVERY == 0 and done < nperiod:
+            save_checkpoint(checkpoint, bubout, done, fingerprint, ledger)
+    clear_checkpoint(checkpoint)
+    # end calibration
 
     filesource = os.path.basename(data_file).replace(".csv", "")
     setout = {}
@@ -552,15 +605,15 @@ def sbub_lp_easy(data_file, count_file, yr1, yr2, pow, nstep, opth, hnumsd):
     setout['nperiod'] = nperiod
 
     dataout = {}
-    dataout['sout'] = sout
-    dataout['oprice'] = oprice
-    dataout['cp'] = cp
-    dataout['X'] = X
-    dataout['tau'] = tau
-    dataout['tr'] = tr
-    dataout['da'] = da
+    dataout['sout'] = panel['sout']
+    dataout['oprice'] = panel['oprice']
+    dataout['cp'] = panel['cp']
+    dataout['X'] = panel['X']
+    dataout['tau'] = panel['tau']
+    dataout['tr'] = panel['tr']
+    dataout['da'] = panel['da']
     if DEBUG:
-        print("sbub_qcdfc_se array at end:", sbub_qcdfc_se)
+        print("sbub_qcdfc_se array at end:", bubout['sbub_qcdfc_se'])
 
 
     return bubout, dataout, setout
@@ -0,0 +1,45 @@
+import os
+import pandas as pd
+
+# Opt-in instrumentation for sbub_lp_easy: SBUB_PROFILE=1 collects a cost ledger
+PROFILE = os.getenv("SBUB_PROFILE") == "1"
+
+# One row per (period, tau) cell, as appended by sbub_lp_easy.calibrate_periods
+LEDGER_COLUMNS = [
+    't', 'da', 'j', 'tau',
+    'nput', 'ncall', 'ngrid', 'put_iters', 'call_iters',
+    'put_solver_s', 'call_solver_s', 'put_grid_s', 'call_grid_s', 'post_s', 'total_s',
+]
+STAGE_COLUMNS = ['put_solver_s', 'call_solver_s', 'put_grid_s', 'call_grid_s', 'post_s']
+
+
+def ledger_frame(ledger):
+    """Turn a list of ledger rows into a DataFrame with the standard column order."""
+    return pd.DataFrame(ledger, columns=LEDGER_COLUMNS)
+
+
+def save_cost_ledger(ledger, path):
+    """Write the cost ledger as a compact CSV (e.g. next to the .mat file)."""
+    df = ledger_frame(ledger)
+    df.to_csv(path, index=False, float_format="%.6g")
+    return df
+
+
+def report_cost_ledger(ledger, top=10):
+    """Print per-stage totals and the top-N slowest (period, tau) cells."""
+    df = ledger_frame(ledger)
+    if df.empty:
+        print("No calibrated cells recorded.")
+        return df
+
+    total = df['total_s'].sum()
+    print(f"Calibrated {len(df)} cells in {total:.2f}s")
+    for col in STAGE_COLUMNS:
+        share = df[col].sum() / total * 100 if total > 0 else 0.0
+        print(f"  {col[:-2]:<12} {df[col].sum():9.2f}s  ({share:5.1f}%)")
+
+    slowest = df.nlargest(top, 'total_s')
+    print(f"Top {len(slowest)} slowest cells:")
+    print(slowest[['t', 'da', 'tau', 'nput', 'ncall', 'put_iters', 'call_iters', 'total_s']]
+          .to_string(index=False, float_format=lambda v: f"{v:.4g}"))
+    return slowest
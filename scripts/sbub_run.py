@@ -1,12 +1,18 @@
 import os
+import sys
 import numpy as np
 import pandas as pd
 from datetime import datetime
 from scipy.io import savemat
 from sbub_lp_easy import sbub_lp_easy
-from sbub_split import sbub_split
+from sbub_split import split_adjust
+from sbub_profile import PROFILE, save_cost_ledger, report_cost_ledger
+from sbub_bootstrap import bootstrap_bubble_se
+from result_store import save_results
+from artifact_manifest import record_artifact
 import requests
 from yahoo_csv_utils import rebuild_count_csv
+from ticker_pool import parse_workers, run_tickers
 
 # ---------------------------------------------------------------------------
 # Vercel Blob configuration
@@ -40,117 +46,274 @@ def download_csv_from_blob(blob_path: str, local_path: str) -> bool:
         raise RuntimeError(f"Failed to download {blob_path}: {e}") from e
 
 
+# ──────────────── Parameters ────────────────
+current_year = datetime.now().year
+yr1, yr2 = '2025', str(current_year)
+pow, nstep, opth, hnumsd = 2, 200, 0, 5
+# Storage precision of the reported bubout fields (SBUB_PRECISION=float32 halves the
+# results files; published values then differ by up to ~5e-5 relative)
+precision = os.getenv("SBUB_PRECISION", "float64")
+# Bootstrap standard errors (SBUB_NBOOT replications, 0 = analytic SEs only)
+nboot = int(os.getenv("SBUB_NBOOT", "0"))
+# Bootstrap processes per ticker (SBUB_BOOT_WORKERS); by default the cores are
+# shared between the --workers ticker processes instead of each taking them all
+boot_workers = (int(os.getenv("SBUB_BOOT_WORKERS", "0"))
+                or max(1, (os.cpu_count() or 1) // parse_workers()))
+# Store only the per-date split factor; bubble_estimator rescales on read
+split_factor_only = os.getenv("SBUB_SPLIT_FACTOR_ONLY") == "1"
+# Result storage backend: "mat" (savemat) or "npz" (columnar, memory-mappable)
+store_format = os.getenv("SBUB_STORE", "mat")
+# --export-json hands results in memory to bubble_estimator (no .mat round trip);
+# the intermediate result files are then only written with --keep-intermediates
+export_json = "--export-json" in sys.argv[1:]
+keep_intermediates = not export_json or "--keep-intermediates" in sys.argv[1:]
+# --resume continues an interrupted calibration from its checkpoint
+# (written every SBUB_CHECKPOINT_EVERY periods next to the results file)
+resume = "--resume" in sys.argv[1:]
+
+csv_dir    = "data/csv"
+output_dir = "data/mat"
+
+
+def csv_size(stockcode):
+    """Fallback cost estimate: size of the ticker's option CSV (a proxy for its row count)."""
+    path = f"{csv_dir}/optout_{stockcode}.csv"
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+def print_header(idx, total, stockcode):
+    print("=" * 50)
+    print(f"[{idx}/{total}] Processing {stockcode}...")
+    print("=" * 50)
+
+
+def ticker_csv_paths(stockcode):
+    """Local option and count CSVs for a ticker, fetched/rebuilt as needed; None if unavailable."""
+    data_file  = f"{csv_dir}/optout_{stockcode}.csv"
+    count_file = f"{csv_dir}/optout_{stockcode}_count.csv"
+
+    # Prefer job artifacts when they are already present locally.
+    # Fall back to the main Blob CSV when running this script independently.
+    data_ok = os.path.exists(data_file)
+    count_ok = os.path.exists(count_file)
+
+    if data_ok:
+        print(f"📦 Using local artifact for {data_file}")
+    else:
+        data_ok = download_csv_from_blob(f"csv/optout_{stockcode}.csv", data_file)
+
+    if count_ok:
+        print(f"📦 Using local artifact for {count_file}")
+    elif data_ok:
+        rebuild_count_csv(data_file, count_file)
+        count_ok = True
+        print(f"🔁 Rebuilt derived count CSV for {stockcode}: {count_file}")
+    else:
+        print(f"⏭️  Skipping {stockcode} — main CSV missing in Blob.\n")
+        return None
+    return data_file, count_file
+
+
+def result_paths(stockcode):
+    """Raw and split-adjusted result paths for a ticker (.mat or .npz, per SBUB_STORE)."""
+    dataname  = f"optout_{stockcode}_{yr1}to{yr2}_h{opth}_hsd{hnumsd}_nstep{nstep}"
+    dataname2 = f"optout_{stockcode}_{yr1}to{yr2}_splitadj_h{opth}_hsd{hnumsd}_nstep{nstep}"
+    ext = "." + store_format
+    return os.path.join(output_dir, dataname + ext), os.path.join(output_dir, dataname2 + ext)
+
+
+def artifact_params():
+    """Calibration settings recorded with every result file in the artifact manifest."""
+    return {'pow': pow, 'nstep': nstep, 'opth': opth, 'hnumsd': hnumsd,
+            'precision': precision, 'nboot': nboot, 'store': store_format}
+
+
+def dataout_columns(dataout, nperiod):
+    """dataout in the columnar layout: dense sout/da arrays, per-period lists for the rest."""
+    cols = {
+        'sout': np.array([dataout['sout'][t] for t in range(nperiod)], dtype=float),
+        'da'  : np.array([dataout['da'][t]   for t in range(nperiod)], dtype=float),
+    }
+    for name in ('tr', 'oprice', 'cp', 'X', 'tau'):
+        cols[name] = [np.asarray(dataout[name][t], float) for t in range(nperiod)]
+    return cols
+
+
+def calibrate_ticker(stockcode, data_file, count_file, save=True):
+    """
+    Run sbub_lp_easy and save the raw results file (unless save=False). With
+    bootstrap SEs enabled the calibration is saved first, so a failing
+    bootstrap never loses it, and saved again once the SEs are attached.
+    """
+    matfile, _ = result_paths(stockcode)
+
+    # ──────────────── Bubble estimation ────────────────
+    print(f"Running bubble estimation for {stockcode}...")
+    ledger = [] if PROFILE else None
+    bubout, dataout, setout = sbub_lp_easy(
+        data_file,
+        count_file,
+        yr1,
+        yr2,
+        pow,
+        nstep,
+        opth,
+        hnumsd,
+        ledger=ledger,
+        precision=precision,
+        checkpoint=os.path.splitext(matfile)[0] + "_checkpoint.npz",
+        resume=resume
+    )
+
+    setout['nboot'] = 0
+    if save:
+        save_raw_results(stockcode, matfile, bubout, dataout, setout)
+        report_ledger(ledger, matfile)
+
+    if nboot > 0:
+        print(f"Bootstrapping standard errors for {stockcode} ({nboot} replications)...")
+        boot_se = bootstrap_bubble_se(dataout, pow, nstep, opth, hnumsd,
+                                      nboot=nboot, workers=boot_workers)
+        for name, se in boot_se.items():
+            bubout.set_field(name, se)
+        setout['nboot'] = nboot
+        if save:
+            save_raw_results(stockcode, matfile, bubout, dataout, setout)
+    return bubout, dataout, setout
+
+
+def save_raw_results(stockcode, matfile, bubout, dataout, setout):
+    """Save the raw calibration results (bubout, dataout, setout) and record them in the manifest."""
+    nperiod = int(setout['nperiod'])
+    setout_struct = {
+        k: np.array(v, dtype=float) if isinstance(v, (int, float)) else v
+        for k, v in setout.items()
+    }
+    meta = {
+        'stockcode' : stockcode,
+        'filesource': f"optout_{stockcode}",
+        'yr1'       : yr1,
+        'yr2'       : yr2,
+        'pow'       : float(pow),
+        'nstep'     : float(nstep),
+        'opth'      : float(opth),
+        'hnumsd'    : float(hnumsd),
+    }
+
+    if store_format == "npz":
+        # Dense panels as plain arrays, per-period lists as values + offsets
+        save_results(matfile, bubout=bubout.as_dict(), dataout=dataout_columns(dataout, nperiod),
+                     setout=setout_struct, meta=meta)
+        record_artifact(matfile, stockcode, "raw", yr1, yr2, nperiod, **artifact_params())
+        print(f"✅ Saved bubble results to {matfile}")
+        return
+
+    # Build dataout_struct
+    dataout_struct = {
+        'sout'   : np.array([dataout['sout'][t]  for t in range(nperiod)], dtype=float)[None, :],
+        'da'     : np.array([dataout['da'][t]    for t in range(nperiod)], dtype=float)[None, :],
+        'tr'     : np.array([np.array(dataout['tr'][t],     float) for t in range(nperiod)], dtype=object)[None, :],
+        'oprice' : np.array([np.array(dataout['oprice'][t], float) for t in range(nperiod)], dtype=object)[None, :],
+        'cp'     : np.array([np.array(dataout['cp'][t],     float) for t in range(nperiod)], dtype=object)[None, :],
+        'X'      : np.array([np.array(dataout['X'][t],      float) for t in range(nperiod)], dtype=object)[None, :],
+        'tau'    : np.array([np.array(dataout['tau'][t],    float) for t in range(nperiod)], dtype=object)[None, :],
+    }
+
+    # Save MAT file locally (used by bubble_estimator.py in the same job)
+    mat_dict = {
+        'bubout'    : bubout.as_dict(),
+        'dataout'   : dataout_struct,
+        'setout'    : setout_struct,
+        **meta,
+    }
+    savemat(matfile, mat_dict)
+    record_artifact(matfile, stockcode, "raw", yr1, yr2, nperiod, **artifact_params())
+    print(f"✅ Saved bubble results to {matfile}")
+
+
+def report_ledger(ledger, matfile):
+    """Save and summarise the calibration cost ledger (SBUB_PROFILE=1)."""
+    if ledger is None:
+        return
+    ledgerfile = os.path.splitext(matfile)[0] + "_profile.csv"
+    save_cost_ledger(ledger, ledgerfile)
+    print(f"⏱️  Saved calibration cost ledger to {ledgerfile}")
+    report_cost_ledger(ledger)
+
+
+def save_split_adjusted(stockcode, adjout):
+    """Save adjout to the split-adjusted results file (only the split factor with SBUB_SPLIT_FACTOR_ONLY=1)."""
+    _, splitfile = result_paths(stockcode)
+    if split_factor_only:
+        adjout = {k: v for k, v in adjout.items() if k.startswith('split_')}
+    adjout_clean = {k: (v if v is not None else np.array([])) for k, v in adjout.items()}
+    if store_format == "npz":
+        save_results(splitfile, adjout=adjout_clean)
+    else:
+        savemat(splitfile, {'adjout': adjout_clean})
+    record_artifact(splitfile, stockcode, "splitadj", yr1, yr2,
+                    np.size(adjout['split_factor']), **artifact_params())
+    print(f"✅ Saved split-adjusted results to {splitfile}")
+
+
+def process_ticker(stockcode):
+    """
+    Calibrate, split-adjust and save one ticker; returns False if it was skipped or failed.
+
+    With --export-json the in-memory results go straight on to bubble_estimator's
+    JSON export, and the result files are only written with --keep-intermediates.
+    """
+    try:
+        csv_paths = ticker_csv_paths(stockcode)
+        if csv_paths is None:
+            return False
+        bubout, dataout, setout = calibrate_ticker(stockcode, *csv_paths, save=keep_intermediates)
+
+        # ──────────────── Split adjustment ────────────────
+        print(f"Running split adjustment for {stockcode}...")
+        adjout = split_adjust(stockcode, bubout, dataout, yr1, yr2)
+        if keep_intermediates:
+            save_split_adjusted(stockcode, adjout)
+        print()
+
+        if export_json:
+            # ──────────────── JSON export (fused) ────────────────
+            import bubble_estimator
+            dataout_cols = dataout_columns(dataout, int(setout['nperiod']))
+            return bubble_estimator.process_stock(
+                stockcode, plot=False, results=(adjout, bubout.as_dict(), setout, dataout_cols))
+
+    except Exception as e:
+        print(f"❌ Error processing {stockcode} during bubble estimation: {e}\n")
+        return False
+    return True
+
+
 def main():
     # ──────────────── Ticker list ────────────────
     stockcodelist = ['AAPL', 'AIG', 'AMD', 'AMZN', 'BA', 'BABA', 'BAC', 'C', 'CSCO',
                      'DIS', 'F', 'GE', 'GM', 'GOOG', 'INTC', 'JPM', 'META', 'MS',
                      'MSFT', 'NVDA', 'T', 'TSLA', 'WFC', 'XOM', 'SPX']
 
-    # ──────────────── Parameters ────────────────
-    current_year = datetime.now().year
-    yr1, yr2 = '2025', str(current_year)
-    pow, nstep, opth, hnumsd = 2, 200, 0, 5
-
-    csv_dir    = "data/csv"
-    output_dir = "data/mat"
+    workers = parse_workers()
     os.makedirs(csv_dir,    exist_ok=True)
     os.makedirs(output_dir, exist_ok=True)
 
     print(f"Found {len(stockcodelist)} tickers to process: {', '.join(stockcodelist)}\n")
 
-    for idx, stockcode in enumerate(stockcodelist, 1):
-        print("=" * 50)
-        print(f"[{idx}/{len(stockcodelist)}] Processing {stockcode}...")
-        print("=" * 50)
-
-        try:
-            # ── Build local CSV paths ──
-            data_file  = f"{csv_dir}/optout_{stockcode}.csv"
-            count_file = f"{csv_dir}/optout_{stockcode}_count.csv"
-
-            # Prefer job artifacts when they are already present locally.
-            # Fall back to the main Blob CSV when running this script independently.
-            data_ok = os.path.exists(data_file)
-            count_ok = os.path.exists(count_file)
-
-            if data_ok:
-                print(f"📦 Using local artifact for {data_file}")
-            else:
-                data_ok = download_csv_from_blob(f"csv/optout_{stockcode}.csv", data_file)
-
-            if count_ok:
-                print(f"📦 Using local artifact for {count_file}")
-            elif data_ok:
-                rebuild_count_csv(data_file, count_file)
-                count_ok = True
-                print(f"🔁 Rebuilt derived count CSV for {stockcode}: {count_file}")
-            else:
-                print(f"⏭️  Skipping {stockcode} — main CSV missing in Blob.\n")
-                continue
-
-            # ── Build MAT filenames ──
-            dataname  = f"optout_{stockcode}_{yr1}to{yr2}_h{opth}_hsd{hnumsd}_nstep{nstep}"
-            matfile   = os.path.join(output_dir, dataname + ".mat")
-            dataname2 = f"optout_{stockcode}_{yr1}to{yr2}_splitadj_h{opth}_hsd{hnumsd}_nstep{nstep}"
-            splitfile = os.path.join(output_dir, dataname2 + ".mat")
-
-            # ──────────────── Bubble estimation ────────────────
-            print(f"Running bubble estimation for {stockcode}...")
-            bubout, dataout, setout = sbub_lp_easy(
-                data_file,
-                count_file,
-                yr1,
-                yr2,
-                pow,
-                nstep,
-                opth,
-                hnumsd
-            )
-
-            # Build dataout_struct
-            nperiod = int(setout['nperiod'])
-            dataout_struct = {
-                'sout'   : np.array([dataout['sout'][t]  for t in range(nperiod)], dtype=float)[None, :],
-                'da'     : np.array([dataout['da'][t]    for t in range(nperiod)], dtype=float)[None, :],
-                'tr'     : np.array([np.array(dataout['tr'][t],     float) for t in range(nperiod)], dtype=object)[None, :],
-                'oprice' : np.array([np.array(dataout['oprice'][t], float) for t in range(nperiod)], dtype=object)[None, :],
-                'cp'     : np.array([np.array(dataout['cp'][t],     float) for t in range(nperiod)], dtype=object)[None, :],
-                'X'      : np.array([np.array(dataout['X'][t],      float) for t in range(nperiod)], dtype=object)[None, :],
-                'tau'    : np.array([np.array(dataout['tau'][t],    float) for t in range(nperiod)], dtype=object)[None, :],
-            }
-
-            setout_struct = {
-                k: np.array(v, dtype=float) if isinstance(v, (int, float)) else v
-                for k, v in setout.items()
-            }
-
-            # Save MAT file locally (used by bubble_estimator.py in the same job)
-            mat_dict = {
-                'bubout'    : bubout,
-                'dataout'   : dataout_struct,
-                'setout'    : setout_struct,
-                'stockcode' : stockcode,
-                'filesource': f"optout_{stockcode}",
-                'yr1'       : yr1,
-                'yr2'       : yr2,
-                'pow'       : float(pow),
-                'nstep'     : float(nstep),
-                'opth'      : float(opth),
-                'hnumsd'    : float(hnumsd),
-            }
-            savemat(matfile, mat_dict)
-            print(f"✅ Saved bubble results to {matfile}")
-
-            # ──────────────── Split adjustment ────────────────
-            print(f"Running split adjustment for {stockcode}...")
-            adjout, dataout_split, bubout_split = sbub_split(stockcode, matfile, yr1, yr2)
-            adjout_clean = {k: (v if v is not None else np.array([])) for k, v in adjout.items()}
-            savemat(splitfile, {'adjout': adjout_clean})
-            print(f"✅ Saved split-adjusted results to {splitfile}\n")
-
-        except Exception as e:
-            print(f"❌ Error processing {stockcode} during bubble estimation: {e}\n")
-            continue
+    # --workers N runs tickers in a process pool, heaviest first
+    summaries = {} if export_json else None
+    results = run_tickers(process_ticker, stockcodelist, "sbub_run", workers=workers,
+                          fallback_cost=csv_size, header=print_header, outputs=summaries)
+
+    if export_json:
+        # Fused exports return their summary.json entries, and the figures are
+        # rendered afterwards, as in bubble_estimator.main
+        import bubble_estimator
+        if not bubble_estimator.SHARD_YEARS:
+            bubble_estimator.write_summary(summaries, [t for t, ok in results.items() if not ok])
+            if bubble_estimator.PLOTS:
+                bubble_estimator.run_plots(list(summaries), workers)
 
 
 if __name__ == "__main__":
@@ -1,203 +1,146 @@
+import hashlib
+import os
+from collections.abc import Mapping
+from functools import lru_cache
 
 import numpy as np
+import pandas as pd
 from scipy.io import loadmat
 from datetime import datetime
 import scipy.io as sio
 
+from result_store import ResultStore
+
+# Split history table (ticker, date, ratio), one row per split
+SPLIT_REGISTRY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "split_registry.csv")
+
+# bubout fields expressed in share-price units; adjout stores them as <name>_adj
+SPLIT_ADJ_FIELDS = (
+    'otmc',
+    'sbub_qcdfp', 'sbub_qcdfc', 'sbub_qcdf',
+    'qcdfp_bias', 'qcdfc_bias', 'qcdf_bias',
+    'sbub_qcdfp_se', 'sbub_qcdfc_se', 'sbub_qcdf_se',
+    'qcdf_A_lb', 'qcdf_A_ub', 'qcdf_Ap_lb', 'qcdf_Ap_ub', 'qcdf_Ac_lb', 'qcdf_Ac_ub',
+)
+
 def datenum(date_str, fmt='%d-%b-%Y'):
     """Convert a date string (e.g. '21-Jun-2000') to a MATLAB datenum equivalent."""
     return datetime.strptime(date_str, fmt).toordinal() + 366
 
+@lru_cache(maxsize=None)
+def load_split_registry(path=SPLIT_REGISTRY):
+    """Load the split table once: {ticker: (split datenums, split ratios)}, sorted by date."""
+    df = pd.read_csv(path, parse_dates=['date']).sort_values('date', kind='mergesort')
+    registry = {}
+    for ticker, rows in df.groupby('ticker', sort=False):
+        splitdn = np.array([d.toordinal() + 366 for d in rows['date']], dtype=float)
+        registry[ticker] = (splitdn, rows['ratio'].to_numpy(dtype=float))
+    return registry
+
+@lru_cache(maxsize=None)
+def registry_version(path=SPLIT_REGISTRY):
+    """Short content hash of the whole split registry file."""
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:12]
+
+def registry_hash(stockcode, registry=None):
+    """Hash of one ticker's registry entry; changes when its splits are added or corrected."""
+    if registry is None:
+        registry = load_split_registry()
+    splitdn, splitratio = registry.get(stockcode, (np.array([]), np.array([])))
+    digest = hashlib.sha256(np.asarray(splitdn, dtype=float).tobytes())
+    digest.update(np.asarray(splitratio, dtype=float).tobytes())
+    return digest.hexdigest()[:16]
+
+def split_factors(stockcode, da, yr1, yr2, registry=None):
+    """
+    Cumulative split factor for every date in da.
+
+    factor[t] is the product of the ratios of all splits strictly inside
+    (1-Jan-yr1, 31-Dec-yr2) that happen after da[t]; dividing a pre-split
+    value by it expresses it in post-split units.
+    """
+    if registry is None:
+        registry = load_split_registry()
+    da = np.atleast_1d(np.asarray(da, dtype=float))
+    splitdn, splitratio = registry.get(stockcode, (np.array([]), np.array([])))
+
+    inrange = (splitdn > datenum("1-Jan-" + str(yr1))) & (splitdn < datenum("31-Dec-" + str(yr2)))
+    splitdn, splitratio = splitdn[inrange], splitratio[inrange]
+
+    # cum[k] = product of the ratios of splits k, k+1, ...
+    cum = np.append(np.cumprod(splitratio[::-1])[::-1], 1.0)
+    return cum[np.searchsorted(splitdn, da, side='right')]
+
+def apply_split_factor(bubout, sout, factor):
+    """
+    Build adjout from raw results and a per-date split factor.
+
+    All SPLIT_ADJ_FIELDS are stacked and rescaled in a single broadcast; the
+    storage dtype of the inputs (e.g. float32) is kept.
+    """
+    factor = np.asarray(factor, dtype=float)
+    stacked = np.stack([np.asarray(bubout[name]) for name in SPLIT_ADJ_FIELDS])
+    dtype = stacked.dtype if np.issubdtype(stacked.dtype, np.floating) else float
+    adjusted = (stacked / factor.reshape((1, -1) + (1,) * (stacked.ndim - 2))).astype(dtype, copy=False)
+
+    adjout = {"sout_adj": np.asarray(sout, dtype=float) / factor}
+    for k, name in enumerate(SPLIT_ADJ_FIELDS):
+        adjout[name + "_adj"] = adjusted[k]
+    return adjout
+
+def _period_vector(values):
+    """Per-period values as a 1-D array; accepts sbub_lp_easy's {t: value} dicts."""
+    if isinstance(values, Mapping):
+        values = [values[t] for t in range(len(values))]
+    return np.ravel(np.asarray(values, dtype=float))
+
+def split_adjust(stockcode, bubout, dataout, yr1, yr2):
+    """
+    Split-adjust in-memory results, e.g. straight from sbub_lp_easy.
+
+    bubout is any mapping holding SPLIT_ADJ_FIELDS (a BubbleResults or a plain
+    dict); dataout needs 'da' and 'sout'. Returns adjout.
+    """
+    factor = split_factors(stockcode, _period_vector(dataout['da']), yr1, yr2)
+    adjout = apply_split_factor(bubout, _period_vector(dataout['sout']), factor)
+    adjout["split_factor"] = factor
+    adjout["split_registry_version"] = registry_version()
+    adjout["split_registry_hash"] = registry_hash(stockcode)
+    return adjout
+
+def resplit_adjout(stockcode, adjout, da, yr1, yr2):
+    """
+    Bring a stored adjout up to date with the current split registry.
+
+    Only rows whose cumulative factor changed are touched: they are rescaled by
+    old/new factor. Returns the updated adjout and the indices of those rows.
+    """
+    new_factor = split_factors(stockcode, _period_vector(da), yr1, yr2)
+    old_factor = np.ravel(np.asarray(adjout["split_factor"], dtype=float))
+    rows = np.flatnonzero(new_factor != old_factor)
+    ratio = old_factor[rows] / new_factor[rows]
+
+    adjout = dict(adjout)
+    for key in ("sout_adj",) + tuple(name + "_adj" for name in SPLIT_ADJ_FIELDS):
+        if key not in adjout:
+            continue
+        values = np.array(adjout[key], copy=True)
+        values[rows] = values[rows] * ratio.reshape((-1,) + (1,) * (values.ndim - 1))
+        adjout[key] = values
+    adjout["split_factor"] = new_factor
+    adjout["split_registry_version"] = registry_version()
+    adjout["split_registry_hash"] = registry_hash(stockcode)
+    return adjout, rows
+
 def sbub_split(stockcode, dataname, yr1, yr2):
-    # Initialize splitratio and define splitdate/splitratio based on the stockcode
-    splitratio = []
-    splitdate = []
-    
-    if stockcode == 'AAPL':
-        splitdate = ['21-Jun-2000', '28-Feb-2005', '9-Jun-2014', '31-Aug-2020']
-        splitratio = [2, 2, 7, 4]
-    elif stockcode == 'GOOG':
-        splitdate = ['3-Apr-2014']
-        splitratio = [1.998]
-    elif stockcode == 'TSLA':
-        splitdate = ['31-Aug-2020']
-        splitratio = [5]
-    elif stockcode == 'AMZN':
-        splitdate = ['2-Jun-1998', '5-Jan-1999', '2-Sep-1999']
-        splitratio = [2, 3, 2]
-    elif stockcode == 'MSFT':
-        splitdate = ['9-Dec-1996', '23-Feb-1998', '29-Mar-1999', '18-Feb-2003']
-        splitratio = [2, 2, 2, 2]
-    elif stockcode == 'INTC':
-        splitdate = ['14-Jul-1997', '12-Apr-1999', '31-Jul-2000']
-        splitratio = [2, 2, 2]
-    elif stockcode == 'T':
-        splitdate = ['20-Mar-1998', '18-Nov-2002']
-        splitratio = [2, 24875/50000]
-    elif stockcode == 'NVDA':
-        splitdate = ['27-Jun-2000', '17-Sep-2001', '7-Apr-2006', '11-Sep-2007', '20-Jul-2021']
-        splitratio = [2, 2, 2, 1.5, 4]
-    elif stockcode == 'AIG':
-        splitdate = ['28-Jul-1997', '3-Aug-1998', '2-Aug-1999', '31-Jul-2000', '1-Jul-2009']
-        splitratio = [1.5, 1.5, 5/4, 1.5, 1/20]
-    elif stockcode == 'AMD':
-        splitdate = ['22-Aug-2000']
-        splitratio = [2]
-    elif stockcode == 'PG':
-        splitdate = ['22-Sep-1997', '21-Jun-2004']
-        splitratio = [2, 2]
-    elif stockcode == 'BAC':
-        splitdate = ['28-Feb-1997', '30-Aug-2004']
-        splitratio = [2, 2]
-    elif stockcode == 'JNJ':
-        splitdate = ['12-Jun-1996', '13-Jun-2001']
-        splitratio = [2, 2]
-    elif stockcode == 'NFLX':
-        splitdate = ['12-Feb-2004', '15-Jul-2015']
-        splitratio = [2, 7]
-    elif stockcode == 'GE':
-        splitdate = ['12-May-1997', '8-May-2000', '26-Feb-2019', '2-Aug-2021']
-        splitratio = [2, 3, 1.04, 1/8]
-    elif stockcode == 'TEVA':
-        splitdate = ['23-Feb-2000', '6-Dec-2002', '1-Jul-2004']
-        splitratio = [2, 2, 2]
-    elif stockcode == 'MU':
-        splitdate = ['2-May-2000']
-        splitratio = [2]
-    elif stockcode == 'TWTR':
-        splitdate = ['3-Dec-1999']
-        splitratio = [2]
-    elif stockcode == 'WFC':
-        splitdate = ['14-Oct-1997', '14-Aug-2006']
-        splitratio = [2, 2]
-    elif stockcode == 'CSCO':
-        splitdate = ['20-Feb-1996', '17-Dec-1997', '16-Sep-1998', '22-Jun-1999', '23-Mar-2000']
-        splitratio = [2, 1.5, 1.5, 2, 2]
-    elif stockcode == 'PBR':
-        splitdate = ['2-Jul-2007', '8-May-2008']
-        splitratio = [2, 2]
-    elif stockcode == 'MPC':
-        splitdate = ['11-Jun-2015']
-        splitratio = [2]
-    elif stockcode == 'XOM':
-        splitdate = ['14-Apr-1997', '19-Jul-2001']
-        splitratio = [2, 2]
-    elif stockcode == 'BA':
-        splitdate = ['9-Jun-1997']
-        splitratio = [2]
-    elif stockcode == 'FCX':
-        splitdate = ['2-Feb-2011']
-        splitratio = [2]
-    elif stockcode == 'F':
-        splitdate = ['8-Apr-1998', '29-Jun-2000', '3-Aug-2000']
-        splitratio = [10000/6641, 10000/9607, 1.748175]
-    elif stockcode == 'BIDU':
-        splitdate = ['12-May-2010']
-        splitratio = [10]
-    elif stockcode == 'AMRN':
-        splitdate = ['19-Oct-1998']
-        splitratio = [0.1]
-    elif stockcode == 'MS':
-        splitdate = ['15-Jan-1997', '27-Jan-2000']
-        splitratio = [2, 2]
-    elif stockcode == 'BMY':
-        splitdate = ['3-Mar-1997', '1-Mar-1999', '7-Aug-2001']
-        splitratio = [2, 2, 1000000/951777]
-    elif stockcode == 'PFE':
-        splitdate = ['1-Jul-1997', '1-Jul-1999', '17-Nov-2020']
-        splitratio = [2, 3, 1.054]
-    elif stockcode == 'SBUX':
-        splitdate = ['22-Mar-1999', '30-Apr-2001', '24-Oct-2005', '9-Apr-2015']
-        splitratio = [2, 2, 2, 2]
-    elif stockcode == 'WMT':
-        splitdate = ['20-Apr-1999']
-        splitratio = [2]
-    elif stockcode == 'QCOM':
-        splitdate = ['11-May-1999', '31-Dec-1999', '16-Aug-2004']
-        splitratio = [2, 4, 2]
-    elif stockcode == 'UNH':
-        splitdate = ['26-Dec-2000', '19-Jun-2003', '31-May-2005']
-        splitratio = [2, 2, 2]
-    elif stockcode == 'V':
-        splitdate = ['19-Mar-2015']
-        splitratio = [4]
-    elif stockcode == 'MA':
-        splitdate = ['22-Jan-2014']
-        splitratio = [10]
-    elif stockcode == 'LLY':
-        splitdate = ['16-Oct-1997']
-        splitratio = [2]
-    elif stockcode == 'CVX':
-        splitdate = ['13-Sep-2004']
-        splitratio = [2]
-    elif stockcode == 'KO':
-        splitdate = ['13-May-1996', '13-Aug-2012']
-        splitratio = [2, 2]
-    elif stockcode == 'COST':
-        splitdate = ['14-Jan-2000']
-        splitratio = [2]
-    elif stockcode == 'TMO':
-        splitdate = ['6-Jun-1996']
-        splitratio = [1.5]
-    elif stockcode == 'MRK':
-        splitdate = ['17-Feb-1999']
-        splitratio = [2]
-    elif stockcode == 'DHR':
-        splitdate = ['1-Jun-1998', '21-May-2004', '14-Jun-2010', '5-Jul-2016']
-        splitratio = [2, 2, 2, 1.319]
-    elif stockcode == 'ORCL':
-        splitdate = ['17-Apr-1996', '18-Aug-1997', '1-Mar-1999', '19-Jan-2000', '13-Oct-2000']
-        splitratio = [1.5, 1.5, 1.5, 2, 2]
-    elif stockcode == 'ADBE':
-        splitdate = ['27-Oct-1999', '25-Oct-2000', '24-May-2005']
-        splitratio = [2, 2, 2]
-    elif stockcode == 'MCD':
-        splitdate = ['8-Mar-1999']
-        splitratio = [2]
-    elif stockcode == 'ABT':
-        splitdate = ['1-Jun-1998', '3-May-2004', '2-Jan-2013']
-        splitratio = [2, 10000/9356, 10000/4798]
-    elif stockcode == 'C':
-        splitdate = ['28-May-1996', '25-Nov-1996', '20-Nov-1997', '1-Jun-1999', '28-Aug-2000', '9-May-2011']
-        splitratio = [1.5, 4/3, 1.5, 1.5, 4/3, 0.1]
-    elif stockcode == 'EEM':
-        splitdate = ['9-Jun-2005', '24-Jul-2008']
-        splitratio = [3, 3]
-    elif stockcode == 'QQQ':
-        splitdate = ['20-Mar-2000']
-        splitratio = [2]
-    elif stockcode == 'FXI':
-        splitdate = ['24-Jul-2008']
-        splitratio = [3]
-    elif stockcode == 'IWM':
-        splitdate = ['9-Jun-2005']
-        splitratio = [2]
-    elif stockcode == 'XOP':
-        splitdate = ['30-Mar-2020']
-        splitratio = [0.25]
-    elif stockcode == 'XLF':
-        splitdate = ['19-Sep-2016']
-        splitratio = [1.231]
-    elif stockcode == 'SLV':
-        splitdate = ['24-Jul-2008']
-        splitratio = [10]
-    elif stockcode == 'EFA':
-        splitdate = ['9-Jun-2005']
-        splitratio = [3]
-    elif stockcode == 'GME':
-        splitdate = ['19-Mar-2007']
-        splitratio = [2]
-    else:
-        splitdate = []
-        splitratio = []
-    
-    nsplit = len(splitratio)
-    
-    # Create start and end date strings using the provided years
-    stdate = "1-Jan-" + str(yr1)
-    endate = "31-Dec-" + str(yr2)
-    
-    # Assume the file was saved as dataname+".npz" containing variables dataout and bubout.
+    if str(dataname).endswith(".npz"):
+        # Columnar store: read just the fields the adjustment needs
+        store = ResultStore(dataname)
+        dataout = store.load('dataout', ['da', 'sout'])
+        bubout = store.load('bubout', SPLIT_ADJ_FIELDS)
+        return split_adjust(stockcode, bubout, dataout, yr1, yr2), dataout, bubout
+
     mat_filename = dataname
     mat_data = loadmat(mat_filename, squeeze_me=True)
 
@@ -211,90 +154,10 @@ def sbub_split(stockcode, dataname, yr1, yr2):
 
     if isinstance(bubout, np.ndarray) and bubout.dtype == 'O':
         bubout = bubout.item()
-    
-    
-
-# Access fields if dataout and bubout are structured arrays
-# For example, if you need field "sout" from dataout:
-# sout = dataout["sout"].item()
 
-    
     # Extract variables from the loaded structures
-    da = dataout['da'].item()
-
-    sout_adj = dataout['sout'].item()
-    otmc_adj = bubout['otmc'].item()
-    sbub_qcdfp_adj = bubout['sbub_qcdfp'].item()
-    sbub_qcdfc_adj = bubout['sbub_qcdfc'].item()
-    sbub_qcdf_adj = bubout['sbub_qcdf'].item()
-    qcdfp_bias_adj = bubout['qcdfp_bias'].item()
-    qcdfc_bias_adj = bubout['qcdfc_bias'].item()
-    qcdf_bias_adj = bubout['qcdf_bias'].item()
-    sbub_qcdfp_se_adj = bubout['sbub_qcdfp_se'].item()
-    sbub_qcdfc_se_adj = bubout['sbub_qcdfc_se'].item()
-    sbub_qcdf_se_adj = bubout['sbub_qcdf_se'].item()
-    qcdf_A_lb_adj = bubout['qcdf_A_lb'].item()
-    qcdf_A_ub_adj = bubout['qcdf_A_ub'].item()
-    qcdf_Ap_lb_adj = bubout['qcdf_Ap_lb'].item()
-    qcdf_Ap_ub_adj = bubout['qcdf_Ap_ub'].item()
-    qcdf_Ac_lb_adj = bubout['qcdf_Ac_lb'].item()
-    qcdf_Ac_ub_adj = bubout['qcdf_Ac_ub'].item()
-
-    
-    # Adjust values based on split events within the specified date range
-    if nsplit > 0:
-        for i in range(nsplit):
-            current_split = datenum(splitdate[i])
-            if current_split > datenum(stdate) and current_split < datenum(endate):
-                vt = da < current_split  # Boolean mask for dates before the split
-                
-                sout_adj[vt] = sout_adj[vt] / splitratio[i]
-                otmc_adj[vt, :] = otmc_adj[vt, :] / splitratio[i]
-                sbub_qcdfp_adj[vt, :] = sbub_qcdfp_adj[vt, :] / splitratio[i]
-                sbub_qcdfc_adj[vt, :] = sbub_qcdfc_adj[vt, :] / splitratio[i]
-                sbub_qcdf_adj[vt, :] = sbub_qcdf_adj[vt, :] / splitratio[i]
-                qcdfp_bias_adj[vt, :] = qcdfp_bias_adj[vt, :] / splitratio[i]
-                qcdfc_bias_adj[vt, :] = qcdfc_bias_adj[vt, :] / splitratio[i]
-                qcdf_bias_adj[vt, :] = qcdf_bias_adj[vt, :] / splitratio[i]
-                sbub_qcdfp_se_adj[vt, :] = sbub_qcdfp_se_adj[vt, :] / splitratio[i]
-                sbub_qcdfc_se_adj[vt, :] = sbub_qcdfc_se_adj[vt, :] / splitratio[i]
-                sbub_qcdf_se_adj[vt, :] = sbub_qcdf_se_adj[vt, :] / splitratio[i]
-                
-                qcdf_A_lb_adj[vt, :] = qcdf_A_lb_adj[vt, :] / splitratio[i]
-                qcdf_A_ub_adj[vt, :] = qcdf_A_ub_adj[vt, :] / splitratio[i]
-                qcdf_Ap_lb_adj[vt, :] = qcdf_Ap_lb_adj[vt, :] / splitratio[i]
-                qcdf_Ap_ub_adj[vt, :] = qcdf_Ap_ub_adj[vt, :] / splitratio[i]
-                qcdf_Ac_lb_adj[vt, :] = qcdf_Ac_lb_adj[vt, :] / splitratio[i]
-                qcdf_Ac_ub_adj[vt, :] = qcdf_Ac_ub_adj[vt, :] / splitratio[i]
-    
-    # Create the output structure as a dictionary
-    adjout = {}
-    adjout["sout_adj"] = sout_adj
-    adjout["otmc_adj"] = otmc_adj
-
-    adjout["sbub_qcdfp_adj"] = sbub_qcdfp_adj
-    adjout["sbub_qcdfc_adj"] = sbub_qcdfc_adj
-    adjout["sbub_qcdf_adj"] = sbub_qcdf_adj
-    adjout["qcdfp_bias_adj"] = qcdfp_bias_adj
-    adjout["qcdfc_bias_adj"] = qcdfc_bias_adj
-    adjout["qcdf_bias_adj"] = qcdf_bias_adj
-    adjout["sbub_qcdfp_se_adj"] = sbub_qcdfp_se_adj
-    adjout["sbub_qcdfc_se_adj"] = sbub_qcdfc_se_adj
-    adjout["sbub_qcdf_se_adj"] = sbub_qcdf_se_adj
-    adjout["qcdf_A_lb_adj"] = qcdf_A_lb_adj
-    adjout["qcdf_A_ub_adj"] = qcdf_A_ub_adj
-    adjout["qcdf_Ap_lb_adj"] = qcdf_Ap_lb_adj
-    adjout["qcdf_Ap_ub_adj"] = qcdf_Ap_ub_adj
-    adjout["qcdf_Ac_lb_adj"] = qcdf_Ac_lb_adj
-    adjout["qcdf_Ac_ub_adj"] = qcdf_Ac_ub_adj
+    dafields = {'da': dataout['da'].item(), 'sout': dataout['sout'].item()}
+    bubfields = {name: bubout[name].item() for name in SPLIT_ADJ_FIELDS}
 
-    result = (adjout, dataout, bubout)
-    print("→ sbub_split is about to return:", result)
-    print("   length:", len(result))
-    
+    adjout = split_adjust(stockcode, bubfields, dafields, yr1, yr2)
     return adjout, dataout, bubout
-
-
-
-
-
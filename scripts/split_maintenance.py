@@ -0,0 +1,140 @@
+"""
+Apply split-registry changes to existing outputs without recalibrating.
+
+    python scripts/split_maintenance.py [TICKER ...]
+
+Scans MAT_ARTIFACT_DIR (default ./data/mat) for split-adjusted .mat/.npz files whose
+stored registry hash no longer matches split_registry.csv. Only the affected
+pre-split rows of those files are rescaled. Each patched ticker's JSON for the
+current export years (bubble_estimator.export_years) is then re-exported from the
+patched file by bubble_estimator (no sbub_lp_easy run), and their summary.json
+entries are updated.
+
+SPLIT_MAINT_DRY_RUN=1 only reports stale outputs; SPLIT_MAINT_SKIP_JSON=1
+patches the .mat files but leaves the JSON exports alone.
+"""
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+from scipy.io import loadmat, savemat
+
+from artifact_manifest import record_artifact, ticker_index
+from result_store import ResultStore, save_results
+from sbub_split import registry_hash, resplit_adjout, sbub_split
+
+MAT_DIR = Path(os.environ.get("MAT_ARTIFACT_DIR", "./data/mat")).resolve()
+JSON_DIR = Path("public/data")
+DRY_RUN = os.getenv("SPLIT_MAINT_DRY_RUN") == "1"
+SKIP_JSON = os.getenv("SPLIT_MAINT_SKIP_JSON") == "1"
+
+SPLITADJ_PATTERN = re.compile(
+    r"optout_(?P<ticker>.+)_(?P<yr1>\d{4})to(?P<yr2>\d{4})_splitadj_(?P<tag>[^.]+)\.(?P<ext>mat|npz)$"
+)
+
+
+def load_struct(path, key):
+    """Load one result group (a MATLAB struct in .mat files) as a dict of arrays/scalars."""
+    if path.suffix == ".npz":
+        return ResultStore(path).load(key)
+    struct = loadmat(path, squeeze_me=True)[key]
+    return {name: struct[name].item() for name in struct.dtype.names}
+
+
+def json_export_path(ticker, yr1, yr2):
+    return JSON_DIR.joinpath(f"bubble_data_{ticker.lstrip('^')}_splitadj_{yr1}to{yr2}.json")
+
+
+def json_registry_hash(path):
+    """Registry hash recorded in a JSON export's metadata, or None."""
+    with open(path) as f:
+        metadata = json.load(f).get("metadata", {})
+    return (metadata.get("split_registry") or {}).get("hash")
+
+
+def patch_splitadj_file(splitfile, ticker, yr1, yr2, tag):
+    """Rescale a stale split-adjusted .mat in place; returns the rescaled row count."""
+    rawfile = splitfile.with_name(f"optout_{ticker}_{yr1}to{yr2}_{tag}{splitfile.suffix}")
+    adjout = load_struct(splitfile, "adjout")
+
+    if "split_factor" in adjout:
+        da = load_struct(rawfile, "dataout")["da"]
+        adjout, rows = resplit_adjout(ticker, adjout, da, yr1, yr2)
+        nrows = rows.size
+    else:
+        # Written before factors were stored: rebuild adjout from the raw results
+        adjout = sbub_split(ticker, str(rawfile), yr1, yr2)[0]
+        nrows = adjout["split_factor"].size
+
+    if splitfile.suffix == ".npz":
+        save_results(splitfile, adjout=adjout)
+    else:
+        savemat(splitfile, {"adjout": adjout})
+
+    # Keep the artifact manifest's hash current for files sbub_run recorded
+    recorded = ticker_index(MAT_DIR, ticker)["by_path"].get(splitfile.name)
+    if recorded is not None:
+        record_artifact(splitfile, ticker, "splitadj", yr1, yr2,
+                        np.size(adjout["split_factor"]), **recorded["params"])
+    return nrows
+
+
+def main():
+    import bubble_estimator
+    tickers = set(sys.argv[1:])
+    export_yr1, export_yr2 = bubble_estimator.export_years()
+    stale_json = []
+    patched = 0
+
+    for splitfile in sorted(MAT_DIR.glob("optout_*_splitadj_*")):
+        match = SPLITADJ_PATTERN.match(splitfile.name)
+        if match is None:
+            continue
+        ticker, yr1, yr2, tag = match.group("ticker", "yr1", "yr2", "tag")
+        if tickers and ticker not in tickers:
+            continue
+
+        current = registry_hash(ticker)
+        stored = load_struct(splitfile, "adjout").get("split_registry_hash")
+        if stored != current:
+            if DRY_RUN:
+                print(f"🔎 {ticker}: {splitfile.name} is stale (registry {stored} → {current})")
+            else:
+                nrows = patch_splitadj_file(splitfile, ticker, yr1, yr2, tag)
+                print(f"✅ {ticker}: rescaled {nrows} row(s) in {splitfile.name}")
+            patched += 1
+
+        # bubble_estimator only re-exports the current year range, so JSON for
+        # other ranges cannot be refreshed here
+        if (yr1, yr2) != (export_yr1, export_yr2) or ticker in stale_json:
+            continue
+        jsonfile = json_export_path(ticker, yr1, yr2)
+        if jsonfile.exists() and json_registry_hash(jsonfile) != current:
+            stale_json.append(ticker)
+
+    if not patched and not stale_json:
+        print("All split-adjusted outputs match the split registry.")
+        return
+    if patched:
+        print(f"{'Stale' if DRY_RUN else 'Patched'} split-adjusted file(s): {patched}")
+    if not stale_json:
+        return
+    if DRY_RUN or SKIP_JSON:
+        print(f"JSON exports to refresh: {', '.join(stale_json)}")
+        return
+
+    # The JSON bands are rolling-window statistics that straddle split dates,
+    # so they are recomputed from the patched .mat rather than scaled pointwise.
+    summaries = {ticker: bubble_estimator.process_stock(ticker, plot=False) for ticker in stale_json}
+    if not bubble_estimator.SHARD_YEARS:
+        bubble_estimator.write_summary({t: e for t, e in summaries.items() if e},
+                                       [t for t, e in summaries.items() if not e], merge=True)
+    if bubble_estimator.PLOTS:
+        bubble_estimator.run_plots(stale_json, 1)
+
+
+if __name__ == "__main__":
+    main()
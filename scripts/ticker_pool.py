@@ -0,0 +1,145 @@
+"""
+Per-ticker scheduler shared by sbub_run.py and bubble_estimator.py.
+
+With --workers N (N > 1), tickers run in a process pool. Heavy names are
+dispatched first, ranked by the wall time each took in the previous run
+(or, before any timings exist, by a size proxy supplied by the caller). Each
+worker's output goes to data/logs/<name>/<TICKER>.log and is replayed in one
+block when the ticker finishes, so logs never interleave. A ticker that
+raises is reported as failed without stopping the rest.
+"""
+import argparse
+import contextlib
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+TIMINGS_DIR = "data"
+LOG_DIR = os.path.join("data", "logs")
+
+
+def parse_workers(argv=None):
+    """Value of the --workers N command-line flag (default 1: sequential)."""
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--workers", type=int, default=1)
+    args, _ = parser.parse_known_args(argv)
+    return max(1, args.workers)
+
+
+def timings_path(name):
+    return os.path.join(TIMINGS_DIR, f"{name}_timings.json")
+
+
+def load_timings(name):
+    """Per-ticker wall times (seconds) recorded by the previous run."""
+    try:
+        with open(timings_path(name)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_timings(name, timings):
+    """Merge this run's per-ticker wall times into the timings file."""
+    merged = load_timings(name)
+    merged.update(timings)
+    os.makedirs(TIMINGS_DIR, exist_ok=True)
+    with open(timings_path(name), "w") as f:
+        json.dump(merged, f, indent=2, sort_keys=True)
+
+
+def order_by_cost(tickers, timings, fallback_cost=None):
+    """
+    Tickers sorted by expected cost, heaviest first.
+
+    Previous timings are used when every ticker has one; otherwise all tickers
+    are ranked by fallback_cost(ticker) so the two scales are never mixed.
+    """
+    if all(t in timings for t in tickers):
+        cost = timings.get
+    elif fallback_cost is not None:
+        cost = fallback_cost
+    else:
+        return list(tickers)
+    return sorted(tickers, key=lambda t: cost(t) or 0, reverse=True)
+
+
+def _run_one(func, ticker, log_path=None):
+    """Run func(ticker), optionally capturing its output; returns (ok, seconds, value)."""
+    start = time.perf_counter()
+    with contextlib.ExitStack() as stack:
+        if log_path is not None:
+            log = stack.enter_context(open(log_path, "w"))
+            stack.enter_context(contextlib.redirect_stdout(log))
+            stack.enter_context(contextlib.redirect_stderr(log))
+        value = None
+        try:
+            value = func(ticker)
+            ok = value is not False
+        except Exception:
+            traceback.print_exc()
+            ok = False
+    return ok, time.perf_counter() - start, value if ok else None
+
+
+def run_tickers(func, tickers, name, workers=1, fallback_cost=None, header=None, outputs=None):
+    """
+    Run func(ticker) for every ticker and return {ticker: succeeded}.
+
+    func must be picklable (a module-level function or a functools.partial
+    of one) and return False on failure. header(idx, total, ticker), if
+    given, prints the per-ticker banner. workers=1 keeps the original
+    sequential order with live output. If outputs is a dict, it receives
+    {ticker: return value} for the tickers that succeeded (values must be
+    picklable when workers > 1).
+    """
+    tickers = list(tickers)
+    results, timings = {}, {}
+
+    if workers <= 1:
+        for idx, ticker in enumerate(tickers, 1):
+            if header is not None:
+                header(idx, len(tickers), ticker)
+            results[ticker], timings[ticker], value = _run_one(func, ticker)
+            if outputs is not None and results[ticker]:
+                outputs[ticker] = value
+        save_timings(name, timings)
+        return results
+
+    log_dir = os.path.join(LOG_DIR, name)
+    os.makedirs(log_dir, exist_ok=True)
+    queue = order_by_cost(tickers, load_timings(name), fallback_cost)
+    print(f"Running {len(queue)} tickers on {workers} workers (order: {', '.join(queue)})")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        for ticker in queue:
+            log_path = os.path.join(log_dir, f"{ticker}.log")
+            futures[pool.submit(_run_one, func, ticker, log_path)] = (ticker, log_path)
+
+        for idx, future in enumerate(as_completed(futures), 1):
+            ticker, log_path = futures[future]
+            try:
+                ok, seconds, value = future.result()
+            except Exception as e:  # worker died (e.g. killed or out of memory)
+                ok, seconds, value = False, None, None
+                print(f"❌ Worker for {ticker} crashed: {e}")
+            if header is not None:
+                header(idx, len(queue), ticker)
+            if os.path.exists(log_path):
+                with open(log_path) as f:
+                    print(f.read(), end="")
+            results[ticker] = ok
+            if outputs is not None and ok:
+                outputs[ticker] = value
+            if seconds is not None:
+                timings[ticker] = seconds
+
+    save_timings(name, timings)
+    if outputs is not None:
+        ordered = {t: outputs[t] for t in tickers if t in outputs}
+        outputs.clear()
+        outputs.update(ordered)
+    return {t: results[t] for t in tickers}
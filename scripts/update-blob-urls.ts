@@ -3,6 +3,7 @@ import { config } from "dotenv";
 import { createHash } from "crypto";
 import { appendFileSync, existsSync, writeFileSync, readFileSync, readdirSync } from "fs";
 import { join } from "path";
+import type { DerivedExportMapping } from "../src/types/bubbleData";
 
 config({ path: ".env.local" });
 
@@ -22,6 +23,9 @@ const JSON_OUTPUT_DIR = join(process.cwd(), "public", "data");
 const HASH_MANIFEST_BLOB_NAME = "blob_hash_manifest.json";
 const HASH_MANIFEST_URL = `${BLOB_BASE_URL}/${HASH_MANIFEST_BLOB_NAME}`;
 const BLOB_MAPPING_URL = `${BLOB_BASE_URL}/blob_mapping.json`;
+// URLs of the optional per-ticker exports; blob_mapping.json maps tickers only
+const DERIVED_MAPPING_BLOB_NAME = "derived_mapping.json";
+const DERIVED_MAPPING_URL = `${BLOB_BASE_URL}/${DERIVED_MAPPING_BLOB_NAME}`;
 const NORMALIZED_BLOB_BASE_URL = BLOB_BASE_URL.replace(/\/+$/, "");
 
 function sha256(content: Buffer): string {
@@ -61,9 +65,28 @@ function assertBlobUrlMatchesConfiguredStore(url: string, filename: string) {
   }
 }
 
-function contentAddressedJsonBlobName(filename: string, fileHash: string) {
-  const stem = filename.replace(/\.json$/, "");
-  return `yahoo-json/${stem}-${fileHash.slice(0, 12)}.json`;
+// Subdirectories of public/data whose JSON files are uploaded under yahoo-json/<path>.
+// The LOD copies in public/data/lod (BUBBLE_LOD=1) have no front-end loader and stay local.
+const DERIVED_EXPORT_DIRS = ["incremental", "years"];
+// Cross-ticker overview from bubble_estimator.main, uploaded as yahoo-json/summary.json
+const SUMMARY_FILENAME = "summary.json";
+
+function listJsonFiles(root: string, relDir: string): string[] {
+  const dir = join(root, relDir);
+  if (!existsSync(dir)) {
+    return [];
+  }
+  return readdirSync(dir, { withFileTypes: true }).flatMap((entry) => {
+    const relPath = `${relDir}/${entry.name}`;
+    if (entry.isDirectory()) {
+      return listJsonFiles(root, relPath);
+    }
+    return entry.name.endsWith(".json") ? [relPath] : [];
+  });
+}
+
+function contentAddressedBlobName(filename: string, fileHash: string) {
+  return `yahoo-json/${filename.replace(/\.(json|bin)$/, `-${fileHash.slice(0, 12)}.$1`)}`;
 }
 
 async function updateBlobUrls() {
@@ -77,12 +100,21 @@ async function updateBlobUrls() {
     const urlMapping = (await fetchJsonOrNull<Record<string, string>>(BLOB_MAPPING_URL)) ?? {};
     const previousHashManifest =
       (await fetchJsonOrNull<Record<string, string>>(HASH_MANIFEST_URL)) ?? {};
+    const previousDerivedMapping =
+      (await fetchJsonOrNull<DerivedExportMapping>(DERIVED_MAPPING_URL)) ?? {};
     const nextHashManifest: Record<string, string> = {};
+    // Rebuilt from the files present, so exports that stopped being written drop out
+    const sidecars: Record<string, string> = {};
+    const incremental: Record<string, string> = {};
+    const years: Record<string, string> = {};
+    const derivedMapping: DerivedExportMapping = { sidecars, incremental, years };
     let changedUploads = 0;
     let mappingChanged = false;
 
     // ── Step 1: Upload every JSON from public/data/ to Vercel Blob ──
-    const jsonFiles = readdirSync(JSON_OUTPUT_DIR).filter(f => f.endsWith(".json"));
+    const jsonFiles = readdirSync(JSON_OUTPUT_DIR).filter(
+      (f) => f.endsWith(".json") && f !== SUMMARY_FILENAME,
+    );
 
     if (jsonFiles.length === 0) {
       throw new Error("No JSON files found in public/data/ — did bubble_estimator.py run or did the artifact download succeed?");
@@ -102,8 +134,58 @@ async function updateBlobUrls() {
       }
 
       const stock = match[1];
+
+      const sidecarFilename = filename.replace(/\.json$/, ".bin");
+      const sidecarPath = join(JSON_OUTPUT_DIR, sidecarFilename);
+      if (existsSync(sidecarPath)) {
+        const sidecarContent = readFileSync(sidecarPath);
+        const sidecarHash = sha256(sidecarContent);
+        const sidecarBlobName = contentAddressedBlobName(sidecarFilename, sidecarHash);
+        nextHashManifest[sidecarFilename] = sidecarHash;
+        sidecars[stock] = `${NORMALIZED_BLOB_BASE_URL}/${sidecarBlobName}`;
+
+        if (
+          previousHashManifest[sidecarFilename] !== sidecarHash ||
+          previousDerivedMapping.sidecars?.[stock] !== sidecars[stock]
+        ) {
+          const blob = await put(sidecarBlobName, sidecarContent, {
+            access: "public",
+            token: BLOB_READ_WRITE_TOKEN,
+            addRandomSuffix: false,
+            allowOverwrite: true,
+            contentType: "application/octet-stream",
+          });
+          assertBlobUrlMatchesConfiguredStore(blob.url, sidecarFilename);
+
+          changedUploads += 1;
+          sidecars[stock] = blob.url;
+          console.log(`⬆️  Uploaded ${sidecarFilename} → ${blob.url}`);
+        }
+      }
+
+      // The incremental and year-shard layouts carry only the primary rolling
+      // window, so they are mapped (and preferred by the front end) only when
+      // the JSON has no others
+      const stem = filename.replace(/\.json$/, "");
+      const layouts = (
+        [
+          [incremental, `incremental/${stem}/manifest.json`],
+          [years, `years/${stem}/index.json`],
+        ] as const
+      ).filter(([, key]) => existsSync(join(JSON_OUTPUT_DIR, key)));
+      if (layouts.length > 0) {
+        const { metadata } = JSON.parse(fileContent.toString("utf8"));
+        for (const [mapping, key] of layouts) {
+          if (metadata?.extra_rolling_window_days?.length) {
+            console.log(`ℹ️  ${stock} has extra rolling windows; not mapping ${key}`);
+          } else {
+            mapping[stock] = `${NORMALIZED_BLOB_BASE_URL}/yahoo-json/${key}`;
+          }
+        }
+      }
+
       nextHashManifest[filename] = fileHash;
-      const blobName = contentAddressedJsonBlobName(filename, fileHash);
+      const blobName = contentAddressedBlobName(filename, fileHash);
       const expectedBlobUrl = `${NORMALIZED_BLOB_BASE_URL}/${blobName}`;
 
       if (previousHashManifest[filename] === fileHash && urlMapping[stock] === expectedBlobUrl) {
@@ -136,7 +218,8 @@ async function updateBlobUrls() {
       process.exit(1);
     }
 
-    // Remove stale mappings when a local file disappeared from public/data.
+    // Remove stale mappings when a local file disappeared from public/data
+    // (this also drops the "<stock>.bin" sidecar keys older runs wrote here).
     const expectedStocks = new Set(
       jsonFiles
         .map((filename) => filename.match(/^bubble_data_([^_]+(?:_[^_]+)*)_splitadj_/)?.[1])
@@ -149,13 +232,55 @@ async function updateBlobUrls() {
       }
     }
 
-    // ── Step 2: Upload blob_mapping.json and the hash manifest only when needed ──
+    // ── Step 1b: Derived exports (BUBBLE_INCREMENTAL=1, BUBBLE_YEAR_SHARDS=1) and summary.json ──
+    // Only files whose hash changed are uploaded. Incremental shards are
+    // immutable and content-named, so normally only tails and manifests change.
+    const derivedKeys = DERIVED_EXPORT_DIRS.flatMap((subdir) => listJsonFiles(JSON_OUTPUT_DIR, subdir));
+    if (existsSync(join(JSON_OUTPUT_DIR, SUMMARY_FILENAME))) {
+      derivedKeys.push(SUMMARY_FILENAME);
+    }
+    for (const key of derivedKeys) {
+      const fileContent = readFileSync(join(JSON_OUTPUT_DIR, key));
+      const fileHash = sha256(fileContent);
+      nextHashManifest[key] = fileHash;
+      if (previousHashManifest[key] === fileHash) {
+        continue;
+      }
+
+      const blob = await put(`yahoo-json/${key}`, fileContent, {
+        access: "public",
+        token: BLOB_READ_WRITE_TOKEN,
+        addRandomSuffix: false,
+        allowOverwrite: true,
+        contentType: "application/json",
+      });
+      assertBlobUrlMatchesConfiguredStore(blob.url, key);
+      changedUploads += 1;
+      console.log(`⬆️  Uploaded ${key} → ${blob.url}`);
+    }
+
+    // ── Step 2: Upload the mappings and the hash manifest only when needed ──
     const mappingJson = JSON.stringify(urlMapping, null, 2);
+    const derivedMappingJson = JSON.stringify(derivedMapping, null, 2);
     const hashManifestJson = JSON.stringify(nextHashManifest, null, 2);
     const manifestChanged =
       JSON.stringify(previousHashManifest) !== JSON.stringify(nextHashManifest);
+    const derivedMappingChanged =
+      JSON.stringify(previousDerivedMapping) !== JSON.stringify(derivedMapping);
+
+    if (derivedMappingChanged) {
+      const derivedMappingBlob = await put(DERIVED_MAPPING_BLOB_NAME, derivedMappingJson, {
+        access: "public",
+        token: BLOB_READ_WRITE_TOKEN,
+        addRandomSuffix: false,
+        allowOverwrite: true,
+        contentType: "application/json",
+      });
+      assertBlobUrlMatchesConfiguredStore(derivedMappingBlob.url, DERIVED_MAPPING_BLOB_NAME);
+      console.log(`✅ Uploaded ${DERIVED_MAPPING_BLOB_NAME} to Blob → ${derivedMappingBlob.url}`);
+    }
 
-    if (changedUploads === 0 && !mappingChanged && !manifestChanged) {
+    if (changedUploads === 0 && !mappingChanged && !manifestChanged && !derivedMappingChanged) {
       console.log("🎉 No JSON content changes detected; skipping mapping and manifest uploads.");
       writeFileSync(join(process.cwd(), "blob_mapping.json"), mappingJson);
       setGithubOutput("blob_changed", "false");
@@ -192,7 +317,7 @@ async function updateBlobUrls() {
     setGithubOutput("blob_changed", "true");
     setGithubOutput("json_upload_count", String(changedUploads));
 
-    console.log(`\n🎉 Done. ${changedUploads} JSON file(s) uploaded and ${Object.keys(urlMapping).length} stocks mapped.`);
+    console.log(`\n🎉 Done. ${changedUploads} file(s) uploaded and ${expectedStocks.size} stocks mapped.`);
     console.log(`   dataLoader.ts will fetch the mapping at runtime from:\n   ${mappingBlob.url}`);
 
   } catch (err) {
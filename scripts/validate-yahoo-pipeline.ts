@@ -2,7 +2,8 @@ import { existsSync, readdirSync, readFileSync } from "node:fs";
 import { join } from "node:path";
 import { DEFAULT_YAHOO_BLOB_MAPPING_URL } from "../src/config/yahooData";
 import { YAHOO_STOCK_LIST } from "../src/types/bubbleData";
-import type { BubbleData } from "../src/types/bubbleData";
+import type { BubbleData, DerivedExportMapping } from "../src/types/bubbleData";
+import { loadBubbleSidecar, normalizeBubbleData } from "../src/utils/dataLoader";
 
 type Mode = "csv" | "json" | "blob";
 type PriceSeriesPoint = NonNullable<BubbleData["price_series_data"]>[number];
@@ -29,7 +30,7 @@ function assert(condition: unknown, message: string): asserts condition {
 }
 
 function readJson(path: string): BubbleData {
-	return JSON.parse(readFileSync(path, "utf8")) as BubbleData;
+	return normalizeBubbleData(JSON.parse(readFileSync(path, "utf8")));
 }
 
 function sleep(ms: number) {
@@ -197,6 +198,17 @@ async function validateBlobMapping() {
 				`Failed to fetch Yahoo blob mapping ${mappingUrl}: ${mappingResponse.status} ${mappingResponse.statusText}`,
 			);
 			const mapping = (await mappingResponse.json()) as Record<string, string>;
+			const derivedUrl = new URL("derived_mapping.json", mappingUrl).toString();
+			const derivedResponse = await fetch(withCacheBuster(derivedUrl), {
+				cache: "no-store",
+			});
+			assert(
+				derivedResponse.ok || derivedResponse.status === 404,
+				`Failed to fetch ${derivedUrl}: ${derivedResponse.status} ${derivedResponse.statusText}`,
+			);
+			const derived = (
+				derivedResponse.ok ? await derivedResponse.json() : {}
+			) as DerivedExportMapping;
 
 			for (const stock of YAHOO_STOCK_LIST) {
 				const url = mapping[stock];
@@ -209,7 +221,13 @@ async function validateBlobMapping() {
 					response.ok,
 					`Failed to fetch mapped Yahoo JSON for ${stock}: ${response.status} ${response.statusText}`,
 				);
-				validateBubbleData(stock, (await response.json()) as BubbleData, url);
+				validateBubbleData(stock, normalizeBubbleData(await response.json()), url);
+
+				// The front end prefers the binary sidecar when it is mapped
+				const sidecarUrl = derived.sidecars?.[stock];
+				if (sidecarUrl) {
+					validateBubbleData(stock, await loadBubbleSidecar(sidecarUrl), sidecarUrl);
+				}
 			}
 
 			console.log(`✅ Live Yahoo Blob mapping validated at ${mappingUrl}`);
@@ -0,0 +1,125 @@
+"""
+One shard per calendar year for the bubble JSON exports.
+
+With BUBBLE_YEAR_SHARDS=1, bubble_estimator also writes
+public/data/years/<stem of bubble_data_<TICKER>_splitadj_<yr1>to<yr2>>/:
+
+    2024-<hash12>.json   that year's dates and prices, in the export schema
+    2025-<hash12>.json   ...
+    index.json           metadata, shard files, date bounds, counts, hashes
+
+so a date-range picker can fetch only the years that overlap the range.
+Shards are named by the hash of their content and rewritten only when it
+changes. Prices are split by the same calendar years; prices in years with no
+bubble dates are only in the full export.
+
+Shards line up with the rolling-window computation: every exported value is
+a backward-looking window over at most rolling_window_days periods, so a
+year's values depend only on the grouped estimates from its
+window_start_date (recorded in the index) to its last date, never on later
+years. BUBBLE_SHARD_YEARS=2023,2024 regenerates just those shards (rolling
+windows computed for their dates only) and keeps the other index entries.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+from incremental_export import encode
+
+YEARS_DIR = "years"
+INDEX_NAME = "index.json"
+SHARD_YEARS = {int(y) for y in os.getenv("BUBBLE_SHARD_YEARS", "").split(",") if y.strip()}
+
+
+def year_bounds(dates):
+    """(year, start, stop) row ranges of the dates (ISO strings, ascending)."""
+    years = np.array([int(d[:4]) for d in dates], dtype=np.int64)
+    starts = np.flatnonzero(np.diff(years, prepend=-1))
+    stops = np.append(starts[1:], years.size)
+    return [(int(years[a]), int(a), int(b)) for a, b in zip(starts, stops)]
+
+
+def slice_columns(columns, start, stop):
+    """Rows [start, stop) of bubble_estimator.export_columns output."""
+    return {
+        "date": columns["date"][start:stop],
+        "adjusted": columns["adjusted"][start:stop],
+        "regular": columns["regular"][start:stop],
+        "estimates": {stat: x[start:stop] for stat, x in columns["estimates"].items()},
+    }
+
+
+def prices_by_year(price_series_data, years):
+    """Price points per shard year (strictly by calendar year, so a shard never depends on its neighbours)."""
+    grouped = {year: [] for year in years}
+    for point in price_series_data:
+        year = int(point["date"][:4])
+        if year in grouped:
+            grouped[year].append(point)
+    return grouped
+
+
+def load_index(out_dir):
+    try:
+        with open(out_dir / INDEX_NAME) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_year_shards(json_dir, stem, metadata, columns, price_series_data,
+                      window_dates, build, years=None):
+    """
+    Update the year shards and index for one export; returns (shards written,
+    shards reused). window_dates[i] is the first date in row i's rolling
+    window; build(columns, prices, year) returns a shard's JSON object.
+    Only the given years are replaced when years is set.
+    """
+    out_dir = Path(json_dir).joinpath(YEARS_DIR, stem)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    entries = {}
+    if years:
+        entries = {entry["year"]: entry for entry in load_index(out_dir).get("shards", [])
+                   if entry["year"] not in years and out_dir.joinpath(entry["file"]).exists()}
+
+    bounds = year_bounds(columns["date"])
+    prices = prices_by_year(price_series_data, [year for year, _, _ in bounds])
+    written = 0
+    for year, start, stop in bounds:
+        content = encode(build(slice_columns(columns, start, stop), prices[year], year))
+        digest = hashlib.sha256(content).hexdigest()
+        file = f"{year}-{digest[:12]}.json"
+        entries[year] = {
+            "year": year,
+            "file": file,
+            "first_date": columns["date"][start],
+            "last_date": columns["date"][stop - 1],
+            "window_start_date": window_dates[start],
+            "count": stop - start,
+            "sha256": digest,
+        }
+        if not out_dir.joinpath(file).exists():
+            out_dir.joinpath(file).write_bytes(content)
+            written += 1
+
+    shards = [entries[year] for year in sorted(entries)]
+    if shards:
+        metadata = dict(metadata,
+                        time_series_start_date=shards[0]["first_date"][:10],
+                        time_series_end_date=shards[-1]["last_date"][:10])
+    index = {
+        "format": "bubble-year-shards",
+        "version": 1,
+        "metadata": metadata,
+        "shards": shards,
+    }
+    out_dir.joinpath(INDEX_NAME).write_bytes(encode(index))
+
+    current = {entry["file"] for entry in shards}
+    for path in out_dir.glob("[0-9]*-*.json"):
+        if path.name not in current:
+            path.unlink()
+    return written, len(bounds) - written
@@ -0,0 +1,101 @@
+import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
+import { cn } from "@/lib/utils";
+import React from "react";
+import {
+	type BubbleSummary,
+	type StockCode,
+	YAHOO_STOCK_LIST,
+} from "../types/bubbleData";
+
+interface BubbleSummaryTableProps {
+	summary: BubbleSummary;
+	selectedStock: StockCode;
+	tauGroupsInfo: { mean: number }[];
+	onStockChange: (stock: StockCode) => void;
+	loading?: boolean;
+}
+
+// Latest combined bubble estimate of every Yahoo ticker, from summary.json
+export const BubbleSummaryTable = React.memo(function BubbleSummaryTable({
+	summary,
+	selectedStock,
+	tauGroupsInfo,
+	onStockChange,
+	loading,
+}: BubbleSummaryTableProps) {
+	const failed = new Set(summary.failed);
+	const tauMeans = [0.25, 0.5, 1.0].map(
+		(fallback, i) => tauGroupsInfo[i]?.mean || fallback,
+	);
+
+	return (
+		<Card className="mb-6">
+			<CardHeader className="pb-2">
+				<CardTitle className="text-lg font-semibold">
+					Latest Combined Estimates
+				</CardTitle>
+			</CardHeader>
+			<CardContent className="overflow-x-auto">
+				<table className="w-full text-sm">
+					<thead className="text-muted-foreground">
+						<tr className="text-left">
+							<th className="py-1 pr-4 font-medium">Stock</th>
+							<th className="py-1 pr-4 font-medium">Last date</th>
+							<th className="py-1 pr-4 text-right font-medium">Price</th>
+							{tauMeans.map((mean) => (
+								<th key={mean} className="py-1 pr-4 text-right font-medium">
+									τ ≈ {mean}
+								</th>
+							))}
+						</tr>
+					</thead>
+					<tbody>
+						{YAHOO_STOCK_LIST.map((stock) => {
+							const entry = summary.tickers[stock];
+							const latest = entry?.latest;
+							return (
+								<tr
+									key={stock}
+									className={cn(
+										"border-t",
+										stock === selectedStock && "bg-accent text-accent-foreground",
+									)}
+								>
+									<td className="py-1 pr-4">
+										<button
+											type="button"
+											className="font-medium hover:underline disabled:no-underline"
+											onClick={() => onStockChange(stock)}
+											disabled={loading}
+										>
+											{stock}
+										</button>
+										{failed.has(stock) && (
+											<span className="ml-2 text-xs text-destructive">
+												update failed
+											</span>
+										)}
+									</td>
+									<td className="py-1 pr-4">{entry?.last_date ?? "—"}</td>
+									<td className="py-1 pr-4 text-right tabular-nums">
+										{latest ? latest.adjusted.toFixed(2) : "—"}
+									</td>
+									{tauMeans.map((mean, i) => (
+										<td key={mean} className="py-1 pr-4 text-right tabular-nums">
+											{latest?.tau_groups[i]
+												? latest.tau_groups[i].combined.mu.toFixed(3)
+												: "—"}
+										</td>
+									))}
+								</tr>
+							);
+						})}
+					</tbody>
+				</table>
+				<p className="mt-2 text-xs text-muted-foreground">
+					Updated {new Date(summary.generated_at).toLocaleString()}
+				</p>
+			</CardContent>
+		</Card>
+	);
+});
@@ -2,6 +2,7 @@ import { Button } from "@/components/ui/button";
 import { Card, CardContent } from "@/components/ui/card";
 import { AlertTriangle } from "lucide-react";
 import { useDashboardData } from "../hooks/useDashboardData";
+import { BubbleSummaryTable } from "./BubbleSummaryTable";
 import { DashboardControls } from "./DashboardControls";
 import { PlotlyBubbleChart } from "./PlotlyBubbleChart";
 import { PriceDifferenceChart } from "./PriceDifferenceChart";
@@ -13,6 +14,7 @@ export function Dashboard() {
 		startDate,
 		endDate,
 		bubbleData,
+		summary,
 		loading,
 		error,
 		setSelectedStock,
@@ -58,6 +60,17 @@ export function Dashboard() {
 					loading={loading}
 				/>
 
+				{/* Yahoo overview from summary.json */}
+				{summary && (
+					<BubbleSummaryTable
+						summary={summary}
+						selectedStock={selectedStock}
+						tauGroupsInfo={tauGroupsInfo}
+						onStockChange={setSelectedStock}
+						loading={loading}
+					/>
+				)}
+
 				{/* Charts Grid */}
 				<div className="space-y-6">
 					{/* Put Options Chart */}
@@ -1,6 +1,7 @@
 import { useCallback, useEffect, useMemo, useRef, useState } from "react";
 import type {
 	BubbleData,
+	BubbleSummary,
 	ChartDataPoint,
 	DataSource,
 	OptionType,
@@ -13,13 +14,17 @@ import {
 	calculatePriceDifferences,
 	getDateRange,
 	getEmbeddedRegularPriceData,
+	getExportDateRange,
 	loadBubbleData,
+	loadBubbleSummary,
 	loadRegularPriceData,
 	transformDataForChart,
 } from "../utils/dataLoader";
 
 const YAHOO_STOCK_SET = new Set<StockCode>(YAHOO_STOCK_LIST);
 const WRDS_STOCK_SET = new Set<StockCode>(WRDS_STOCK_LIST);
+// Initial start of the Yahoo Finance view (month is 0-indexed: 0 = January)
+const YAHOO_DEFAULT_START_DATE = new Date(2026, 0, 26);
 
 interface DashboardState {
 	selectedStock: StockCode;
@@ -44,6 +49,9 @@ export function useDashboardData() {
 		error: null,
 	});
 
+	// Cross-ticker overview of the Yahoo view (summary.json), loaded once
+	const [yahooSummary, setYahooSummary] = useState<BubbleSummary | null>(null);
+
 	// Ref to store timeout for debouncing date changes
 	const dateChangeTimeoutRef = useRef<NodeJS.Timeout | null>(null);
 
@@ -57,8 +65,15 @@ export function useDashboardData() {
 
 			try {
 				// Load both bubble data and regular price data in parallel
+				// Year-sharded Yahoo exports load only the years of the initial view
 				const [data, regularData] = await Promise.allSettled([
-					loadBubbleData(state.selectedStock, state.dataSource),
+					loadBubbleData(
+						state.selectedStock,
+						state.dataSource,
+						state.dataSource === "Yahoo Finance"
+							? YAHOO_DEFAULT_START_DATE
+							: undefined,
+					),
 					state.dataSource === "Yahoo Finance"
 						? Promise.resolve(null)
 						: loadRegularPriceData(state.selectedStock),
@@ -72,12 +87,12 @@ export function useDashboardData() {
 					throw new Error(`Failed to load bubble data: ${data.reason}`);
 				}
 
-				const dateRange = getDateRange(data.value);
+				const dateRange = getExportDateRange(data.value);
 
 				// For Yahoo Finance, default start date to Jan 26, 2026
 				let newStartDate = dateRange.min;
 				if (state.dataSource === "Yahoo Finance") {
-					newStartDate = new Date(2026, 0, 26); // Month is 0-indexed (0 = January)
+					newStartDate = YAHOO_DEFAULT_START_DATE;
 				}
 
 				// Handle regular price data result (optional, don't fail if not available)
@@ -122,6 +137,59 @@ export function useDashboardData() {
 		};
 	}, [state.selectedStock, state.dataSource]);
 
+	useEffect(() => {
+		if (state.dataSource !== "Yahoo Finance" || yahooSummary) return;
+		let isCancelled = false;
+		loadBubbleSummary()
+			.then((summary) => {
+				if (!isCancelled) setYahooSummary(summary);
+			})
+			.catch((error) => {
+				// The overview is optional; the dashboard works without it
+				console.warn("Failed to load the Yahoo summary:", error);
+			});
+		return () => {
+			isCancelled = true;
+		};
+	}, [state.dataSource, yahooSummary]);
+
+	// Only some year shards are loaded: fetch the earlier years once the range
+	// starts before the loaded dates
+	useEffect(() => {
+		if (!state.bubbleData || !state.startDate) return;
+		const loadedStart = getDateRange(state.bubbleData).min;
+		if (
+			state.startDate >= loadedStart ||
+			getExportDateRange(state.bubbleData).min >= loadedStart
+		) {
+			return;
+		}
+
+		let isCancelled = false;
+		loadBubbleData(state.selectedStock, state.dataSource, state.startDate)
+			.then((data) => {
+				// No earlier shard (e.g. a start date on a holiday before the first
+				// loaded date): keep the current data so this effect does not rerun
+				if (isCancelled || getDateRange(data).min >= loadedStart) return;
+				setState((prev) => ({
+					...prev,
+					bubbleData: data,
+					regularPriceData: getEmbeddedRegularPriceData(data),
+				}));
+			})
+			.catch((error) => {
+				if (isCancelled) return;
+				setState((prev) => ({
+					...prev,
+					error: error instanceof Error ? error.message : "Failed to load data",
+				}));
+			});
+
+		return () => {
+			isCancelled = true;
+		};
+	}, [state.bubbleData, state.startDate, state.selectedStock, state.dataSource]);
+
 	// Cleanup timeout on unmount
 	useEffect(() => {
 		return () => {
@@ -169,7 +237,7 @@ export function useDashboardData() {
 
 	const resetDateRange = useCallback(() => {
 		if (state.bubbleData) {
-			const dateRange = getDateRange(state.bubbleData);
+			const dateRange = getExportDateRange(state.bubbleData);
 			setState((prev) => ({
 				...prev,
 				startDate: dateRange.min,
@@ -236,7 +304,7 @@ export function useDashboardData() {
 
 	const getAvailableDateRange = useCallback(() => {
 		if (!state.bubbleData) return null;
-		return getDateRange(state.bubbleData);
+		return getExportDateRange(state.bubbleData);
 	}, [state.bubbleData]);
 
 	return {
@@ -246,6 +314,7 @@ export function useDashboardData() {
 		endDate: state.endDate,
 		bubbleData: state.bubbleData,
 		regularPriceData: state.regularPriceData,
+		summary: state.dataSource === "Yahoo Finance" ? yahooSummary : null,
 		loading: state.loading,
 		error: state.error,
 		setSelectedStock,
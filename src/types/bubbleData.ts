@@ -45,16 +45,126 @@ export interface BubbleDataMetadata {
 	option_types_info: string[];
 	time_series_start_date: string;
 	time_series_end_date: string;
+	schema_version?: number; // absent in schema 1, 2 for ColumnarBubbleData
+	// Lengths of the rolling_windows series (BUBBLE_EXTRA_WINDOWS)
+	extra_rolling_window_days?: number[];
 }
 
 export interface BubbleData {
 	metadata: BubbleDataMetadata;
 	time_series_data: TimeSeriesDataPoint[];
 	price_series_data?: PriceSeriesDataPoint[];
+	rolling_windows?: RollingWindowSeries[];
 }
 
 export type OptionType = "put" | "call" | "combined";
 
+// derived_mapping.json (scripts/update-blob-urls.ts): per-ticker URLs of the
+// optional exports, kept apart from blob_mapping.json's ticker → JSON URLs
+export interface DerivedExportMapping {
+	// Binary sidecar (BUBBLE_BINARY_SIDECAR=1, scripts/binary_export.py)
+	sidecars?: Record<string, string>;
+	// Incremental manifest.json (BUBBLE_INCREMENTAL=1), only for exports
+	// without extra rolling windows, which the incremental layout does not carry
+	incremental?: Record<string, string>;
+	// Year-shard index.json (BUBBLE_YEAR_SHARDS=1), under the same condition
+	years?: Record<string, string>;
+}
+
+// Incremental export (scripts/incremental_export.py): immutable shards + tail
+export interface IncrementalPiece {
+	file: string;
+	first_date: string | null;
+	last_date: string | null;
+	count: number;
+	sha256: string;
+}
+
+export interface IncrementalManifest {
+	format: "bubble-incremental";
+	version: number;
+	metadata: BubbleDataMetadata;
+	shard_rows: number;
+	shards: IncrementalPiece[];
+	tail: IncrementalPiece;
+}
+
+// Cross-ticker overview written once per run (public/data/summary.json)
+export interface BubbleSummaryEntry {
+	file: string;
+	sha256: string;
+	first_date: string | null;
+	last_date: string | null;
+	count: number;
+	latest: {
+		adjusted: number;
+		regular: number;
+		tau_groups: DailyGroupedData[];
+	} | null;
+	// Min/max of each mu over the last rolling window, from start_date
+	recent: {
+		start_date: string;
+		tau_groups: Record<OptionType, { min: number; max: number }>[];
+	} | null;
+}
+
+export interface BubbleSummary {
+	generated_at: string;
+	tickers: Record<string, BubbleSummaryEntry>;
+	failed: string[];
+}
+
+// Year-sharded export (scripts/year_shard_export.py): one file per calendar year
+export interface YearShard {
+	year: number;
+	file: string;
+	first_date: string;
+	last_date: string;
+	// First date whose estimates enter the shard's first rolling window
+	window_start_date: string;
+	count: number;
+	sha256: string;
+}
+
+export interface YearShardIndex {
+	format: "bubble-year-shards";
+	version: number;
+	metadata: BubbleDataMetadata;
+	shards: YearShard[];
+}
+
+// Schema 2 export: every series as a parallel array indexed like `date`
+// (plain arrays from JSON, typed-array views from the binary sidecar)
+export interface ColumnarEstimates {
+	mu: ArrayLike<number>;
+	lb: ArrayLike<number>;
+	ub: ArrayLike<number>;
+}
+
+// Extra rolling-window lengths, columnar in both schemas and indexed like the
+// main series' dates
+export interface RollingWindowSeries {
+	rolling_window_days: number;
+	label: string;
+	tau_groups: Record<OptionType, ColumnarEstimates>[];
+}
+
+export interface ColumnarBubbleData {
+	metadata: BubbleDataMetadata & { schema_version: 2 };
+	time_series: {
+		date: string[];
+		adjusted: ArrayLike<number>;
+		regular: ArrayLike<number>;
+		tau_groups: Record<OptionType, ColumnarEstimates>[];
+	};
+	price_series?: {
+		date: string[];
+		regular: ArrayLike<number>;
+		adjusted: ArrayLike<number>;
+	};
+	rolling_windows?: RollingWindowSeries[];
+}
+
 export interface ChartDataPoint {
 	date: string;
 	stockPrice: number;
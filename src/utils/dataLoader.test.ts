@@ -1,12 +1,30 @@
-import { describe, expect, it } from "vitest";
-import type { BubbleData } from "../types/bubbleData";
+import { readFileSync } from "node:fs";
+import { describe, expect, it, vi } from "vitest";
+import type {
+	BubbleData,
+	ColumnarBubbleData,
+} from "../types/bubbleData";
 import {
 	calculatePriceDifferences,
 	getDateRange,
 	getEmbeddedRegularPriceData,
+	getExportDateRange,
+	loadBubbleData,
+	loadIncrementalBubbleData,
+	loadYearShardedBubbleData,
+	normalizeBubbleData,
+	parseBubbleSidecar,
 	transformDataForChart,
 } from "./dataLoader";
 
+const readFixture = (extension: "bin" | "json") =>
+	readFileSync(
+		new URL(
+			`./__fixtures__/bubble_data_AAPL_splitadj_2025to2026.${extension}`,
+			import.meta.url,
+		),
+	);
+
 const estimate = (mu: number) => ({
 	mu,
 	lb: mu - 0.1,
@@ -145,4 +163,334 @@ describe("dataLoader transformations", () => {
 			},
 		]);
 	});
+
+	it("expands schema 2 columnar exports into the row-oriented shape", () => {
+		const rows = sampleBubbleData.time_series_data.slice(0, 2);
+		const column = (tau: number, optionType: "put" | "call" | "combined") => ({
+			mu: rows.map((p) => p.bubble_estimates.daily_grouped[tau][optionType].mu),
+			lb: rows.map((p) => p.bubble_estimates.daily_grouped[tau][optionType].lb),
+			ub: rows.map((p) => p.bubble_estimates.daily_grouped[tau][optionType].ub),
+		});
+		const columnar: ColumnarBubbleData = {
+			metadata: { ...sampleBubbleData.metadata, schema_version: 2 },
+			time_series: {
+				date: rows.map((p) => p.date),
+				adjusted: rows.map((p) => p.stock_prices.adjusted),
+				regular: rows.map((p) => p.stock_prices.regular as number),
+				tau_groups: [0, 1, 2].map((tau) => ({
+					put: column(tau, "put"),
+					call: column(tau, "call"),
+					combined: column(tau, "combined"),
+				})),
+			},
+			price_series: {
+				date: ["2024-01-01", "2024-01-02"],
+				regular: [95, 100],
+				adjusted: [100, 110],
+			},
+		};
+
+		const data = normalizeBubbleData(columnar);
+
+		expect(data.time_series_data).toEqual(rows);
+		expect(data.price_series_data).toEqual([
+			{ date: "2024-01-01", regular: 95, adjusted: 100 },
+			{ date: "2024-01-02", regular: 100, adjusted: 110 },
+		]);
+		expect(normalizeBubbleData(sampleBubbleData)).toBe(sampleBubbleData);
+	});
+
+	it("reads a binary sidecar with the same content as the JSON export", () => {
+		// Written by scripts/binary_export.py write_sidecar; the pair is checked on the
+		// Python side with `python scripts/binary_export.py src/utils/__fixtures__`
+		const bin = readFixture("bin");
+		const data = parseBubbleSidecar(
+			bin.buffer.slice(bin.byteOffset, bin.byteOffset + bin.byteLength),
+		);
+		const json = normalizeBubbleData(JSON.parse(readFixture("json").toString()));
+
+		// Every column is float64, so the values are exactly the JSON ones
+		expect(data.metadata).toEqual(json.metadata);
+		expect(data.time_series_data).toEqual(json.time_series_data);
+		expect(data.price_series_data).toEqual(json.price_series_data);
+		// Extra rolling windows come back as typed-array views
+		const plain = (windows: BubbleData["rolling_windows"]) =>
+			windows?.map((window) => ({
+				...window,
+				tau_groups: window.tau_groups.map((group) =>
+					Object.fromEntries(
+						Object.entries(group).map(([optionType, { mu, lb, ub }]) => [
+							optionType,
+							{ mu: Array.from(mu), lb: Array.from(lb), ub: Array.from(ub) },
+						]),
+					),
+				),
+			}));
+		expect(data.rolling_windows).toHaveLength(1);
+		expect(plain(data.rolling_windows)).toEqual(plain(json.rolling_windows));
+	});
+
+	it("loads the mapped binary sidecar instead of the JSON export", async () => {
+		const bin = readFixture("bin");
+		const fetchMock = vi.fn(async (url: string) => {
+			const file = new URL(url).pathname.split("/").pop() as string;
+			if (file === "blob_mapping.json") {
+				return new Response(
+					JSON.stringify({
+						AAPL: "https://example.com/yahoo-json/AAPL-abc.json",
+					}),
+				);
+			}
+			if (file === "derived_mapping.json") {
+				return new Response(
+					JSON.stringify({
+						sidecars: { AAPL: "https://example.com/yahoo-json/AAPL-def.bin" },
+					}),
+				);
+			}
+			return file.endsWith(".bin")
+				? new Response(bin)
+				: new Response("not found", { status: 404 });
+		});
+		vi.stubGlobal("fetch", fetchMock);
+
+		try {
+			const data = await loadBubbleData("AAPL", "Yahoo Finance");
+
+			expect(data.metadata.stockcode).toBe("AAPL");
+			expect(data.time_series_data).toHaveLength(5);
+			expect(fetchMock).toHaveBeenCalledTimes(3);
+		} finally {
+			vi.unstubAllGlobals();
+		}
+	});
+
+	it("loads the mapped incremental export when there is no sidecar", async () => {
+		const [first, second] = sampleBubbleData.time_series_data;
+		const piece = (file: string) => ({
+			file,
+			first_date: null,
+			last_date: null,
+			count: 1,
+			sha256: "",
+		});
+		const files: Record<string, unknown> = {
+			"blob_mapping.json": { AAPL: "https://example.com/yahoo-json/AAPL-abc.json" },
+			"derived_mapping.json": {
+				sidecars: {},
+				incremental: {
+					AAPL: "https://example.com/yahoo-json/incremental/AAPL/manifest.json",
+				},
+			},
+			"manifest.json": {
+				format: "bubble-incremental",
+				version: 1,
+				metadata: sampleBubbleData.metadata,
+				shard_rows: 1,
+				shards: [piece("shard-000-a.json")],
+				tail: piece("tail.json"),
+			},
+			"shard-000-a.json": { time_series_data: [first], price_series_data: [] },
+			"tail.json": { time_series_data: [second], price_series_data: [] },
+		};
+		const fetchMock = vi.fn(async (url: string) => {
+			const file = new URL(url).pathname.split("/").pop() as string;
+			return file in files
+				? new Response(JSON.stringify(files[file]))
+				: new Response("not found", { status: 404 });
+		});
+		vi.stubGlobal("fetch", fetchMock);
+		// Start from an empty mapping cache
+		vi.resetModules();
+		const { loadBubbleData } = await import("./dataLoader");
+
+		try {
+			const data = await loadBubbleData("AAPL", "Yahoo Finance");
+
+			expect(data.time_series_data).toEqual([first, second]);
+			expect(fetchMock).not.toHaveBeenCalledWith(
+				expect.stringContaining("AAPL-abc.json"),
+				expect.anything(),
+			);
+		} finally {
+			vi.unstubAllGlobals();
+		}
+	});
+
+	it("loads only the year shards from the start date when they are mapped", async () => {
+		const [first, second, third] = sampleBubbleData.time_series_data;
+		const shard = (year: number, date: string) => ({
+			year,
+			file: `${year}-abc.json`,
+			first_date: date,
+			last_date: date,
+			window_start_date: date,
+			count: 1,
+			sha256: "",
+		});
+		const metadata = {
+			...sampleBubbleData.metadata,
+			time_series_start_date: "2023-01-03",
+			time_series_end_date: "2024-01-10",
+		};
+		const files: Record<string, unknown> = {
+			"blob_mapping.json": { AAPL: "https://example.com/yahoo-json/AAPL-abc.json" },
+			"derived_mapping.json": {
+				years: { AAPL: "https://example.com/yahoo-json/years/AAPL/index.json" },
+			},
+			"index.json": {
+				format: "bubble-year-shards",
+				version: 1,
+				metadata,
+				shards: [
+					shard(2023, "2023-01-03T00:00:00"),
+					shard(2024, "2024-01-01T00:00:00"),
+				],
+			},
+			"2023-abc.json": { metadata, time_series_data: [first] },
+			"2024-abc.json": { metadata, time_series_data: [third, second] },
+		};
+		const fetchMock = vi.fn(async (url: string) => {
+			const file = new URL(url).pathname.split("/").pop() as string;
+			return file in files
+				? new Response(JSON.stringify(files[file]))
+				: new Response("not found", { status: 404 });
+		});
+		vi.stubGlobal("fetch", fetchMock);
+		vi.resetModules();
+		const { loadBubbleData } = await import("./dataLoader");
+
+		try {
+			const data = await loadBubbleData(
+				"AAPL",
+				"Yahoo Finance",
+				new Date("2024-01-01T00:00:00"),
+			);
+
+			expect(data.time_series_data).toEqual([second, third]);
+			expect(fetchMock).not.toHaveBeenCalledWith(
+				"https://example.com/yahoo-json/years/AAPL/2023-abc.json",
+				undefined,
+			);
+			// The available range still spans the whole export
+			expect(getDateRange(data).min).toEqual(new Date(second.date));
+			expect(getExportDateRange(data)).toEqual({
+				min: new Date("2023-01-03T00:00:00"),
+				max: new Date("2024-01-10T00:00:00"),
+			});
+		} finally {
+			vi.unstubAllGlobals();
+		}
+	});
+
+	it("reassembles an incremental export from its shards and tail", async () => {
+		const [first, second, third] = sampleBubbleData.time_series_data;
+		const piece = (file: string, count: number) => ({
+			file,
+			first_date: null,
+			last_date: null,
+			count,
+			sha256: "",
+		});
+		const files: Record<string, unknown> = {
+			"manifest.json": {
+				format: "bubble-incremental",
+				version: 1,
+				metadata: sampleBubbleData.metadata,
+				shard_rows: 1,
+				shards: [piece("shard-000-a.json", 1), piece("shard-001-b.json", 1)],
+				tail: piece("tail.json", 1),
+			},
+			"shard-000-a.json": {
+				time_series_data: [first],
+				price_series_data: [{ date: "2024-01-01", regular: 95, adjusted: 100 }],
+			},
+			"shard-001-b.json": { time_series_data: [second], price_series_data: [] },
+			"tail.json": { time_series_data: [third], price_series_data: [] },
+		};
+		const fetchMock = vi.fn(async (url: string) => {
+			const file = new URL(url).pathname.split("/").pop() as string;
+			return new Response(JSON.stringify(files[file]));
+		});
+		vi.stubGlobal("fetch", fetchMock);
+
+		try {
+			const data = await loadIncrementalBubbleData(
+				"https://example.com/incremental/TEST/manifest.json",
+			);
+
+			expect(data.metadata).toEqual(sampleBubbleData.metadata);
+			expect(data.time_series_data).toEqual([first, second, third]);
+			expect(data.price_series_data).toEqual([
+				{ date: "2024-01-01", regular: 95, adjusted: 100 },
+			]);
+			// Immutable shards are fetched without a cache buster
+			expect(fetchMock).toHaveBeenCalledWith(
+				"https://example.com/incremental/TEST/shard-000-a.json",
+				undefined,
+			);
+		} finally {
+			vi.unstubAllGlobals();
+		}
+	});
+
+	it("fetches only the year shards overlapping the selected range", async () => {
+		const [first, second, third] = sampleBubbleData.time_series_data;
+		const shard = (year: number, first_date: string, last_date: string) => ({
+			year,
+			file: `${year}-abc.json`,
+			first_date,
+			last_date,
+			window_start_date: first_date,
+			count: 1,
+			sha256: "",
+		});
+		const files: Record<string, unknown> = {
+			"index.json": {
+				format: "bubble-year-shards",
+				version: 1,
+				metadata: sampleBubbleData.metadata,
+				shards: [
+					shard(2022, "2022-01-03T00:00:00", "2022-12-30T00:00:00"),
+					shard(2023, "2023-01-03T00:00:00", "2023-12-29T00:00:00"),
+					shard(2024, "2024-01-01T00:00:00", "2024-01-03T00:00:00"),
+				],
+			},
+			"2023-abc.json": {
+				metadata: { stockcode: "TEST", year: 2023 },
+				time_series_data: [first, second],
+				price_series_data: [],
+			},
+			"2024-abc.json": {
+				metadata: { stockcode: "TEST", year: 2024 },
+				time_series_data: [third],
+				price_series_data: [{ date: "2024-01-03", regular: 120, adjusted: 130 }],
+			},
+		};
+		const fetchMock = vi.fn(async (url: string) => {
+			const file = new URL(url).pathname.split("/").pop() as string;
+			return new Response(JSON.stringify(files[file]));
+		});
+		vi.stubGlobal("fetch", fetchMock);
+
+		try {
+			const data = await loadYearShardedBubbleData(
+				"https://example.com/years/TEST/index.json",
+				new Date("2023-06-01"),
+			);
+
+			expect(data.metadata).toEqual(sampleBubbleData.metadata);
+			expect(data.time_series_data).toEqual([first, second, third]);
+			expect(data.price_series_data).toEqual([
+				{ date: "2024-01-03", regular: 120, adjusted: 130 },
+			]);
+			expect(fetchMock).toHaveBeenCalledTimes(3);
+			expect(fetchMock).not.toHaveBeenCalledWith(
+				"https://example.com/years/TEST/2022-abc.json",
+				undefined,
+			);
+		} finally {
+			vi.unstubAllGlobals();
+		}
+	});
 });
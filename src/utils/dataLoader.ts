@@ -1,12 +1,19 @@
 import { DEFAULT_YAHOO_BLOB_MAPPING_URL } from "../config/yahooData";
 import type {
 	BubbleData,
+	BubbleSummary,
 	ChartDataPoint,
+	ColumnarBubbleData,
+	ColumnarEstimates,
+	DailyGroupedData,
 	DataSource,
+	DerivedExportMapping,
+	IncrementalManifest,
 	OptionType,
 	PriceDifferenceDataPoint,
 	RegularPriceData,
 	StockCode,
+	YearShardIndex,
 } from "../types/bubbleData";
 
 // ─────────────────────────────────────────────────────────────────────────────
@@ -111,15 +118,271 @@ async function getYahooUrlMapping(): Promise<Record<string, string>> {
 	return yahooUrlCache as Record<string, string>;
 }
 
+// Optional exports (sidecars, ...) are mapped in derived_mapping.json next to
+// blob_mapping.json; a store without one simply has no derived exports.
+const DERIVED_MAPPING_URL = new URL(
+	"derived_mapping.json",
+	BLOB_MAPPING_URL,
+).toString();
+
+let derivedMappingCache: DerivedExportMapping | null = null;
+let derivedMappingCacheTime = 0;
+
+async function getDerivedExportMapping(): Promise<DerivedExportMapping> {
+	if (
+		derivedMappingCache &&
+		Date.now() - derivedMappingCacheTime < YAHOO_MAPPING_CACHE_MS
+	) {
+		return derivedMappingCache;
+	}
+
+	const response = await fetch(withCacheBuster(DERIVED_MAPPING_URL), {
+		cache: "no-store",
+	});
+	if (!response.ok && response.status !== 404) {
+		throw new Error(
+			`Failed to fetch derived_mapping.json: ${response.status} ${response.statusText}`,
+		);
+	}
+
+	derivedMappingCache = response.ok ? await response.json() : {};
+	derivedMappingCacheTime = Date.now();
+	return derivedMappingCache as DerivedExportMapping;
+}
+
+// Shared by the loaders below: a failed response throws with its URL and status
+async function fetchOk(url: string, init?: RequestInit): Promise<Response> {
+	const response = await fetch(url, init);
+	if (!response.ok) {
+		throw new Error(
+			`Failed to load ${url}: ${response.status} ${response.statusText}`,
+		);
+	}
+	return response;
+}
+
+async function fetchJson(url: string, init?: RequestInit) {
+	return (await fetchOk(url, init)).json();
+}
+
 // ─────────────────────────────────────────────────────────────────────────────
 // Public API
 // ─────────────────────────────────────────────────────────────────────────────
+const OPTION_TYPES: OptionType[] = ["put", "call", "combined"];
+
+/**
+ * Accepts either export schema and returns the row-oriented BubbleData.
+ * Schema 2 files (metadata.schema_version === 2) store parallel arrays,
+ * which are much smaller and faster to parse than one object per date.
+ */
+export function normalizeBubbleData(
+	data: BubbleData | ColumnarBubbleData,
+): BubbleData {
+	if (data.metadata?.schema_version !== 2) {
+		return data as BubbleData;
+	}
+
+	const {
+		metadata,
+		time_series: series,
+		price_series: prices,
+		rolling_windows,
+	} = data as ColumnarBubbleData;
+	const time_series_data = series.date.map((date, t) => ({
+		date,
+		stock_prices: {
+			adjusted: series.adjusted[t],
+			regular: series.regular[t],
+		},
+		bubble_estimates: {
+			daily_grouped: series.tau_groups.map((group) => {
+				const point = {} as DailyGroupedData;
+				for (const optionType of OPTION_TYPES) {
+					const estimates = group[optionType];
+					point[optionType] = {
+						mu: estimates.mu[t],
+						lb: estimates.lb[t],
+						ub: estimates.ub[t],
+					};
+				}
+				return point;
+			}),
+		},
+	}));
+	const price_series_data = prices?.date.map((date, i) => ({
+		date,
+		regular: prices.regular[i],
+		adjusted: prices.adjusted[i],
+	}));
+
+	return { metadata, time_series_data, price_series_data, rolling_windows };
+}
+
+const SIDECAR_MAGIC = "BUB1";
+
+interface SidecarColumn {
+	name: string;
+	dtype: "float32" | "float64";
+	offset: number;
+	length: number;
+}
+
+/**
+ * Reads a binary sidecar written by scripts/binary_export.py: "BUB1", a
+ * little-endian uint32 header length, a JSON header, then 8-byte aligned
+ * little-endian float blocks that are wrapped as typed arrays without parsing.
+ */
+export function parseBubbleSidecar(buffer: ArrayBuffer): BubbleData {
+	const decoder = new TextDecoder();
+	if (decoder.decode(new Uint8Array(buffer, 0, 4)) !== SIDECAR_MAGIC) {
+		throw new Error("Not a bubble data sidecar");
+	}
+	const headerLength = new DataView(buffer).getUint32(4, true);
+	const header = JSON.parse(
+		decoder.decode(new Uint8Array(buffer, 8, headerLength)),
+	);
+
+	const columns: Record<string, Float32Array | Float64Array> = {};
+	for (const column of header.columns as SidecarColumn[]) {
+		const ArrayType = column.dtype === "float32" ? Float32Array : Float64Array;
+		columns[column.name] = new ArrayType(buffer, column.offset, column.length);
+	}
+
+	// Columns "<series>/tau_groups/<i>/<option type>/<stat>" for i = 0, 1, ...
+	const tauGroups = (series: string) => {
+		const groups: Record<OptionType, ColumnarEstimates>[] = [];
+		for (let i = 0; `${series}/tau_groups/${i}/put/mu` in columns; i++) {
+			const group = {} as Record<OptionType, ColumnarEstimates>;
+			for (const optionType of OPTION_TYPES) {
+				const prefix = `${series}/tau_groups/${i}/${optionType}`;
+				group[optionType] = {
+					mu: columns[`${prefix}/mu`],
+					lb: columns[`${prefix}/lb`],
+					ub: columns[`${prefix}/ub`],
+				};
+			}
+			groups.push(group);
+		}
+		return groups;
+	};
+	const windows: { rolling_window_days: number; label: string }[] =
+		header.rolling_windows ?? [];
+
+	return normalizeBubbleData({
+		metadata: { ...header.metadata, schema_version: 2 },
+		time_series: {
+			date: header.time_series.date,
+			adjusted: columns["time_series/adjusted"],
+			regular: columns["time_series/regular"],
+			tau_groups: tauGroups("time_series"),
+		},
+		price_series: {
+			date: header.price_series.date,
+			regular: columns["price_series/regular"],
+			adjusted: columns["price_series/adjusted"],
+		},
+		...(windows.length > 0 && {
+			rolling_windows: windows.map((window, j) => ({
+				...window,
+				tau_groups: tauGroups(`rolling_windows/${j}`),
+			})),
+		}),
+	});
+}
+
+/**
+ * Fetches and parses a binary sidecar. Sidecars are uploaded under
+ * content-addressed names, so they are fetched with normal HTTP caching.
+ */
+export async function loadBubbleSidecar(url: string): Promise<BubbleData> {
+	return parseBubbleSidecar(await (await fetchOk(url)).arrayBuffer());
+}
+
+/**
+ * Loads an incremental export from its manifest URL. Shards have content-hashed
+ * names and are fetched with normal HTTP caching, so a returning client only
+ * downloads the manifest, the tail and any newly sealed shard.
+ */
+export async function loadIncrementalBubbleData(
+	manifestUrl: string,
+): Promise<BubbleData> {
+	const fileUrl = (file: string) => new URL(file, manifestUrl).toString();
+
+	const manifest: IncrementalManifest = await fetchJson(
+		withCacheBuster(manifestUrl),
+		{ cache: "no-store" },
+	);
+	const pieces: Pick<BubbleData, "time_series_data" | "price_series_data">[] =
+		await Promise.all([
+			...manifest.shards.map((shard) => fetchJson(fileUrl(shard.file))),
+			fetchJson(withCacheBuster(fileUrl(manifest.tail.file)), {
+				cache: "no-store",
+			}),
+		]);
+
+	return {
+		metadata: manifest.metadata,
+		time_series_data: pieces.flatMap((piece) => piece.time_series_data),
+		price_series_data: pieces.flatMap((piece) => piece.price_series_data ?? []),
+	};
+}
+
+/**
+ * Loads the run's summary.json (latest values, date bounds and hashes for every
+ * Yahoo ticker), so overview screens need one request instead of every export.
+ */
+export async function loadBubbleSummary(
+	summaryUrl = new URL("yahoo-json/summary.json", BLOB_MAPPING_URL).toString(),
+): Promise<BubbleSummary> {
+	return fetchJson(withCacheBuster(summaryUrl), { cache: "no-store" });
+}
+
+/**
+ * Loads the year shards of a year-sharded export that overlap [startDate,
+ * endDate] (either bound may be omitted). Shards are content-hashed and
+ * fetched with normal HTTP caching; only the index is fetched fresh.
+ */
+export async function loadYearShardedBubbleData(
+	indexUrl: string,
+	startDate?: Date,
+	endDate?: Date,
+): Promise<BubbleData> {
+	const index: YearShardIndex = await fetchJson(withCacheBuster(indexUrl), {
+		cache: "no-store",
+	});
+	const shards = index.shards.filter(
+		(shard) =>
+			(!startDate || new Date(shard.last_date) >= startDate) &&
+			(!endDate || new Date(shard.first_date) <= endDate),
+	);
+	const pieces = await Promise.all(
+		shards.map(async (shard) =>
+			normalizeBubbleData(
+				await fetchJson(new URL(shard.file, indexUrl).toString()),
+			),
+		),
+	);
+
+	return {
+		metadata: index.metadata,
+		time_series_data: pieces.flatMap((piece) => piece.time_series_data),
+		price_series_data: pieces.flatMap((piece) => piece.price_series_data ?? []),
+	};
+}
+
+/**
+ * Loads a ticker's bubble data. With a startDate, Yahoo tickers whose export is
+ * year-sharded load only the years from startDate on; getExportDateRange still
+ * reports the whole export's range.
+ */
 export async function loadBubbleData(
 	stockCode: StockCode,
 	dataSource: DataSource,
+	startDate?: Date,
 ): Promise<BubbleData> {
 	try {
 		let url: string;
+		let data: BubbleData | null = null;
 
 		if (dataSource === "WRDS") {
 			// Static historical dataset — URL never changes
@@ -137,19 +400,48 @@ export async function loadBubbleData(
 					`No Yahoo Blob URL found for ${stockCode} in blob_mapping.json. The nightly action may not have run yet, or this ticker is missing.`,
 				);
 			}
+
+			// Prefer the year shards (for a start date), the binary sidecar, then the
+			// incremental export, when they were uploaded; the JSON is the fallback
+			const derived = await getDerivedExportMapping().catch((error) => {
+				console.warn("Loading the JSON exports only:", error);
+				return {} as DerivedExportMapping;
+			});
+			const loadOrWarn = (what: string, load: () => Promise<BubbleData>) =>
+				load().catch((error) => {
+					console.warn(
+						`Falling back to JSON for ${stockCode}: ${what} failed to load`,
+						error,
+					);
+					return null;
+				});
+			const yearIndexUrl = derived.years?.[stockCode];
+			if (startDate && yearIndexUrl) {
+				data = await loadOrWarn("year shards", () =>
+					loadYearShardedBubbleData(yearIndexUrl, startDate),
+				);
+			}
+			const sidecarUrl = derived.sidecars?.[stockCode];
+			if (!data && sidecarUrl) {
+				data = await loadOrWarn("sidecar", () => loadBubbleSidecar(sidecarUrl));
+			}
+			const incrementalUrl = derived.incremental?.[stockCode];
+			if (!data && incrementalUrl) {
+				data = await loadOrWarn("incremental export", () =>
+					loadIncrementalBubbleData(incrementalUrl),
+				);
+			}
 		}
 
-		const response = await fetch(
-			dataSource === "Yahoo Finance" ? withCacheBuster(url) : url,
-			dataSource === "Yahoo Finance" ? { cache: "no-store" } : undefined,
-		);
-		if (!response.ok) {
-			throw new Error(
-				`Failed to load data for ${stockCode} from ${dataSource}: ${response.statusText}`,
+		if (!data) {
+			data = normalizeBubbleData(
+				await fetchJson(
+					dataSource === "Yahoo Finance" ? withCacheBuster(url) : url,
+					dataSource === "Yahoo Finance" ? { cache: "no-store" } : undefined,
+				),
 			);
 		}
 
-		const data: BubbleData = await response.json();
 		data.time_series_data.sort(
 			(a, b) => new Date(a.date).getTime() - new Date(b.date).getTime(),
 		);
@@ -211,6 +503,25 @@ export function getDateRange(bubbleData: BubbleData): { min: Date; max: Date } {
 	};
 }
 
+/**
+ * The whole export's date range from its metadata, which extends past
+ * getDateRange when only some year shards were loaded.
+ */
+export function getExportDateRange(bubbleData: BubbleData): {
+	min: Date;
+	max: Date;
+} {
+	const loaded = getDateRange(bubbleData);
+	const { time_series_start_date: start, time_series_end_date: end } =
+		bubbleData.metadata;
+	// Metadata dates are "YYYY-MM-DD"; read them as local midnight like the rows
+	const localDate = (date: string) => new Date(`${date.slice(0, 10)}T00:00:00`);
+	return {
+		min: start && localDate(start) < loaded.min ? localDate(start) : loaded.min,
+		max: end && localDate(end) > loaded.max ? localDate(end) : loaded.max,
+	};
+}
+
 export function formatTooltipData(
 	dataPoint: ChartDataPoint,
 	tauGroupsInfo: { mean: number }[],